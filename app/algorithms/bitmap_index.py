@@ -0,0 +1,156 @@
+"""
+Bitmap indexes over catalog positions.
+
+For every value of every filter dimension the index keeps one bitset (a
+Python ``int``, bit ``i`` = catalog position ``i``).  Optimizer filters become
+a few AND/OR operations on these bitsets instead of a scan of the catalog
+columns.  Dimensions:
+
+    muscle_group   - muscle group code
+    equipment      - equipment code
+    is_cardio      - cardio flag
+    difficulty     - difficulty value
+    calorie_floor  - ``floor(calories_burned)`` capped at ``CALORIE_FLOOR_CAP``
+
+Indexes are immutable like the catalog they describe; ``with_row`` and
+``without_row`` derive the index of the next catalog version incrementally.
+Unions of several values are memoized per index, so repeated fitness level
+and goal masks cost a dictionary lookup.
+"""
+
+from typing import Dict, Hashable, Iterable, Tuple
+
+import numpy as np
+
+# Calorie buckets above this value are merged into one
+CALORIE_FLOOR_CAP = 30
+
+DIMENSIONS = ("muscle_group", "equipment", "is_cardio", "difficulty", "calorie_floor")
+
+
+def _dimension_values(catalog, dimension: str, positions=slice(None)) -> np.ndarray:
+    """Value of ``dimension`` for the given catalog rows"""
+    if dimension == "muscle_group":
+        return catalog.muscle_group_codes[positions]
+    if dimension == "equipment":
+        return catalog.equipment_codes[positions]
+    if dimension == "is_cardio":
+        return catalog.is_cardio[positions]
+    if dimension == "difficulty":
+        return catalog.difficulty[positions]
+    if dimension == "calorie_floor":
+        calories = np.floor(catalog.calories_burned[positions])
+        return np.clip(calories, 0, CALORIE_FLOOR_CAP).astype(np.int64)
+    raise KeyError(dimension)
+
+
+def _to_bits(mask: np.ndarray) -> int:
+    """Boolean mask -> bitset"""
+    return int.from_bytes(np.packbits(mask, bitorder="little").tobytes(), "little")
+
+
+def _python_value(value):
+    """NumPy scalar -> plain Python value, so keys compare with user input"""
+    return value.item() if hasattr(value, "item") else value
+
+
+class CatalogBitmapIndex:
+    """Immutable set of bitsets keyed by (dimension, value).
+
+    Attributes:
+        size (int): Number of catalog positions covered
+    """
+
+    __slots__ = ("size", "_bitmaps", "_unions")
+
+    def __init__(self, size: int, bitmaps: Dict[Tuple[str, Hashable], int]):
+        self.size = size
+        self._bitmaps = bitmaps
+        self._unions = {}
+
+    @classmethod
+    def build(cls, catalog) -> "CatalogBitmapIndex":
+        """Build the index for every position of ``catalog``."""
+        bitmaps = {}
+        for dimension in DIMENSIONS:
+            values = _dimension_values(catalog, dimension)
+            for value in np.unique(values).tolist():
+                bitmaps[(dimension, value)] = _to_bits(values == value)
+        return cls(len(catalog), bitmaps)
+
+    @property
+    def all(self) -> int:
+        """Bitset with every position set"""
+        return (1 << self.size) - 1
+
+    def get(self, dimension: str, value: Hashable) -> int:
+        """Bitset of positions where ``dimension == value``"""
+        return self._bitmaps.get((dimension, value), 0)
+
+    def union(self, dimension: str, values: Iterable[Hashable]) -> int:
+        """Bitset of positions where ``dimension`` is any of ``values`` (memoized)"""
+        key = (dimension, frozenset(values))
+        bits = self._unions.get(key)
+        if bits is None:
+            bits = 0
+            for value in key[1]:
+                bits |= self.get(dimension, value)
+            self._unions[key] = bits
+        return bits
+
+    def at_most(self, dimension: str, limit) -> int:
+        """Bitset of positions where ``dimension <= limit`` (memoized)"""
+        return self._range(dimension, "<=", limit)
+
+    def at_least(self, dimension: str, limit) -> int:
+        """Bitset of positions where ``dimension >= limit`` (memoized)"""
+        return self._range(dimension, ">=", limit)
+
+    def _range(self, dimension: str, op: str, limit) -> int:
+        key = (dimension, op, limit)
+        bits = self._unions.get(key)
+        if bits is None:
+            bits = 0
+            for (name, value), value_bits in self._bitmaps.items():
+                if name == dimension and (value <= limit if op == "<=" else value >= limit):
+                    bits |= value_bits
+            self._unions[key] = bits
+        return bits
+
+    def positions(self, bits: int) -> np.ndarray:
+        """Catalog positions of the set bits, ascending"""
+        if not bits:
+            return np.empty(0, dtype=np.int64)
+        raw = np.frombuffer(bits.to_bytes((self.size + 7) // 8, "little"), dtype=np.uint8)
+        # Only unpack the non-zero bytes, so sparse results stay cheap
+        occupied = np.flatnonzero(raw)
+        unpacked = np.unpackbits(raw[occupied, None], axis=1, bitorder="little").astype(bool)
+        return (occupied[:, None] * 8 + np.arange(8))[unpacked]
+
+    def with_row(self, previous, catalog, position: int) -> "CatalogBitmapIndex":
+        """Index for ``catalog`` after the row at ``position`` was replaced or appended.
+
+        ``previous`` is the catalog this index describes.  The bit is cleared
+        only in the bitmaps of the replaced row's values, so an update touches
+        one bitmap per dimension instead of every bitmap.
+        """
+        bit = 1 << position
+        bitmaps = dict(self._bitmaps)
+        for dimension in DIMENSIONS:
+            if position < self.size:
+                old_key = (dimension, _python_value(_dimension_values(previous, dimension, position)))
+                bits = bitmaps.pop(old_key, 0) & ~bit
+                if bits:
+                    bitmaps[old_key] = bits
+            key = (dimension, _python_value(_dimension_values(catalog, dimension, position)))
+            bitmaps[key] = bitmaps.get(key, 0) | bit
+        return CatalogBitmapIndex(max(self.size, position + 1), bitmaps)
+
+    def without_row(self, position: int) -> "CatalogBitmapIndex":
+        """Index after the row at ``position`` was removed and later rows shifted down."""
+        low_mask = (1 << position) - 1
+        bitmaps = {
+            key: (bits & low_mask) | ((bits >> (position + 1)) << position)
+            for key, bits in self._bitmaps.items()
+        }
+        return CatalogBitmapIndex(self.size - 1, bitmaps)
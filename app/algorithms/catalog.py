@@ -0,0 +1,464 @@
+"""
+Columnar exercise catalog used by the workout optimizer.
+
+Turns a list of exercises into parallel NumPy arrays so that filtering and
+scoring can be expressed as whole-array operations instead of a Python loop
+over ORM objects.  Categorical columns (muscle_group, equipment) are
+dictionary-encoded into integer codes.
+
+The module also keeps a process-local, versioned snapshot of the catalog.
+It is loaded with a column-restricted query and then patched in place of
+a reload whenever ``app.crud.exercise`` commits a change.  Snapshots are never
+mutated: every change publishes a new catalog with a higher ``version``.
+
+Versions are shared through the single-row ``catalog_version`` table, which
+every exercise write increments in its own transaction.  Before reusing the
+snapshot, :func:`get_catalog` reads that row (one primary-key lookup), so
+writes made by other worker processes or by ``python -m app.exercise_import``
+are picked up on the next call.
+"""
+
+import threading
+from array import array
+from typing import Callable, Iterable, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from app.algorithms.bitmap_index import CatalogBitmapIndex
+from app.models.catalog_version import CATALOG_VERSION_ID, CatalogVersion
+from app.models.exercise import Exercise
+
+# Rows fetched per round trip when streaming the catalog from the database
+CATALOG_LOAD_CHUNK = 10_000
+
+# Columns the optimizer reads; ``description`` and relationships are skipped.
+# ``ExerciseCatalog.from_rows`` relies on this order.
+CATALOG_COLUMNS = (
+    Exercise.id,
+    Exercise.name,
+    Exercise.muscle_group,
+    Exercise.equipment,
+    Exercise.difficulty,
+    Exercise.calories_burned,
+    Exercise.is_cardio,
+    Exercise.avg_duration,
+)
+
+
+class ExerciseCatalog:
+    """Immutable column store of exercises.
+
+    Attributes:
+        ids (np.ndarray): Exercise ids (int64)
+        names (List[str]): Exercise names, same order as ``ids``
+        difficulty (np.ndarray): Difficulty on the 1-10 scale (int64)
+        calories_burned (np.ndarray): Calories per minute (float64)
+        avg_duration (np.ndarray): Average duration in minutes (int64)
+        is_cardio (np.ndarray): Cardio flag (bool)
+        muscle_groups (np.ndarray): Muscle group vocabulary (object)
+        muscle_group_codes (np.ndarray): Index into ``muscle_groups`` per row
+        equipment (np.ndarray): Equipment vocabulary (object)
+        equipment_codes (np.ndarray): Index into ``equipment`` per row
+        version (int): Snapshot version the catalog was published as
+        bitmap_index (CatalogBitmapIndex, optional): Filter bitsets; built for
+            snapshots and carried over incrementally by ``with_exercise`` and
+            ``without_exercise``
+    """
+
+    __slots__ = (
+        "ids", "names", "difficulty", "calories_burned", "avg_duration",
+        "is_cardio", "muscle_groups", "muscle_group_codes",
+        "equipment", "equipment_codes", "version", "bitmap_index",
+    )
+
+    def __init__(
+            self,
+            ids: Sequence[int],
+            names: Sequence[str],
+            muscle_groups: Sequence[str],
+            equipment: Sequence[str],
+            difficulty: Sequence[int],
+            calories_burned: Sequence[float],
+            is_cardio: Sequence[bool],
+            avg_duration: Sequence[int],
+            version: int = 0,
+    ):
+        self.version = version
+        self.bitmap_index = None
+        self.ids = _frozen(np.asarray(ids, dtype=np.int64))
+        self.names = list(names)
+        self.difficulty = _frozen(np.asarray(difficulty, dtype=np.int64))
+        self.calories_burned = _frozen(np.asarray(calories_burned, dtype=np.float64))
+        self.avg_duration = _frozen(np.asarray(avg_duration, dtype=np.int64))
+        self.is_cardio = _frozen(np.asarray(is_cardio, dtype=bool))
+        self.muscle_groups, self.muscle_group_codes = _encode(muscle_groups)
+        self.equipment, self.equipment_codes = _encode(equipment)
+
+    @classmethod
+    def from_exercises(cls, exercises: Iterable[Exercise], version: int = 0) -> "ExerciseCatalog":
+        """Build a catalog from exercise objects or look-alikes.
+
+        Used for single ORM objects and tests; database loads stream
+        column-restricted rows through :meth:`from_rows` instead.
+        """
+        exercises = list(exercises)
+        return cls(
+            ids=[ex.id for ex in exercises],
+            names=[ex.name for ex in exercises],
+            muscle_groups=[ex.muscle_group for ex in exercises],
+            equipment=[ex.equipment for ex in exercises],
+            difficulty=[ex.difficulty or 0 for ex in exercises],
+            calories_burned=[ex.calories_burned or 0.0 for ex in exercises],
+            is_cardio=[bool(ex.is_cardio) for ex in exercises],
+            avg_duration=[ex.avg_duration or 0 for ex in exercises],
+            version=version,
+        )
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple], version: int = 0) -> "ExerciseCatalog":
+        """Build a catalog from ``CATALOG_COLUMNS`` tuples, streaming.
+
+        Rows are consumed one at a time into typed arrays (8 bytes per
+        numeric value, 1 per flag), so a streamed query result is never held
+        in memory as Python objects; only names and the categorical values
+        stay as Python strings.
+        """
+        ids, difficulty, avg_duration = array("q"), array("q"), array("q")
+        calories_burned, is_cardio = array("d"), bytearray()
+        names, muscle_groups, equipment = [], [], []
+        for row_id, name, muscle_group, row_equipment, row_difficulty, calories, cardio, duration in rows:
+            ids.append(row_id)
+            names.append(name)
+            muscle_groups.append(muscle_group)
+            equipment.append(row_equipment)
+            difficulty.append(row_difficulty or 0)
+            calories_burned.append(calories or 0.0)
+            is_cardio.append(bool(cardio))
+            avg_duration.append(duration or 0)
+        return cls(
+            ids=np.frombuffer(ids, dtype=np.int64),
+            names=names,
+            muscle_groups=muscle_groups,
+            equipment=equipment,
+            difficulty=np.frombuffer(difficulty, dtype=np.int64),
+            calories_burned=np.frombuffer(calories_burned, dtype=np.float64),
+            is_cardio=np.frombuffer(is_cardio, dtype=bool),
+            avg_duration=np.frombuffer(avg_duration, dtype=np.int64),
+            version=version,
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def position_of(self, exercise_id: int) -> Optional[int]:
+        """Catalog position of ``exercise_id`` or None if it is not present."""
+        found = np.flatnonzero(self.ids == exercise_id)
+        return int(found[0]) if len(found) else None
+
+    def with_exercise(self, exercise: Exercise, version: int) -> "ExerciseCatalog":
+        """Return a new catalog with ``exercise`` inserted or replaced.
+
+        An existing row keeps its position, a new one is appended, so
+        positions of the other exercises do not move.
+        """
+        position = self.position_of(exercise.id)
+        append = position is None
+        if append:
+            position = len(self)
+
+        def put(column, value, dtype):
+            column = np.append(column, np.zeros(1, dtype=dtype)) if append else column.copy()
+            column[position] = value
+            return _frozen(column)
+
+        muscle_groups, muscle_code = _code_for(self.muscle_groups, exercise.muscle_group)
+        equipment, equipment_code = _code_for(self.equipment, exercise.equipment)
+        names = list(self.names)
+        if append:
+            names.append(exercise.name)
+        else:
+            names[position] = exercise.name
+
+        catalog = object.__new__(ExerciseCatalog)
+        catalog.version = version
+        catalog.ids = put(self.ids, exercise.id, np.int64)
+        catalog.names = names
+        catalog.difficulty = put(self.difficulty, exercise.difficulty or 0, np.int64)
+        catalog.calories_burned = put(self.calories_burned, exercise.calories_burned or 0.0, np.float64)
+        catalog.avg_duration = put(self.avg_duration, exercise.avg_duration or 0, np.int64)
+        catalog.is_cardio = put(self.is_cardio, bool(exercise.is_cardio), bool)
+        catalog.muscle_groups = muscle_groups
+        catalog.muscle_group_codes = put(self.muscle_group_codes, muscle_code, np.int64)
+        catalog.equipment = equipment
+        catalog.equipment_codes = put(self.equipment_codes, equipment_code, np.int64)
+        catalog.bitmap_index = None
+        if self.bitmap_index is not None:
+            catalog.bitmap_index = self.bitmap_index.with_row(self, catalog, position)
+        return catalog
+
+    def without_exercise(self, exercise_id: int, version: int) -> "ExerciseCatalog":
+        """Return a new catalog with ``exercise_id`` removed.
+
+        Rows after the removed one shift down by one position.
+        """
+        position = self.position_of(exercise_id)
+        catalog = object.__new__(ExerciseCatalog)
+        catalog.version = version
+        for name in ("ids", "difficulty", "calories_burned", "avg_duration",
+                     "is_cardio", "muscle_group_codes", "equipment_codes"):
+            column = getattr(self, name)
+            if position is not None:
+                column = _frozen(np.delete(column, position))
+            setattr(catalog, name, column)
+        catalog.names = list(self.names)
+        if position is not None:
+            del catalog.names[position]
+        catalog.muscle_groups = self.muscle_groups
+        catalog.equipment = self.equipment
+        catalog.bitmap_index = self.bitmap_index
+        if self.bitmap_index is not None and position is not None:
+            catalog.bitmap_index = self.bitmap_index.without_row(position)
+        return catalog
+
+    def take(self, positions: np.ndarray) -> "ExerciseCatalog":
+        """Return a catalog of only the rows at ``positions``, in that order.
+
+        The vocabularies are shared and the bitmap index is dropped, so the
+        result is small to pickle: it is what routes send to worker processes.
+        """
+        catalog = object.__new__(ExerciseCatalog)
+        catalog.version = self.version
+        for name in ("ids", "difficulty", "calories_burned", "avg_duration",
+                     "is_cardio", "muscle_group_codes", "equipment_codes"):
+            setattr(catalog, name, _frozen(getattr(self, name)[positions]))
+        catalog.names = [self.names[position] for position in positions]
+        catalog.muscle_groups = self.muscle_groups
+        catalog.equipment = self.equipment
+        catalog.bitmap_index = None
+        return catalog
+
+    def muscle_group_mask(self, values: Iterable[str], positions=None) -> np.ndarray:
+        """Boolean mask of rows (all, or only ``positions``) whose muscle group is one of ``values``."""
+        codes = self.muscle_group_codes if positions is None else self.muscle_group_codes[positions]
+        return _membership(self.muscle_groups, codes, values)
+
+    def equipment_mask(self, values: Iterable[str], positions=None) -> np.ndarray:
+        """Boolean mask of rows (all, or only ``positions``) whose equipment is one of ``values``."""
+        codes = self.equipment_codes if positions is None else self.equipment_codes[positions]
+        return _membership(self.equipment, codes, values)
+
+    def muscle_group_codes_for(self, values: Iterable[str]) -> List[int]:
+        """Codes of the muscle groups in ``values`` that occur in the catalog."""
+        return np.flatnonzero(np.isin(self.muscle_groups, list(values or []))).tolist()
+
+    def build_bitmap_index(self) -> CatalogBitmapIndex:
+        """Build (once) and return the bitmap index of this catalog."""
+        if self.bitmap_index is None:
+            self.bitmap_index = CatalogBitmapIndex.build(self)
+        return self.bitmap_index
+
+    def muscle_group_of(self, index: int) -> str:
+        """Muscle group name of the row at ``index``."""
+        return self.muscle_groups[self.muscle_group_codes[index]]
+
+
+def _frozen(values: np.ndarray) -> np.ndarray:
+    """Mark an array read-only so a catalog can be shared safely."""
+    values.flags.writeable = False
+    return values
+
+
+def _encode(values: Sequence[str]):
+    """Dictionary-encode a categorical column into (vocabulary, codes)."""
+    column = np.asarray(["" if v is None else str(v) for v in values], dtype=object)
+    if len(column) == 0:
+        return _frozen(np.empty(0, dtype=object)), _frozen(np.empty(0, dtype=np.int64))
+    vocabulary, codes = np.unique(column, return_inverse=True)
+    return _frozen(vocabulary), _frozen(codes.astype(np.int64).ravel())
+
+
+def _code_for(vocabulary: np.ndarray, value: Optional[str]):
+    """Code of ``value`` in ``vocabulary``, extending the vocabulary if needed.
+
+    Returns:
+        tuple: (vocabulary, code); the vocabulary is a new array when extended
+    """
+    value = "" if value is None else str(value)
+    found = np.flatnonzero(vocabulary == value)
+    if len(found):
+        return vocabulary, int(found[0])
+    extended = np.append(vocabulary, np.array([value], dtype=object))
+    return _frozen(extended), len(vocabulary)
+
+
+def _membership(vocabulary: np.ndarray, codes: np.ndarray, values: Iterable[str]) -> np.ndarray:
+    """Mask of rows whose encoded value belongs to ``values``."""
+    wanted = np.flatnonzero(np.isin(vocabulary, list(values or [])))
+    if len(wanted) == 0:
+        return np.zeros(len(codes), dtype=bool)
+    return np.isin(codes, wanted)
+
+
+def take_names(catalog: ExerciseCatalog, indices: Iterable[int]) -> List[dict]:
+    """Map catalog positions back to ``{"id", "name"}`` dicts for the API."""
+    return [{"id": int(catalog.ids[i]), "name": catalog.names[i]} for i in indices]
+
+
+_snapshot_lock = threading.Lock()
+_snapshot: Optional[ExerciseCatalog] = None
+_snapshot_version = 0
+_change_listeners: List[Callable[[int], None]] = []
+
+
+def on_catalog_change(listener: Callable[[int], None]) -> None:
+    """Register ``listener(version)`` to be called after every catalog write."""
+    _change_listeners.append(listener)
+
+
+def _notify(version: int) -> None:
+    for listener in _change_listeners:
+        listener(version)
+
+
+def load_catalog(db: Session, version: int = 0) -> ExerciseCatalog:
+    """Stream the whole catalog with a column-restricted query (no ORM objects)."""
+    query = select(*CATALOG_COLUMNS).order_by(Exercise.id)
+    rows = db.execute(query.execution_options(yield_per=CATALOG_LOAD_CHUNK))
+    return ExerciseCatalog.from_rows(rows, version=version)
+
+
+def read_catalog_version(db: Session) -> int:
+    """Catalog version stored in the database (0 before the first write)."""
+    query = select(CatalogVersion.version).where(CatalogVersion.id == CATALOG_VERSION_ID)
+    return db.execute(query).scalar() or 0
+
+
+def bump_catalog_version(db: Session) -> int:
+    """Increment the stored catalog version in the caller's transaction.
+
+    Call it in the same transaction as the exercise write: the row lock
+    orders concurrent writers, so the returned number is exactly the version
+    that includes this write.
+
+    Returns:
+        int: The new version, to pass to :func:`apply_exercise_upsert` or
+        :func:`apply_exercise_delete` after the commit
+    """
+    table = CatalogVersion.__table__
+    version = db.execute(
+        update(table)
+        .where(table.c.id == CATALOG_VERSION_ID)
+        .values(version=table.c.version + 1)
+        .returning(table.c.version)
+    ).scalar()
+    if version is None:
+        # Tables created by create_all have no row yet
+        version = 1
+        db.execute(insert(table).values(id=CATALOG_VERSION_ID, version=version))
+    return version
+
+
+def sync_catalog_version(db: Session) -> int:
+    """Read the stored catalog version and drop a snapshot that is behind it.
+
+    Listeners are notified when the version changed, so caches keyed on the
+    version of this process (the plan cache) are cleared as well.
+
+    Returns:
+        int: The stored version
+    """
+    global _snapshot, _snapshot_version
+    version = read_catalog_version(db)
+    with _snapshot_lock:
+        changed = version != _snapshot_version
+        if changed:
+            _snapshot_version = version
+            if _snapshot is not None and _snapshot.version != version:
+                _snapshot = None
+    if changed:
+        _notify(version)
+    return version
+
+
+def get_catalog(db: Session) -> ExerciseCatalog:
+    """Return the current catalog snapshot, loading it when it is missing or stale.
+
+    The snapshot is reused only while its version matches the one stored in
+    the database.  The rows are loaded without holding ``_snapshot_lock``:
+    under ``AsyncSession.run_sync`` the query yields to the event loop, and a
+    second caller on the same loop thread must not block on the lock.
+    Concurrent cold starts may each load the catalog; the first one that is
+    still current is published, the others only serve their own call.
+
+    Args:
+        db: Database session; the version is checked on every call
+
+    Returns:
+        ExerciseCatalog: Immutable snapshot; ``version`` identifies it
+    """
+    global _snapshot
+    version = sync_catalog_version(db)
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+
+    # The version is read before the rows, so the snapshot is never labelled
+    # newer than its data; a write during the load only triggers a reload
+    snapshot = load_catalog(db, version=version)
+    snapshot.build_bitmap_index()
+
+    with _snapshot_lock:
+        if _snapshot is not None and _snapshot.version == _snapshot_version:
+            return _snapshot
+        if _snapshot_version == version:
+            _snapshot = snapshot
+    return snapshot
+
+
+def invalidate_catalog() -> None:
+    """Drop the snapshot; the next ``get_catalog`` call reloads it."""
+    global _snapshot
+    with _snapshot_lock:
+        _snapshot = None
+        version = _snapshot_version
+    _notify(version)
+
+
+def apply_exercise_upsert(exercise: Exercise, version: int) -> None:
+    """Publish a new snapshot with a created or updated exercise.
+
+    Args:
+        exercise: The committed exercise
+        version: Version returned by :func:`bump_catalog_version` for this write
+    """
+    _apply(lambda snapshot: snapshot.with_exercise(exercise, version), version)
+
+
+def apply_exercise_delete(exercise_id: int, version: int) -> None:
+    """Publish a new snapshot without a deleted exercise.
+
+    Args:
+        exercise_id: ID of the deleted exercise
+        version: Version returned by :func:`bump_catalog_version` for this write
+    """
+    _apply(lambda snapshot: snapshot.without_exercise(exercise_id, version), version)
+
+
+def _apply(patch: Callable[[ExerciseCatalog], ExerciseCatalog], version: int) -> None:
+    # The snapshot is patched only if it is exactly one write behind;
+    # otherwise it misses writes of other processes and is reloaded instead
+    global _snapshot, _snapshot_version
+    with _snapshot_lock:
+        if _snapshot is not None and _snapshot.version == version - 1:
+            _snapshot = patch(_snapshot)
+        else:
+            _snapshot = None
+        _snapshot_version = max(_snapshot_version, version)
+    _notify(version)
+
+
+def catalog_version() -> int:
+    """Latest catalog version this process has read from the database."""
+    return _snapshot_version
@@ -0,0 +1,105 @@
+"""
+Process pool for running the CPU-bound part of plan optimization.
+
+Async routes hand plain data (a candidate :class:`ExerciseCatalog`, params as
+a dict, a user profile) to worker processes and await the result, so the
+event loop keeps serving auth and CRUD traffic while plans are computed.
+The number of in-flight jobs is bounded and every job has a timeout.
+
+Workers are started with the ``forkserver`` method (``spawn`` where it is not
+available): forking the server process itself would copy its threads' locks
+and the event loop in whatever state they are in at that moment.
+"""
+
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Callable, Optional
+
+from app.core.config import settings
+
+
+def _mp_context():
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+class OptimizerBusyError(Exception):
+    """Raised when the pool already has ``max_pending`` jobs in flight."""
+
+
+class OptimizerPool:
+    """Bounded, lazily started process pool.
+
+    Attributes:
+        max_workers (int): Worker processes; 0 runs jobs in the default thread pool
+        max_pending (int): Jobs allowed in flight (running or queued) at once
+        timeout (float): Seconds to wait for a job before giving up
+    """
+
+    def __init__(self, max_workers: int, max_pending: int, timeout: float):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        """Jobs currently in flight."""
+        return self._pending
+
+    def _get_executor(self) -> Optional[Executor]:
+        if self.max_workers <= 0:
+            return None
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=_mp_context())
+            return self._executor
+
+    def _release(self, _future=None) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    async def run(self, func: Callable, *args):
+        """Run ``func(*args)`` in the pool and await its result.
+
+        The slot is held until the job really finishes, even after a timeout,
+        so abandoned jobs still count against ``max_pending``.
+
+        Raises:
+            OptimizerBusyError: If ``max_pending`` jobs are already in flight
+            asyncio.TimeoutError: If the job takes longer than ``timeout``
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise OptimizerBusyError(
+                    f"Optimizer queue is full ({self.max_pending} jobs in flight)"
+                )
+            self._pending += 1
+
+        try:
+            future = asyncio.get_running_loop().run_in_executor(self._get_executor(), func, *args)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+
+        # shield: a timeout stops the wait, not the bookkeeping on the future
+        return await asyncio.wait_for(asyncio.shield(future), self.timeout)
+
+    def shutdown(self) -> None:
+        """Stop the worker processes (called on application shutdown)."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+optimizer_pool = OptimizerPool(
+    max_workers=settings.optimizer_workers,
+    max_pending=settings.optimizer_max_pending,
+    timeout=settings.optimizer_timeout_seconds,
+)
@@ -0,0 +1,199 @@
+"""
+Per-stage timing and counters for the workout optimizer.
+
+``optimize_workout_plan`` and the optimize routes ask :func:`start_trace`
+for a trace at the start of every call.  With no sink registered they get
+``None`` and each stage costs one ``if`` check.  Otherwise the trace
+records the wall time of every stage (time since the previous stage
+ended), the cardinalities reported with it and whether the plan came from
+the cache, and hands itself to every sink when the call finishes.
+
+Routes time the cache lookup and candidate loading themselves.  The
+worker process times filtering, scoring and selection
+(``solve_plan(..., traced=True)``) and returns those stages with the
+plan; :meth:`OptimizerTrace.merge` appends them to the route's trace.
+
+Sinks are objects with a ``record(trace)`` method:
+
+    LogSink        - one log line per call
+    HistogramSink  - in-process latency histograms and counters, served by
+                     ``GET /workouts/optimize/metrics``
+
+``settings.optimizer_metrics_sinks`` (comma-separated: ``log``,
+``histogram``) selects the sinks registered at startup; more can be added
+with :func:`add_sink`.
+"""
+
+import bisect
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+LATENCY_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+class OptimizerTrace:
+    """Timings and counters of one optimizer call.
+
+    Attributes:
+        stages (Dict[str, float]): Wall time per stage, ms, in stage order
+        counts (Dict[str, int]): Cardinalities (catalog, filtered, selected, ...)
+        cache_hit (bool): Whether the plan came from the plan cache
+    """
+
+    __slots__ = ("stages", "counts", "cache_hit", "_started", "_last")
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self.cache_hit = False
+        self._started = self._last = time.perf_counter()
+
+    def stage(self, name: str, **counts: int) -> None:
+        """Close stage ``name`` (it ran since the previous stage) and record ``counts``."""
+        now = time.perf_counter()
+        self.stages[name] = (now - self._last) * 1000
+        self._last = now
+        self.counts.update(counts)
+
+    def merge(self, remote: dict, overhead_stage: str = "pool") -> None:
+        """Append the stages of a trace recorded in a worker process.
+
+        ``remote`` is the worker's :meth:`to_dict`.  The part of the time
+        since the previous stage that the worker stages do not cover
+        (queueing, pickling) is recorded as ``overhead_stage``.
+        """
+        now = time.perf_counter()
+        elapsed = (now - self._last) * 1000
+        self.stages[overhead_stage] = max(0.0, elapsed - sum(remote["stages"].values()))
+        self.stages.update(remote["stages"])
+        self.counts.update(remote["counts"])
+        self._last = now
+
+    def to_dict(self) -> dict:
+        """Stages and counts as plain data, to return from a worker process"""
+        return {"stages": dict(self.stages), "counts": dict(self.counts)}
+
+    @property
+    def total_ms(self) -> float:
+        """Wall time from the start of the call to the last stage"""
+        return (self._last - self._started) * 1000
+
+    def finish(self) -> None:
+        """Hand the trace to every registered sink."""
+        for sink in _sinks:
+            try:
+                sink.record(self)
+            except Exception:  # a broken sink must not fail plan generation
+                logger.exception("Optimizer metrics sink %r failed", sink)
+
+
+class LogSink:
+    """Writes one INFO line per optimizer call."""
+
+    def __init__(self, log: logging.Logger = logger):
+        self.log = log
+
+    def record(self, trace: OptimizerTrace) -> None:
+        stages = " ".join(f"{name}={ms:.3f}ms" for name, ms in trace.stages.items())
+        counts = " ".join(f"{name}={value}" for name, value in trace.counts.items())
+        self.log.info(
+            "optimize_workout_plan total=%.3fms cache_hit=%s %s %s",
+            trace.total_ms, trace.cache_hit, stages, counts
+        )
+
+
+class HistogramSink:
+    """Accumulates per-stage latency histograms and counters in process."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._calls = 0
+            self._cache_hits = 0
+            self._histograms: Dict[str, List[int]] = {}
+            self._sums: Dict[str, float] = {}
+            self._counts: Dict[str, int] = {}
+
+    def _observe(self, name: str, ms: float) -> None:
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            histogram = self._histograms[name] = [0] * (len(self.buckets) + 1)
+            self._sums[name] = 0.0
+        histogram[bisect.bisect_left(self.buckets, ms)] += 1
+        self._sums[name] += ms
+
+    def record(self, trace: OptimizerTrace) -> None:
+        with self._lock:
+            self._calls += 1
+            self._cache_hits += trace.cache_hit
+            for name, ms in trace.stages.items():
+                self._observe(name, ms)
+            self._observe("total", trace.total_ms)
+            for name, value in trace.counts.items():
+                self._counts[name] = self._counts.get(name, 0) + value
+
+    def snapshot(self) -> dict:
+        """Counters and cumulative histograms (``le`` = bucket upper bound, ms)."""
+        with self._lock:
+            stages = {}
+            for name, histogram in self._histograms.items():
+                cumulative, buckets = 0, {}
+                for bound, count in zip(self.buckets + ("+Inf",), histogram):
+                    cumulative += count
+                    buckets[str(bound)] = cumulative
+                stages[name] = {
+                    "count": cumulative,
+                    "sum_ms": round(self._sums[name], 3),
+                    "buckets": buckets,
+                }
+            return {
+                "calls": self._calls,
+                "cache_hits": self._cache_hits,
+                "cardinality_totals": dict(self._counts),
+                "stages": stages,
+            }
+
+
+_sinks: list = []
+
+# Always available to the metrics endpoint; registered only when enabled
+optimizer_histograms = HistogramSink()
+
+
+def add_sink(sink) -> None:
+    """Register a sink; from now on optimizer calls are traced."""
+    _sinks.append(sink)
+
+
+def remove_sink(sink) -> None:
+    """Unregister a sink; with none left tracing is disabled."""
+    _sinks.remove(sink)
+
+
+def start_trace() -> Optional[OptimizerTrace]:
+    """A new trace, or ``None`` when no sink is registered"""
+    return OptimizerTrace() if _sinks else None
+
+
+def _configure(names: str) -> None:
+    for name in filter(None, (part.strip() for part in names.split(","))):
+        if name == "log":
+            add_sink(LogSink())
+        elif name == "histogram":
+            add_sink(optimizer_histograms)
+        else:
+            raise ValueError(f"Unknown optimizer metrics sink {name!r}, expected 'log' or 'histogram'")
+
+
+_configure(settings.optimizer_metrics_sinks)
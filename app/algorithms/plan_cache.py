@@ -0,0 +1,142 @@
+"""
+Memoization of optimized workout plans.
+
+Plans are a pure function of the optimization parameters, the user inputs
+the optimizer reads (fitness level and preferences) and the catalog version,
+so identical requests can be served from a bounded LRU cache with a TTL.
+Catalog writes clear the cache; the version in the key additionally guarantees
+that a plan built from an older catalog is never returned.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+from app.algorithms import catalog
+from app.core.config import settings
+from app.models.user import User as DBUser
+from app.schemas.workout import WorkoutOptimizationParams, WorkoutPlan
+
+
+class PlanCache:
+    """Thread-safe LRU cache of workout plans with per-entry expiry.
+
+    Attributes:
+        maxsize (int): Maximum number of cached plans
+        ttl (float): Lifetime of an entry in seconds
+        hits (int): Lookups served from the cache
+        misses (int): Lookups that found nothing or an expired entry
+        evictions (int): Entries dropped to stay within ``maxsize``
+        expirations (int): Entries dropped because their TTL passed
+        invalidations (int): Number of full clears caused by catalog writes
+    """
+
+    def __init__(
+            self,
+            maxsize: int = 1024,
+            ttl: float = 300.0,
+            clock: Callable[[], float] = time.monotonic
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Optional[WorkoutPlan]:
+        """Return a copy of the cached plan for ``key`` or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, plan = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return plan.copy(deep=True)
+
+    def put(self, key: Hashable, plan: WorkoutPlan) -> None:
+        """Store a copy of ``plan`` under ``key``, evicting the oldest entries."""
+        if self.maxsize <= 0:
+            return
+        entry = (self._clock() + self.ttl, plan.copy(deep=True))
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        """Counters for sizing the cache."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+def _freeze(value):
+    """Turn lists/sets/dicts into hashable, order-independent equivalents."""
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return frozenset(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return frozenset((k, _freeze(v)) for k, v in value.items())
+    return value
+
+
+# Tuning knobs that are not part of the key: ``top_k`` and ``beam_width`` only
+# shape ``optimize_alternative_plans``, whose results are not cached, and
+# ``refine_deadline_ms`` is a time budget rather than an input of the plan
+_TUNING_PARAMS = {"top_k", "beam_width", "refine_deadline_ms"}
+
+
+def plan_cache_key(
+        params: WorkoutOptimizationParams,
+        user: DBUser,
+        catalog_version: int
+) -> tuple:
+    """Cache key: normalized params, the user inputs the optimizer reads, catalog version.
+
+    Tuning knobs (``_TUNING_PARAMS``) are left out, so requests that differ
+    only in them share an entry.  Whether refinement runs at all stays in
+    the key: a refined plan carries ``refinement`` stats and may pick
+    different exercises.
+    """
+    return (
+        _freeze(params.dict(exclude=_TUNING_PARAMS)),
+        params.refine_deadline_ms is not None,
+        getattr(user, "fitness_level", None),
+        _freeze(getattr(user, "preferred_equipment", None) or []),
+        _freeze(getattr(user, "favorite_muscle_groups", None) or []),
+        catalog_version,
+    )
+
+
+plan_cache = PlanCache(maxsize=settings.plan_cache_size, ttl=settings.plan_cache_ttl_seconds)
+catalog.on_catalog_change(lambda version: plan_cache.clear())
@@ -0,0 +1,123 @@
+"""
+Multi-week periodized program generation.
+
+Produces a training program lazily, one session at a time, as a generator.
+Filtering and scoring from :mod:`app.algorithms.workout_optimizer` run once
+for the whole program; every session then only re-weights those base scores
+with the state carried over from the previous sessions:
+
+    - recovery: a muscle group is not trained again until it has had
+      ``RECOVERY_DAYS`` days of rest (a session can become a rest day);
+    - weekly volume: groups behind their weekly minutes target get a bonus;
+    - split: when sessions come more often than groups recover, each session
+      focuses on the recovered groups furthest behind their volume target.
+
+Session length follows a 3:1 loading cycle (three progressively harder
+weeks, then a deload week).
+"""
+
+import math
+from typing import Iterator
+
+import numpy as np
+
+from app.algorithms.catalog import ExerciseCatalog
+from app.algorithms.workout_optimizer import (
+    _build_workout_plan,
+    _filter_exercises,
+    _optimize_order,
+    _score_exercises,
+    _selection_strategy,
+)
+from app.models.user import User as DBUser
+from app.schemas.workout import ProgramSession, WorkoutProgramParams
+
+# Days of rest a muscle group needs before it is trained again
+RECOVERY_DAYS = 2
+
+# Session length multiplier for each week of the 4-week loading cycle
+WEEKLY_LOAD_CYCLE = (0.9, 1.0, 1.1, 0.7)
+
+# Score bonus for a muscle group that has done none of its weekly volume yet
+VOLUME_DEFICIT_WEIGHT = 0.5
+
+
+def generate_program(
+        catalog: ExerciseCatalog,
+        params: WorkoutProgramParams,
+        user: DBUser
+) -> Iterator[ProgramSession]:
+    """
+    Generate a multi-week program session by session.
+
+    Args:
+        catalog: Exercise catalog (snapshot or SQL-filtered candidates)
+        params: Program parameters (goal, base session time, weeks, sessions per week)
+        user: User object with fitness level and preferences
+
+    Yields:
+        ProgramSession: The next session; nothing is computed ahead of time
+    """
+    candidates = _filter_exercises(catalog, params, user)
+    base_scores = _score_exercises(catalog, candidates, params, user)
+    select_exercises = _selection_strategy(params.selection_mode)
+
+    codes = catalog.muscle_group_codes[candidates]
+    group_count = len(catalog.muscle_groups)
+
+    # Weekly volume is split over the target muscles, or over every group on offer
+    target_codes = catalog.muscle_group_codes_for(params.target_muscles)
+    if params.goal != "muscle_gain" or not target_codes:
+        target_codes = np.unique(codes).tolist()
+    target_share = np.zeros(group_count)
+    if target_codes:
+        target_share[target_codes] = 1.0 / len(target_codes)
+
+    # Share of the groups one session can train so that all of them fit in
+    # between their recovery periods
+    session_gap = 7 / params.sessions_per_week
+    focus_size = max(1, math.ceil(len(target_codes) * min(1.0, session_gap / RECOVERY_DAYS)))
+
+    last_trained = np.full(group_count, -np.inf)
+
+    for week in range(params.weeks):
+        load = WEEKLY_LOAD_CYCLE[week % len(WEEKLY_LOAD_CYCLE)]
+        session_time = max(1, int(round(params.available_time * load)))
+        weekly_target = target_share * session_time * params.sessions_per_week
+        weekly_done = np.zeros(group_count)
+
+        for session in range(params.sessions_per_week):
+            day = week * 7 + session * 7 // params.sessions_per_week
+
+            # Re-weight the base scores with the carried-over state
+            recovery = (day - last_trained >= RECOVERY_DAYS).astype(np.float64)
+            deficit = np.divide(
+                weekly_target - weekly_done, weekly_target,
+                out=np.zeros(group_count), where=weekly_target > 0
+            ).clip(0.0, 1.0)
+            group_weight = recovery * (1.0 + VOLUME_DEFICIT_WEIGHT * deficit)
+
+            # Focus on the groups furthest behind, longest rested first on ties
+            eligible = np.flatnonzero(group_weight > 0)
+            rest = np.minimum(day - last_trained[eligible], 1e6)
+            focus = eligible[np.lexsort((-rest, -group_weight[eligible]))[:focus_size]]
+            focused = np.zeros(group_count)
+            focused[focus] = 1.0
+            scores = base_scores * (group_weight * focused)[codes]
+
+            available = scores > 0
+            selected = select_exercises(catalog, candidates[available], scores[available], session_time)
+            ordered = _optimize_order(catalog, selected)
+
+            # Carry the state forward to the next session
+            if selected:
+                selected_codes = catalog.muscle_group_codes[selected]
+                last_trained[selected_codes] = day
+                np.add.at(weekly_done, selected_codes, catalog.avg_duration[selected])
+
+            yield ProgramSession(
+                week=week + 1,
+                day=day + 1,
+                session=session + 1,
+                plan=_build_workout_plan(catalog, ordered),
+            )
@@ -4,16 +4,76 @@ Advanced workout optimization algorithm module.
 Implements a multi-criteria optimization algorithm for generating optimal
 workout plans based on user goals, fitness level, and available time.
 Uses a combination of knapsack algorithm and muscle group balancing.
+
+The filtering and scoring stages run on a columnar
+:class:`~app.algorithms.catalog.ExerciseCatalog`, so each stage is a handful
+of NumPy operations over the whole catalog rather than a loop over ORM objects.
+Stages exchange integer positions into the catalog.  The catalog itself is
+the process-wide snapshot from :func:`~app.algorithms.catalog.get_catalog`,
+so a plan request does not scan the exercises table.  With the snapshot
+disabled (``settings.optimizer_catalog_snapshot``) the goal and fitness level
+filters are pushed down into SQL instead, see :func:`candidate_query`.
 """
 
-from typing import List
+import time
+from typing import List, NamedTuple, Optional, Tuple
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from app.schemas.workout import WorkoutPlan, WorkoutOptimizationParams
+from sqlalchemy.sql import Select
+from app.core.config import settings
+from app.schemas.workout import RefinementStats, WorkoutPlan, WorkoutOptimizationParams
 from app.models.user import User as DBUser
 from app.models.exercise import Exercise
+from app.algorithms.catalog import (
+    CATALOG_COLUMNS,
+    CATALOG_LOAD_CHUNK,
+    ExerciseCatalog,
+    catalog_version,
+    get_catalog,
+    load_catalog,
+    sync_catalog_version,
+    take_names,
+)
+from app.algorithms.instrumentation import OptimizerTrace, start_trace
+from app.algorithms.plan_cache import plan_cache, plan_cache_key
 import numpy as np
 from collections import defaultdict
 
+# Maximum difficulty allowed for each fitness level (advanced is unrestricted)
+FITNESS_LEVEL_MAX_DIFFICULTY = {"beginner": 3, "intermediate": 7}
+
+# Minimum calories per minute for the weight loss goal (integer, see _filter_with_bitmaps)
+WEIGHT_LOSS_MIN_CALORIES = 5
+
+# Maximum number of exercises per muscle group in a plan
+MAX_PER_MUSCLE_GROUP = 2
+
+# Estimated minutes lost between consecutive exercises (see _optimize_order)
+EQUIPMENT_CHANGE_MINUTES = 2.0
+MUSCLE_GROUP_REPEAT_MINUTES = 1.5
+CARDIO_SWITCH_MINUTES = 1.0
+
+# Upper bound on 2-opt improvement steps when ordering a plan
+TWO_OPT_MAX_ITERATIONS = 50
+
+# Weight of the muscle balance term (0 = one group, ->1 = evenly spread) in refinement
+MUSCLE_BALANCE_WEIGHT = 2.0
+
+
+class UserProfile(NamedTuple):
+    """User inputs the optimizer reads, as plain picklable data"""
+    fitness_level: Optional[str] = None
+    preferred_equipment: Tuple[str, ...] = ()
+    favorite_muscle_groups: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_user(cls, user: DBUser) -> "UserProfile":
+        return cls(
+            fitness_level=getattr(user, "fitness_level", None),
+            preferred_equipment=tuple(getattr(user, "preferred_equipment", None) or ()),
+            favorite_muscle_groups=tuple(getattr(user, "favorite_muscle_groups", None) or ()),
+        )
+
 
 def optimize_workout_plan(
         db: Session,
@@ -35,108 +95,451 @@ def optimize_workout_plan(
         1. Filters exercises by user criteria
         2. Scores each exercise based on multiple factors
         3. Uses modified knapsack algorithm with muscle group balancing
-        4. Optimizes exercise order for maximum efficiency
+           (greedy by default, exact dynamic program with
+           ``selection_mode="exact"``)
+        4. Orders exercises to minimize transition time (equipment changes,
+           muscle group repeats, cardio/strength switches)
     """
+    # Stage timings and counters, None when no metrics sink is registered
+    trace = start_trace()
+
+    # Identical inputs on the same catalog version give the same plan
+    if settings.optimizer_catalog_snapshot:
+        catalog = get_catalog(db)
+        version = catalog.version
+    else:
+        catalog = None
+        version = sync_catalog_version(db)
+    cache_key = plan_cache_key(params, user, version)
+    plan = plan_cache.get(cache_key)
+    if plan is not None:
+        if trace:
+            trace.cache_hit = True
+            trace.stage("cache", selected=len(plan.exercises))
+            trace.finish()
+        return plan
+
     # 1. Get and filter exercises
-    exercises = db.query(Exercise).all()
-    exercises = _filter_exercises(exercises, params, user)
+    if catalog is None:
+        catalog = load_candidate_catalog(db, params, user)
+    if trace:
+        trace.stage("load", catalog=len(catalog))
+    candidates = _filter_exercises(catalog, params, user)
+    if trace:
+        trace.stage("filter", filtered=len(candidates))
 
     # 2. Score exercises based on multiple criteria
-    scored_exercises = _score_exercises(exercises, params, user)
+    scores = _score_exercises(catalog, candidates, params, user)
+    if trace:
+        trace.stage("score")
+
+    # 3-5. Select, order and measure
+    plan = _plan_from_candidates(catalog, candidates, scores, params, trace)
+    plan_cache.put(cache_key, plan)
+    if trace:
+        trace.finish()
+    return plan
+
+
+def optimize_workout_plans(
+        db: Session,
+        requests: List[Tuple[DBUser, WorkoutOptimizationParams]]
+) -> List[WorkoutPlan]:
+    """
+    Optimize plans for many users in one pass over the catalog.
+
+    The catalog is read once.  Requests with the same filter key (goal,
+    fitness level, target muscles) share one filtered candidate set, and
+    requests that also have the same user preferences share the scores.
+    Plans already in the plan cache are returned without recomputation.
+
+    Args:
+        db: Database session
+        requests: (user, params) pairs
+
+    Returns:
+        List[WorkoutPlan]: One plan per request, in request order
+    """
+    if settings.optimizer_catalog_snapshot:
+        catalog = get_catalog(db)
+    else:
+        catalog = load_catalog(db, version=catalog_version())
+    candidate_sets = {}
+    score_sets = {}
+    plans = []
+
+    for user, params in requests:
+        cache_key = plan_cache_key(params, user, catalog.version)
+        plan = plan_cache.get(cache_key)
+        if plan is not None:
+            plans.append(plan)
+            continue
+
+        filter_key = _filter_key(params, user)
+        candidates = candidate_sets.get(filter_key)
+        if candidates is None:
+            candidates = _filter_exercises(catalog, params, user)
+            candidate_sets[filter_key] = candidates
 
+        score_key = (filter_key, _preference_key(user))
+        scores = score_sets.get(score_key)
+        if scores is None:
+            scores = _score_exercises(catalog, candidates, params, user)
+            score_sets[score_key] = scores
+
+        plan = _plan_from_candidates(catalog, candidates, scores, params)
+        plan_cache.put(cache_key, plan)
+        plans.append(plan)
+
+    return plans
+
+
+def solve_plan(catalog: ExerciseCatalog, params: dict, profile: UserProfile, traced: bool = False) -> dict:
+    """
+    Compute a plan from plain data; entry point for worker processes.
+
+    Args:
+        catalog: Candidate catalog (usually from :func:`candidate_query`)
+        params: ``WorkoutOptimizationParams`` as a dict
+        profile: User fitness level and preferences
+        traced: Time the stages and return them under the ``"trace"`` key
+            (see :meth:`OptimizerTrace.merge`)
+
+    Returns:
+        dict: ``WorkoutPlan`` as a dict
+    """
+    return solve_plans([(catalog, params, profile)], traced)[0]
+
+
+def solve_plans(requests: List[Tuple[ExerciseCatalog, dict, UserProfile]], traced: bool = False) -> List[dict]:
+    """
+    :func:`optimize_workout_plans` on plain data; entry point for worker processes.
+
+    Requests that share a candidate catalog object and a filter key share
+    the filtered candidates, and with the same preferences also the scores.
+
+    Args:
+        requests: (candidate catalog, params as a dict, user profile) triples
+        traced: Time the stages of every plan, as in :func:`solve_plan`
+
+    Returns:
+        List[dict]: One ``WorkoutPlan`` dict per request, in request order
+    """
+    candidate_sets = {}
+    score_sets = {}
+    plans = []
+
+    for catalog, params, profile in requests:
+        trace = OptimizerTrace() if traced else None
+        params = WorkoutOptimizationParams(**params)
+        filter_key = (id(catalog), _filter_key(params, profile))
+        candidates = candidate_sets.get(filter_key)
+        if candidates is None:
+            candidates = _filter_exercises(catalog, params, profile)
+            candidate_sets[filter_key] = candidates
+        if trace:
+            trace.stage("filter", filtered=len(candidates))
+
+        score_key = (filter_key, _preference_key(profile))
+        scores = score_sets.get(score_key)
+        if scores is None:
+            scores = _score_exercises(catalog, candidates, params, profile)
+            score_sets[score_key] = scores
+        if trace:
+            trace.stage("score")
+
+        plan = _plan_from_candidates(catalog, candidates, scores, params, trace).dict()
+        if trace:
+            plan["trace"] = trace.to_dict()
+        plans.append(plan)
+
+    return plans
+
+
+def optimize_alternative_plans(
+        db: Session,
+        params: WorkoutOptimizationParams,
+        user: DBUser
+) -> List[WorkoutPlan]:
+    """
+    Optimize up to ``params.top_k`` distinct plans, best first.
+
+    Filtering and scoring run once; a single bounded beam search
+    (``params.beam_width``) then yields all the plans, see
+    :func:`_top_k_selections`.
+
+    Args:
+        db: Database session
+        params: Workout optimization parameters
+        user: User object with fitness level and preferences
+
+    Returns:
+        List[WorkoutPlan]: Plans that differ by at least one exercise
+    """
+    if settings.optimizer_catalog_snapshot:
+        catalog = get_catalog(db)
+    else:
+        catalog = load_candidate_catalog(db, params, user)
+    candidates = _filter_exercises(catalog, params, user)
+    scores = _score_exercises(catalog, candidates, params, user)
+    return _alternatives_from_candidates(catalog, candidates, scores, params)
+
+
+def solve_alternatives(catalog: ExerciseCatalog, params: dict, profile: UserProfile) -> List[dict]:
+    """:func:`optimize_alternative_plans` on plain data; entry point for worker processes."""
+    params = WorkoutOptimizationParams(**params)
+    candidates = _filter_exercises(catalog, params, profile)
+    scores = _score_exercises(catalog, candidates, params, profile)
+    return [plan.dict() for plan in _alternatives_from_candidates(catalog, candidates, scores, params)]
+
+
+def _plan_from_candidates(
+        catalog: ExerciseCatalog,
+        candidates: np.ndarray,
+        scores: np.ndarray,
+        params: WorkoutOptimizationParams,
+        trace: Optional[OptimizerTrace] = None
+) -> WorkoutPlan:
+    """Run selection, ordering and plan building on scored candidates"""
     # 3. Optimize selection using modified knapsack algorithm
-    selected_exercises = _optimize_selection(scored_exercises, params.available_time)
+    select_exercises = _selection_strategy(params.selection_mode)
+    selected = select_exercises(catalog, candidates, scores, params.available_time)
+    if trace:
+        trace.stage("selection", selected=len(selected))
+
+    # 3b. Optionally improve the selection until the deadline
+    refinement = None
+    if params.refine_deadline_ms is not None:
+        selected, refinement = _refine_selection(
+            catalog, candidates, scores, selected, params.available_time, params.refine_deadline_ms
+        )
+        if trace:
+            trace.stage("refinement", selected=len(selected))
 
     # 4. Optimize exercise order
-    optimized_order = _optimize_order(selected_exercises)
+    optimized_order = _optimize_order(catalog, selected)
+    if trace:
+        trace.stage("order")
 
     # 5. Calculate plan metrics
-    return _build_workout_plan(optimized_order)
+    plan = _build_workout_plan(catalog, optimized_order)
+    plan.refinement = refinement
+    if trace:
+        trace.stage("build")
+    return plan
+
+
+def _alternatives_from_candidates(
+        catalog: ExerciseCatalog,
+        candidates: np.ndarray,
+        scores: np.ndarray,
+        params: WorkoutOptimizationParams
+) -> List[WorkoutPlan]:
+    """Beam search for the top-k selections, then order and build each plan"""
+    selections = _top_k_selections(
+        catalog, candidates, scores, params.available_time, params.top_k, params.beam_width
+    )
+    return [
+        _build_workout_plan(catalog, _optimize_order(catalog, selected))
+        for selected in selections
+    ]
+
+
+def _filter_key(params: WorkoutOptimizationParams, user: DBUser) -> tuple:
+    """Inputs that fully determine the result of ``_filter_exercises``"""
+    return (
+        params.goal,
+        getattr(user, "fitness_level", None),
+        frozenset(params.target_muscles),
+    )
+
+
+def _preference_key(user: DBUser) -> tuple:
+    """User preference inputs read by ``_score_exercises``"""
+    return (
+        frozenset(getattr(user, "preferred_equipment", None) or []),
+        frozenset(getattr(user, "favorite_muscle_groups", None) or []),
+    )
+
+
+def candidate_query(params: WorkoutOptimizationParams, user: DBUser) -> Select:
+    """SQL counterpart of ``_filter_exercises``.
+
+    Selects only the columns the optimizer reads, restricted by the same goal
+    and fitness level predicates, so the database returns candidates only.
+    The predicates are served by the indexes on ``exercises``
+    (is_cardio, difficulty) and (muscle_group, difficulty).
+    """
+    query = select(*CATALOG_COLUMNS)
+
+    # Filter by goal
+    if params.goal == "weight_loss":
+        query = query.where(Exercise.calories_burned >= WEIGHT_LOSS_MIN_CALORIES)
+    elif params.goal == "muscle_gain":
+        query = query.where(Exercise.muscle_group.in_(params.target_muscles))
+    elif params.goal == "endurance":
+        query = query.where(Exercise.is_cardio.is_(True))
+
+    # Filter by fitness level
+    max_difficulty = FITNESS_LEVEL_MAX_DIFFICULTY.get(getattr(user, "fitness_level", None))
+    if max_difficulty is not None:
+        query = query.where(Exercise.difficulty <= max_difficulty)
+
+    return query.order_by(Exercise.id)
+
+
+def load_candidate_catalog(
+        db: Session,
+        params: WorkoutOptimizationParams,
+        user: DBUser
+) -> ExerciseCatalog:
+    """Load only the candidate exercises for ``params``/``user`` from the database."""
+    rows = db.execute(candidate_query(params, user).execution_options(yield_per=CATALOG_LOAD_CHUNK))
+    return ExerciseCatalog.from_rows(rows, version=catalog_version())
+
+
+def snapshot_candidates(
+        catalog: ExerciseCatalog,
+        params: WorkoutOptimizationParams,
+        user: DBUser
+) -> ExerciseCatalog:
+    """Filter the snapshot ``catalog`` (bitmap index) down to the candidate rows.
+
+    The snapshot counterpart of :func:`candidate_query`: routes call it before
+    handing work to :data:`~app.algorithms.executor.optimizer_pool`, so
+    only the candidate arrays are pickled to the worker process.
+    """
+    return catalog.take(_filter_exercises(catalog, params, user))
 
 
 def _filter_exercises(
-        exercises: List[Exercise],
+        catalog: ExerciseCatalog,
         params: WorkoutOptimizationParams,
         user: DBUser
-) -> List[Exercise]:
-    """Filter exercises based on user criteria"""
-    filtered = []
+) -> np.ndarray:
+    """Filter exercises based on user criteria.
 
-    for ex in exercises:
-        # Filter by goal
-        if params.goal == "weight_loss" and ex.calories_burned < 5:
-            continue
-        if params.goal == "muscle_gain" and ex.muscle_group not in params.target_muscles:
-            continue
-        if params.goal == "endurance" and not ex.is_cardio:
-            continue
+    Uses the catalog's bitmap index when it has one (catalog snapshots do),
+    otherwise evaluates the same predicates on the columns.
 
-        # Filter by fitness level
-        if user.fitness_level == "beginner" and ex.difficulty > 3:
-            continue
-        if user.fitness_level == "intermediate" and ex.difficulty > 7:
-            continue
+    Returns:
+        np.ndarray: Catalog positions of the exercises that pass all filters
+    """
+    max_difficulty = FITNESS_LEVEL_MAX_DIFFICULTY.get(getattr(user, "fitness_level", None))
+    if catalog.bitmap_index is not None:
+        return _filter_with_bitmaps(catalog, params, max_difficulty)
+
+    mask = np.ones(len(catalog), dtype=bool)
+
+    # Filter by goal
+    if params.goal == "weight_loss":
+        mask &= catalog.calories_burned >= WEIGHT_LOSS_MIN_CALORIES
+    elif params.goal == "muscle_gain":
+        mask &= catalog.muscle_group_mask(params.target_muscles)
+    elif params.goal == "endurance":
+        mask &= catalog.is_cardio
+
+    # Filter by fitness level
+    if max_difficulty is not None:
+        mask &= catalog.difficulty <= max_difficulty
 
-        filtered.append(ex)
+    return np.flatnonzero(mask)
+
+
+def _filter_with_bitmaps(
+        catalog: ExerciseCatalog,
+        params: WorkoutOptimizationParams,
+        max_difficulty: Optional[int]
+) -> np.ndarray:
+    """``_filter_exercises`` as AND/OR operations on the bitmap index"""
+    index = catalog.bitmap_index
+    bits = index.all
 
-    return filtered
+    # Filter by goal
+    if params.goal == "weight_loss":
+        # calories >= threshold <=> floor(calories) >= threshold for an integer threshold
+        bits &= index.at_least("calorie_floor", WEIGHT_LOSS_MIN_CALORIES)
+    elif params.goal == "muscle_gain":
+        bits &= index.union("muscle_group", catalog.muscle_group_codes_for(params.target_muscles))
+    elif params.goal == "endurance":
+        bits &= index.get("is_cardio", True)
+
+    # Filter by fitness level
+    if max_difficulty is not None:
+        bits &= index.at_most("difficulty", max_difficulty)
+
+    return index.positions(bits)
 
 
 def _score_exercises(
-        exercises: List[Exercise],
+        catalog: ExerciseCatalog,
+        candidates: np.ndarray,
         params: WorkoutOptimizationParams,
         user: DBUser
-) -> List[tuple]:
-    """Score each exercise based on multiple criteria"""
-    scored = []
-
-    for ex in exercises:
-        score = 0
+) -> np.ndarray:
+    """Score each exercise based on multiple criteria.
 
-        # Goal scoring
-        if params.goal == "weight_loss":
-            score += ex.calories_burned * 0.7
-        elif params.goal == "muscle_gain":
-            score += ex.difficulty * 0.5
-            if ex.muscle_group in params.target_muscles:
-                score += 0.5
-        elif params.goal == "endurance":
-            score += ex.duration * 0.3 + ex.calories_burned * 0.7
+    Returns:
+        np.ndarray: Scores aligned with ``candidates``
+    """
+    calories = catalog.calories_burned[candidates]
+    scores = np.zeros(len(candidates), dtype=np.float64)
 
-        # User preference scoring
-        if ex.equipment in user.preferred_equipment:
-            score += 0.2
-        if ex.muscle_group in user.favorite_muscle_groups:
-            score += 0.3
+    # Goal scoring
+    if params.goal == "weight_loss":
+        scores += calories * 0.7
+    elif params.goal == "muscle_gain":
+        scores += catalog.difficulty[candidates] * 0.5
+        scores += catalog.muscle_group_mask(params.target_muscles, candidates) * 0.5
+    elif params.goal == "endurance":
+        scores += catalog.avg_duration[candidates] * 0.3 + calories * 0.7
 
-        scored.append((score, ex))
+    # User preference scoring
+    preferred_equipment = getattr(user, "preferred_equipment", None) or []
+    favorite_muscle_groups = getattr(user, "favorite_muscle_groups", None) or []
+    scores += catalog.equipment_mask(preferred_equipment, candidates) * 0.2
+    scores += catalog.muscle_group_mask(favorite_muscle_groups, candidates) * 0.3
 
-    return scored
+    return scores
 
 
 def _optimize_selection(
-        scored_exercises: List[tuple],
+        catalog: ExerciseCatalog,
+        candidates: np.ndarray,
+        scores: np.ndarray,
         available_time: int
-) -> List[Exercise]:
+) -> List[int]:
     """Modified knapsack algorithm with muscle group balancing"""
-    # Sort by score/duration ratio
-    scored_exercises.sort(key=lambda x: x[0] / x[1].avg_duration, reverse=True)
+    durations = catalog.avg_duration[candidates]
+
+    # Sort by score/duration ratio (stable, so ties keep catalog order)
+    ratio = np.divide(
+        scores, durations,
+        out=np.full(len(scores), np.inf), where=durations > 0
+    )
+    order = np.argsort(-ratio, kind="stable")
+
+    # Exercises longer than the whole session can never be picked
+    order = order[durations[order] <= available_time]
 
     selected = []
     total_time = 0
     muscle_group_counts = defaultdict(int)
+    codes = catalog.muscle_group_codes[candidates]
 
-    for score, ex in scored_exercises:
-        if total_time + ex.avg_duration > available_time:
+    for pos, duration, code in zip(
+            candidates[order].tolist(), durations[order].tolist(), codes[order].tolist()
+    ):
+        if total_time + duration > available_time:
             continue
 
         # Muscle group balancing
-        if muscle_group_counts[ex.muscle_group] >= 2:  # Max 2 per muscle group
+        if muscle_group_counts[code] >= MAX_PER_MUSCLE_GROUP:
             continue
 
-        selected.append(ex)
-        total_time += ex.avg_duration
-        muscle_group_counts[ex.muscle_group] += 1
+        selected.append(pos)
+        total_time += duration
+        muscle_group_counts[code] += 1
 
         if total_time >= available_time * 0.9:  # 90% of time is good enough
             break
@@ -144,54 +547,500 @@ def _optimize_selection(
     return selected
 
 
-def _optimize_order(exercises: List[Exercise]) -> List[Exercise]:
-    """Optimize exercise order to alternate muscle groups"""
-    if not exercises:
+def _optimize_selection_exact(
+        catalog: ExerciseCatalog,
+        candidates: np.ndarray,
+        scores: np.ndarray,
+        available_time: int
+) -> List[int]:
+    """Exact bounded knapsack over integer minutes with muscle group caps.
+
+    Maximizes the total score within ``available_time`` while taking at most
+    ``MAX_PER_MUSCLE_GROUP`` exercises per muscle group:
+
+        1. Prunes candidates: for every (muscle group, duration) pair only the
+           ``MAX_PER_MUSCLE_GROUP`` best-scored exercises can be part of an
+           optimal plan, so at most groups x minutes x cap candidates remain.
+        2. Solves a small 0/1 knapsack per muscle group, indexed by
+           (exercises taken, minutes used); each item is one array update.
+        3. Merges groups with a max-plus convolution over minutes.
+        4. Walks the stored decisions back to recover the selection.
+    """
+    budget = int(available_time)
+    if budget < 0 or len(candidates) == 0:
+        return []
+
+    # 1. Keep the top-cap scores per (muscle group, duration)
+    candidates, scores, durations, codes = _prune_candidates(
+        catalog, candidates, scores, budget, MAX_PER_MUSCLE_GROUP
+    )
+    if len(candidates) == 0:
+        return []
+
+    minutes = np.arange(budget + 1)
+    shift_index = minutes[:, None] - minutes[None, :]
+    shift_valid = shift_index >= 0
+    shift_index = np.where(shift_valid, shift_index, 0)
+
+    total = np.full(budget + 1, -np.inf)
+    total[0] = 0.0
+    groups = []
+
+    for code in np.unique(codes).tolist():
+        in_group = np.flatnonzero(codes == code)
+
+        # 2. Per-group knapsack: best[c, t] = best score with c items in exactly t minutes
+        best = np.full((MAX_PER_MUSCLE_GROUP + 1, budget + 1), -np.inf)
+        best[0, 0] = 0.0
+        taken = np.zeros((len(in_group), MAX_PER_MUSCLE_GROUP, budget + 1), dtype=bool)
+        for j, item in enumerate(in_group.tolist()):
+            weight = int(durations[item])
+            with_item = np.full((MAX_PER_MUSCLE_GROUP, budget + 1), -np.inf)
+            with_item[:, weight:] = best[:-1, :budget + 1 - weight] + scores[item]
+            improves = with_item > best[1:]
+            best[1:] = np.where(improves, with_item, best[1:])
+            taken[j] = improves
+        group_best = best.max(axis=0)
+        group_count = best.argmax(axis=0)
+
+        # 3. Max-plus convolution with the groups merged so far
+        merged = np.where(shift_valid, total[shift_index] + group_best[None, :], -np.inf)
+        minutes_for_group = merged.argmax(axis=1)
+        total = merged[minutes, minutes_for_group]
+        groups.append((in_group, taken, group_count, minutes_for_group))
+
+    # 4. Reconstruct
+    selected = []
+    remaining = int(total.argmax())
+    if not np.isfinite(total[remaining]):
+        return []
+    for in_group, taken, group_count, minutes_for_group in reversed(groups):
+        used = int(minutes_for_group[remaining])
+        remaining -= used
+        count = int(group_count[used])
+        for j in range(len(in_group) - 1, -1, -1):
+            if count == 0:
+                break
+            if taken[j, count - 1, used]:
+                item = in_group[j]
+                selected.append(int(candidates[item]))
+                used -= int(durations[item])
+                count -= 1
+
+    selected.reverse()
+    return selected
+
+
+def _refine_selection(
+        catalog: ExerciseCatalog,
+        candidates: np.ndarray,
+        scores: np.ndarray,
+        selected: List[int],
+        available_time: int,
+        deadline_ms: float
+) -> Tuple[List[int], RefinementStats]:
+    """Anytime local search over the selection, stopped at a deadline.
+
+    The objective is the total score plus ``MUSCLE_BALANCE_WEIGHT`` times the
+    diversity of the muscle group shares reported by
+    :func:`_calculate_muscle_balance` (one minus the sum of squared shares).
+    Each iteration applies the best improving move among:
+
+        - insert: add an unselected candidate;
+        - remove: drop a selected exercise;
+        - swap: replace a selected exercise with an unselected candidate;
+
+    subject to the time budget and ``MAX_PER_MUSCLE_GROUP``.  Moves are
+    evaluated for all candidates at once from the muscle group counts.  The
+    search stops at a local optimum or once ``deadline_ms`` has elapsed (an
+    iteration cut short by the deadline applies the best move it has seen).
+    The selection is always a valid plan, so stopping early returns the best
+    one found so far.
+
+    Returns:
+        Tuple of the refined selection and the refinement statistics
+    """
+    started = time.perf_counter()
+    deadline = started + deadline_ms / 1000
+    budget = int(available_time)
+
+    # Candidates that can never improve a plan are left out; the selection
+    # itself always stays in the pool
+    in_plan = np.isin(candidates, selected)
+    durations = catalog.avg_duration[candidates]
+    keep = in_plan | ((durations <= budget) & (scores > 0))
+    pool, pool_scores, pool_durations = candidates[keep], scores[keep], durations[keep]
+    pool_codes = catalog.muscle_group_codes[pool]
+    in_plan = in_plan[keep]
+
+    counts = np.bincount(pool_codes[in_plan], minlength=len(catalog.muscle_groups))
+    total_time = int(pool_durations[in_plan].sum())
+    total_score = float(pool_scores[in_plan].sum())
+
+    def objective(score, counts_sum_sq, size):
+        if size == 0:
+            return score
+        return score + MUSCLE_BALANCE_WEIGHT * (1.0 - counts_sum_sq / size ** 2)
+
+    size = int(in_plan.sum())
+    sum_sq = int((counts ** 2).sum())
+    initial = current = objective(total_score, sum_sq, size)
+    iterations = 0
+    converged = False
+
+    while time.perf_counter() < deadline:
+        iterations += 1
+        best_value, best_move = current + 1e-9, None
+        members = np.flatnonzero(in_plan).tolist()
+        outside = ~in_plan
+
+        # Swap out one member (or nobody, for an insert) and add the best candidate;
+        # at the deadline the best move seen so far is still applied
+        for out in [None] + members:
+            if out is not None and time.perf_counter() >= deadline:
+                break
+            base_counts = counts.copy()
+            base_time, base_score, base_sq, base_size = total_time, total_score, sum_sq, size
+            if out is not None:
+                code = pool_codes[out]
+                base_sq -= 2 * int(base_counts[code]) - 1
+                base_counts[code] -= 1
+                base_time -= int(pool_durations[out])
+                base_score -= pool_scores[out]
+                base_size -= 1
+
+                # Remove
+                value = objective(base_score, base_sq, base_size)
+                if value > best_value:
+                    best_value, best_move = value, (out, None)
+
+            group_counts = base_counts[pool_codes]
+            feasible = (
+                outside
+                & (base_time + pool_durations <= budget)
+                & (group_counts < MAX_PER_MUSCLE_GROUP)
+            )
+            if not feasible.any():
+                continue
+            new_size = base_size + 1
+            values = (
+                base_score + pool_scores
+                + MUSCLE_BALANCE_WEIGHT * (1.0 - (base_sq + 2 * group_counts + 1) / new_size ** 2)
+            )
+            values[~feasible] = -np.inf
+            add = int(values.argmax())
+            if values[add] > best_value:
+                best_value, best_move = float(values[add]), (out, add)
+
+        if best_move is None:
+            converged = True
+            break
+
+        # Apply the move
+        for item, sign in zip(best_move, (-1, 1)):
+            if item is None:
+                continue
+            code = pool_codes[item]
+            sum_sq += sign * (2 * int(counts[code]) + sign)
+            counts[code] += sign
+            total_time += sign * int(pool_durations[item])
+            total_score += sign * pool_scores[item]
+            size += sign
+            in_plan[item] = sign > 0
+        current = objective(total_score, sum_sq, size)
+
+    refined = pool[in_plan].tolist()
+    return refined, RefinementStats(
+        iterations=iterations,
+        score_improvement=round(float(current - initial), 4),
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 3),
+        converged=converged,
+    )
+
+
+def _prune_candidates(
+        catalog: ExerciseCatalog,
+        candidates: np.ndarray,
+        scores: np.ndarray,
+        budget: int,
+        per_bucket: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Drop candidates that cannot be part of a best plan.
+
+    Removes exercises longer than ``budget`` or without a positive score, then
+    keeps only the ``per_bucket`` best-scored exercises of every
+    (muscle group, duration) pair: a plan holding a worse one can swap it for
+    an unused better one of the same length.
+
+    Returns:
+        Tuple of candidates, scores, durations and muscle group codes, sorted
+        by (muscle group, duration, score descending)
+    """
+    durations = catalog.avg_duration[candidates]
+    codes = catalog.muscle_group_codes[candidates]
+    keep = (durations <= budget) & (scores > 0)
+    candidates, scores, durations, codes = (
+        candidates[keep], scores[keep], durations[keep], codes[keep]
+    )
+
+    order = np.lexsort((-scores, durations, codes))
+    candidates, scores, durations, codes = (
+        candidates[order], scores[order], durations[order], codes[order]
+    )
+    bucket_start = np.r_[True, (codes[1:] != codes[:-1]) | (durations[1:] != durations[:-1])]
+    bucket_id = np.cumsum(bucket_start) - 1
+    rank = np.arange(len(candidates)) - np.flatnonzero(bucket_start)[bucket_id]
+    keep = rank < per_bucket
+    return candidates[keep], scores[keep], durations[keep], codes[keep]
+
+
+def _top_k_selections(
+        catalog: ExerciseCatalog,
+        candidates: np.ndarray,
+        scores: np.ndarray,
+        available_time: int,
+        k: int,
+        beam_width: int
+) -> List[List[int]]:
+    """Bounded beam search for the ``k`` best distinct selections.
+
+    Candidates are visited in score/duration ratio order; at each step every
+    partial selection in the beam branches into "skip" and "take" (when the
+    time budget and the muscle group cap allow it).  Every "take" is a new
+    selection and competes for the top ``k``.  A partial selection survives
+    only if its upper bound -- its score plus the fractional knapsack value
+    of the remaining candidates in the remaining time -- beats the k-th best
+    selection found so far, and at most ``beam_width`` of the best-bounded
+    ones are kept.  The search stops as soon as the beam is empty.
+
+    Selections are distinct sets of exercises, since each one is a different
+    path of skip/take decisions.  With a beam wide enough to never truncate,
+    the result is the exact top ``k``.
+
+    Returns:
+        List[List[int]]: Up to ``k`` selections (catalog positions), best first
+    """
+    budget = int(available_time)
+    if budget < 0 or k <= 0 or len(candidates) == 0:
         return []
+    beam_width = max(beam_width, k)
+
+    # Any of the k best plans only uses the top (cap + k - 1) of each bucket
+    candidates, scores, durations, codes = _prune_candidates(
+        catalog, candidates, scores, budget, MAX_PER_MUSCLE_GROUP + k - 1
+    )
+    if len(candidates) == 0:
+        return []
+
+    ratio = np.divide(
+        scores, durations,
+        out=np.full(len(scores), np.inf), where=durations > 0
+    )
+    order = np.argsort(-ratio, kind="stable")
+    candidates, scores, durations, ratio = (
+        candidates[order], scores[order], durations[order], ratio[order]
+    )
+    _, groups = np.unique(codes[order], return_inverse=True)
+    groups = groups.reshape(-1)
+    size = len(candidates)
+
+    # Prefix sums for the fractional bound over the remaining candidates
+    time_prefix = np.r_[0, np.cumsum(durations)]
+    score_prefix = np.r_[0.0, np.cumsum(scores)]
+
+    def upper_bound(step, time_used, score):
+        time_left = budget - time_used
+        start = time_prefix[step]
+        last = np.searchsorted(time_prefix, start + time_left, side="right") - 1
+        full = score_prefix[last] - score_prefix[step]
+        rest = time_left - (time_prefix[last] - start)
+        partial = np.where(last < size, rest * ratio[np.minimum(last, size - 1)], 0.0)
+        return score + full + partial
 
-    # Group by muscle group
-    muscle_groups = defaultdict(list)
-    for ex in exercises:
-        muscle_groups[ex.muscle_group].append(ex)
+    # Beam of partial selections; node -1 is the empty selection
+    beam_score = np.zeros(1)
+    beam_time = np.zeros(1, dtype=np.int64)
+    beam_counts = np.zeros((1, groups.max() + 1), dtype=np.int64)
+    beam_node = np.full(1, -1, dtype=np.int64)
+    node_parent = []
+    node_item = []
+    best_score = np.empty(0)
+    best_node = np.empty(0, dtype=np.int64)
+
+    for step in range(size):
+        group = groups[step]
+        takes = (
+            (beam_time + durations[step] <= budget)
+            & (beam_counts[:, group] < MAX_PER_MUSCLE_GROUP)
+        )
+        taken = np.flatnonzero(takes)
+        if len(taken) == 0:
+            continue
+        taken_score = beam_score[taken] + scores[step]
+        taken_time = beam_time[taken] + durations[step]
+        taken_counts = beam_counts[taken].copy()
+        taken_counts[:, group] += 1
+        taken_node = np.arange(len(node_parent), len(node_parent) + len(taken))
+        node_parent.extend(beam_node[taken].tolist())
+        node_item.extend([step] * len(taken))
+
+        # New selections compete for the top k
+        best_score = np.concatenate((best_score, taken_score))
+        best_node = np.concatenate((best_node, taken_node))
+        if len(best_score) > k:
+            top = np.argpartition(-best_score, k - 1)[:k]
+            best_score, best_node = best_score[top], best_node[top]
+        threshold = best_score.min() if len(best_score) == k else -np.inf
+
+        beam_score = np.concatenate((beam_score, taken_score))
+        beam_time = np.concatenate((beam_time, taken_time))
+        beam_counts = np.concatenate((beam_counts, taken_counts))
+        beam_node = np.concatenate((beam_node, taken_node))
+
+        # Prune by the upper bound, then truncate to the beam width
+        bound = upper_bound(step + 1, beam_time, beam_score)
+        keep = np.flatnonzero(bound > threshold)
+        if len(keep) > beam_width:
+            keep = keep[np.argpartition(-bound[keep], beam_width - 1)[:beam_width]]
+        if len(keep) == 0:
+            break
+        beam_score, beam_time, beam_counts, beam_node = (
+            beam_score[keep], beam_time[keep], beam_counts[keep], beam_node[keep]
+        )
+
+    selections = []
+    for node in best_node[np.argsort(-best_score, kind="stable")].tolist():
+        selection = []
+        while node >= 0:
+            selection.append(int(candidates[node_item[node]]))
+            node = node_parent[node]
+        selection.reverse()
+        selections.append(selection)
+    return selections
+
+
+SELECTION_STRATEGIES = {
+    "greedy": _optimize_selection,
+    "exact": _optimize_selection_exact,
+}
+
+
+def _selection_strategy(mode: str):
+    """Return the selection function for ``WorkoutOptimizationParams.selection_mode``."""
+    try:
+        return SELECTION_STRATEGIES[mode]
+    except KeyError:
+        raise ValueError(
+            f"Unknown selection_mode {mode!r}, expected one of {sorted(SELECTION_STRATEGIES)}"
+        ) from None
+
+
+def _transition_costs(catalog: ExerciseCatalog, positions: np.ndarray) -> np.ndarray:
+    """Minutes lost between every pair of exercises (symmetric, zero diagonal)"""
+    equipment = catalog.equipment_codes[positions]
+    groups = catalog.muscle_group_codes[positions]
+    cardio = catalog.is_cardio[positions]
+
+    costs = (
+        (equipment[:, None] != equipment[None, :]) * EQUIPMENT_CHANGE_MINUTES
+        + (groups[:, None] == groups[None, :]) * MUSCLE_GROUP_REPEAT_MINUTES
+        + (cardio[:, None] != cardio[None, :]) * CARDIO_SWITCH_MINUTES
+    )
+    np.fill_diagonal(costs, 0.0)
+    return costs
 
-    # Create balanced order
-    ordered = []
-    while muscle_groups:
-        for mg in list(muscle_groups.keys()):
-            if muscle_groups[mg]:
-                ordered.append(muscle_groups[mg].pop())
-            else:
-                del muscle_groups[mg]
 
-    return ordered
+def _optimize_order(catalog: ExerciseCatalog, selected: List[int]) -> List[int]:
+    """Order exercises to minimize transition time between them.
+
+    Transitions cost ``EQUIPMENT_CHANGE_MINUTES`` for a change of equipment,
+    ``MUSCLE_GROUP_REPEAT_MINUTES`` of extra rest for the same muscle group
+    twice in a row and ``CARDIO_SWITCH_MINUTES`` for a cardio/strength switch.
+    A nearest-neighbour path from the first selected exercise is improved by
+    2-opt segment reversals, at most ``TWO_OPT_MAX_ITERATIONS`` of them.
+    """
+    size = len(selected)
+    if size < 3:
+        return list(selected)
 
+    # A zero-cost dummy node closes the open path into a tour for 2-opt
+    costs = np.zeros((size + 1, size + 1))
+    costs[:size, :size] = _transition_costs(catalog, np.asarray(selected, dtype=np.int64))
+
+    # Nearest neighbour
+    tour = [size, 0]
+    visited = np.zeros(size + 1, dtype=bool)
+    visited[[size, 0]] = True
+    for _ in range(size - 1):
+        row = np.where(visited, np.inf, costs[tour[-1]])
+        nearest = int(row.argmin())
+        tour.append(nearest)
+        visited[nearest] = True
+
+    # 2-opt: reverse tour[i..j] when that shortens the tour
+    tour = np.asarray(tour)
+    first, last = np.triu_indices(size + 1, k=1)
+    keep = first >= 1
+    first, last = first[keep], last[keep]
+    for _ in range(TWO_OPT_MAX_ITERATIONS):
+        before, after = tour[first - 1], tour[(last + 1) % (size + 1)]
+        delta = (
+            costs[before, tour[last]] + costs[tour[first], after]
+            - costs[before, tour[first]] - costs[tour[last], after]
+        )
+        best = int(delta.argmin())
+        if delta[best] >= -1e-9:
+            break
+        i, j = first[best], last[best]
+        tour[i:j + 1] = tour[i:j + 1][::-1].copy()
 
-def _build_workout_plan(exercises: List[Exercise]) -> WorkoutPlan:
+    # The dummy node never moves from the front
+    return [selected[i] for i in tour[1:].tolist()]
+
+
+def _transition_time(catalog: ExerciseCatalog, ordered: List[int]) -> float:
+    """Total transition minutes along ``ordered``"""
+    if len(ordered) < 2:
+        return 0.0
+    costs = _transition_costs(catalog, np.asarray(ordered, dtype=np.int64))
+    steps = np.arange(len(ordered) - 1)
+    return float(costs[steps, steps + 1].sum())
+
+
+def _build_workout_plan(catalog: ExerciseCatalog, ordered: List[int]) -> WorkoutPlan:
     """Build final workout plan with metrics"""
-    if not exercises:
-        return WorkoutPlan(exercises=[], total_duration=0, estimated_calories=0, difficulty=0)
+    if not ordered:
+        return WorkoutPlan(
+            exercises=[], total_duration=0, estimated_calories=0, difficulty=0,
+            catalog_version=catalog.version
+        )
 
-    total_duration = sum(ex.avg_duration for ex in exercises)
-    total_calories = sum(ex.calories_burned for ex in exercises)
-    avg_difficulty = sum(ex.difficulty for ex in exercises) / len(exercises)
+    index = np.asarray(ordered, dtype=np.int64)
+    total_duration = int(catalog.avg_duration[index].sum())
+    total_calories = float(catalog.calories_burned[index].sum())
+    avg_difficulty = float(catalog.difficulty[index].mean())
 
     return WorkoutPlan(
-        exercises=[{"id": ex.id, "name": ex.name} for ex in exercises],
+        exercises=take_names(catalog, ordered),
         total_duration=total_duration,
         estimated_calories=total_calories,
         difficulty=round(avg_difficulty, 1),
-        muscle_group_balance=_calculate_muscle_balance(exercises)
+        muscle_group_balance=_calculate_muscle_balance(catalog, ordered),
+        transition_minutes=round(_transition_time(catalog, ordered), 1),
+        catalog_version=catalog.version
     )
 
 
-def _calculate_muscle_balance(exercises: List[Exercise]) -> dict:
+def _calculate_muscle_balance(catalog: ExerciseCatalog, selected: List[int]) -> dict:
     """Calculate muscle group balance score"""
-    muscle_counts = defaultdict(int)
-    for ex in exercises:
-        muscle_counts[ex.muscle_group] += 1
-
-    total = len(exercises)
+    total = len(selected)
     if total == 0:
         return {}
 
-    return {mg: round(count / total, 2) for mg, count in muscle_counts.items()}
\ No newline at end of file
+    codes = catalog.muscle_group_codes[np.asarray(selected, dtype=np.int64)]
+    present, counts = np.unique(codes, return_counts=True)
+
+    return {
+        catalog.muscle_groups[code]: round(count / total, 2)
+        for code, count in zip(present.tolist(), counts.tolist())
+    }
@@ -15,7 +15,7 @@ from passlib.context import CryptContext
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.user import User as DBUser
 from app.core.config import settings
 
@@ -110,7 +110,7 @@ def create_access_token(data: dict):
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get current authenticated user from JWT token.
 
@@ -137,8 +137,10 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
 
+    # Поиск пользователя идёт на реплику; соединение сразу возвращается в пул
     result = await db.execute(select(User).where(User.email == email))
     user = result.scalars().first()
+    await db.close()
     if user is None:
         raise credentials_exception
     return user
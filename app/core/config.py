@@ -5,9 +5,46 @@ class Settings(BaseSettings):
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
 
+    # Подключение к базе данных и пул соединений единого async-движка
+    # (pool_size + max_overflow на воркер не должны превышать max_connections Postgres)
+    database_url: str = "postgresql+asyncpg://postgres:postgrespassword@db:5432/fitness_db"
+    db_echo: bool = False
+    db_pool_size: int = 10
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+
+    # Реплики для чтения (URL через запятую; пусто - всё читается с основной БД).
+    # Реплика исключается, если не отвечает или отстаёт больше max_lag секунд
+    db_replica_urls: str = ""
+    db_replica_health_interval: float = 5.0
+    db_replica_health_timeout: float = 2.0
+    db_replica_max_lag_seconds: float = 10.0
+
+    # Загрузка упражнений по id: True - пачки объединяются между запросами
+    # (общий загрузчик), False - только внутри одного запроса
+    exercise_loader_shared: bool = True
+
+    # Каталог упражнений оптимизатора: True - снимок в памяти процесса,
+    # False - фильтрация кандидатов в SQL на каждый запрос
+    optimizer_catalog_snapshot: bool = True
+
+    # Пул процессов оптимизатора (0 воркеров - выполнение в пуле потоков)
+    optimizer_workers: int = 2
+    optimizer_max_pending: int = 16
+    optimizer_timeout_seconds: float = 10.0
+
+    # Кэш планов тренировок
+    plan_cache_size: int = 1024
+    plan_cache_ttl_seconds: float = 300.0
+
+    # Метрики этапов оптимизатора, через запятую: log, histogram (пусто - выключены)
+    optimizer_metrics_sinks: str = ""
+
     class Config:
         env_file = ".env"
 
 settings = Settings()
 
-SQLALCHEMY_DATABASE_URL="postgresql+asyncpg://postgres:postgrespassword@db:5432/fitness_db"
\ No newline at end of file
+SQLALCHEMY_DATABASE_URL = settings.database_url
\ No newline at end of file
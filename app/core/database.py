@@ -1,17 +1,4 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+"""Совместимость: единый async-движок и зависимость get_db из app.database."""
+from app.database import AsyncSessionLocal, Base, SQLALCHEMY_DATABASE_URL, engine, get_db
 
-SQLALCHEMY_DATABASE_URL="postgresql+asyncpg://postgres:postgrespassword@db:5432/fitness_db" # Замените на свои реквизиты
-
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-Base = declarative_base()
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
\ No newline at end of file
+__all__ = ["AsyncSessionLocal", "Base", "SQLALCHEMY_DATABASE_URL", "engine", "get_db"]
@@ -1,9 +1,15 @@
 """Модуль для работы с упражнениями в базе данных (CRUD операции)."""
 
-from typing import List, Optional
+from typing import List, Optional, Tuple
+from sqlalchemy import bindparam, case, func, insert, literal, or_, select, update
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.orm import Session
+from app.crud import workout_stats
+from app.crud.pagination import keyset_page
+from app.crud.search import WORD_SIMILARITY_THRESHOLD
 from app.models.exercise import Exercise as models_Exercise
 from app.schemas.exercise import ExerciseCreate, ExerciseUpdate
+from app.algorithms import catalog
 
 
 def get_exercise(db: Session, exercise_id: int) -> Optional[models_Exercise]:
@@ -19,29 +25,102 @@ def get_exercise(db: Session, exercise_id: int) -> Optional[models_Exercise]:
     return db.query(models_Exercise).filter(models_Exercise.id == exercise_id).first()
 
 
+# Сортировки списков упражнений: ключ курсора (последний столбец уникален)
+EXERCISE_ORDERINGS = {
+    "id": (models_Exercise.id,),
+    "name": (models_Exercise.name, models_Exercise.id),
+}
+
+
 def get_exercises(
         db: Session,
-        skip: int = 0,
+        cursor: Optional[str] = None,
         limit: int = 100,
-        search: Optional[str] = None
-) -> List[models_Exercise]:
-    """Получение списка упражнений с возможностью пагинации и поиска.
+        search: Optional[str] = None,
+        order_by: str = "id"
+) -> Tuple[List[models_Exercise], Optional[str]]:
+    """Получение списка упражнений с пагинацией по курсору и поиском.
 
     Args:
         db: Сессия базы данных
-        skip: Количество пропускаемых записей
+        cursor: Курсор предыдущей страницы (None - первая страница)
         limit: Максимальное количество возвращаемых записей
         search: Строка для поиска по названию
+        order_by: Сортировка: "id" или "name" (по названию, затем id)
 
     Returns:
-        Список упражнений
+        Список упражнений и курсор следующей страницы (None на последней)
+
+    Raises:
+        ValueError: Неверный курсор или сортировка
     """
+    if order_by not in EXERCISE_ORDERINGS:
+        raise ValueError(f"Unknown order_by {order_by!r}")
+
     query = db.query(models_Exercise)
 
     if search:
         query = query.filter(models_Exercise.name.ilike(f"%{search}%"))
 
-    return query.offset(skip).limit(limit).all()
+    return keyset_page(
+        query, f"exercises:{order_by}", EXERCISE_ORDERINGS[order_by], cursor=cursor, limit=limit
+    )
+
+
+def search_exercises(
+        db: Session,
+        term: str,
+        limit: int = 20,
+        threshold: float = WORD_SIMILARITY_THRESHOLD
+) -> List[Tuple[models_Exercise, float]]:
+    """Поиск упражнений по названию и описанию с ранжированием.
+
+    Находит подстроку в названии или описании и нечёткие совпадения с
+    названием (опечатки, часть слова) по ``word_similarity`` из pg_trgm.
+    В Postgres условия обслуживаются GIN-индексами по триграммам, в SQLite
+    используются функции из :mod:`app.crud.search`.
+
+    Args:
+        db: Сессия базы данных
+        term: Строка поиска
+        limit: Максимальное количество результатов
+        threshold: Минимальное сходство для нечёткого совпадения (0..1)
+
+    Returns:
+        Пары (упражнение, релевантность) по убыванию релевантности
+    """
+    term = term.strip()
+    if not term:
+        return []
+
+    pattern = f"%{term}%"
+    in_name = models_Exercise.name.ilike(pattern)
+    in_description = models_Exercise.description.ilike(pattern)
+    name_similarity = func.word_similarity(term, models_Exercise.name)
+
+    if db.get_bind().dialect.name == "postgresql":
+        # Оператор <% использует индекс и порог pg_trgm.word_similarity_threshold
+        db.execute(
+            select(func.set_config("pg_trgm.word_similarity_threshold", str(threshold), True))
+        )
+        fuzzy = literal(term).op("<%")(models_Exercise.name)
+    else:
+        fuzzy = name_similarity >= threshold
+
+    # Подстрока в названии важнее нечёткого совпадения, описание - слабее названия
+    rank = (
+        name_similarity
+        + case((in_name, 1.0), else_=0.0)
+        + case((in_description, 0.25), else_=0.0)
+    ).label("rank")
+    rows = (
+        db.query(models_Exercise, rank)
+        .filter(or_(in_name, in_description, fuzzy))
+        .order_by(rank.desc(), models_Exercise.id)
+        .limit(limit)
+        .all()
+    )
+    return [(exercise, float(score)) for exercise, score in rows]
 
 
 def create_exercise(db: Session, exercise: ExerciseCreate) -> models_Exercise:
@@ -65,8 +144,10 @@ def create_exercise(db: Session, exercise: ExerciseCreate) -> models_Exercise:
         avg_duration=exercise.avg_duration
     )
     db.add(db_exercise)
+    version = catalog.bump_catalog_version(db)
     db.commit()
     db.refresh(db_exercise)
+    catalog.apply_exercise_upsert(db_exercise, version)
     return db_exercise
 
 
@@ -88,10 +169,17 @@ def update_exercise(
     db_exercise = get_exercise(db, exercise_id)
     if db_exercise:
         update_data = exercise_update.dict(exclude_unset=True)
+        if 'muscle_group' in update_data and update_data['muscle_group'] != db_exercise.muscle_group:
+            # Статистика тренировок с этим упражнением переносится на новую группу мышц
+            workout_stats.apply_stats_deltas(db, workout_stats.exercise_change_deltas(
+                db, exercise_id, update_data['muscle_group']
+            ))
         for field, value in update_data.items():
             setattr(db_exercise, field, value)
+        version = catalog.bump_catalog_version(db)
         db.commit()
         db.refresh(db_exercise)
+        catalog.apply_exercise_upsert(db_exercise, version)
     return db_exercise
 
 
@@ -107,57 +195,134 @@ def delete_exercise(db: Session, exercise_id: int) -> bool:
     """
     db_exercise = get_exercise(db, exercise_id)
     if db_exercise:
+        # Упражнение исчезает из тренировок: их статистика пересчитывается без него
+        workout_stats.apply_stats_deltas(db, workout_stats.exercise_change_deltas(db, exercise_id, removed=True))
         db.delete(db_exercise)
+        version = catalog.bump_catalog_version(db)
         db.commit()
+        catalog.apply_exercise_delete(exercise_id, version)
         return True
     return False
 
 
+def bulk_write_exercises(
+        db: Session,
+        rows: List[Tuple[int, ExerciseCreate]],
+        upsert: bool = True
+) -> Tuple[int, int, List[Tuple[int, str]]]:
+    """Запись пачки упражнений несколькими запросами вместо одного на строку.
+
+    Новые упражнения вставляются одним многострочным INSERT, при ``upsert``
+    упражнения с уже существующим названием обновляются одним пакетным
+    UPDATE.  Если пачка не записывается целиком, строки повторяются по одной
+    (каждая в своей точке сохранения), чтобы ошибка одной строки не отменяла
+    остальные.  Версия каталога увеличивается в той же транзакции, так что
+    снимки каталога оптимизатора перезагружаются во всех процессах.
+
+    Args:
+        db: Сессия базы данных
+        rows: Пары (номер строки во входном файле, данные упражнения)
+        upsert: Обновлять упражнения с совпадающим названием
+
+    Returns:
+        Количество вставленных и обновлённых строк и ошибки (номер строки, текст)
+    """
+    try:
+        with db.begin_nested():
+            inserted, updated = _write_exercise_rows(db, [exercise for _, exercise in rows], upsert)
+        if inserted or updated:
+            catalog.bump_catalog_version(db)
+        db.commit()
+        return inserted, updated, []
+    except DBAPIError:
+        pass
+
+    inserted = updated = 0
+    errors = []
+    for row_number, exercise in rows:
+        try:
+            with db.begin_nested():
+                row_inserted, row_updated = _write_exercise_rows(db, [exercise], upsert)
+        except DBAPIError as exc:
+            errors.append((row_number, str(exc.orig)))
+            continue
+        inserted += row_inserted
+        updated += row_updated
+    if inserted or updated:
+        catalog.bump_catalog_version(db)
+    db.commit()
+    return inserted, updated, errors
+
+
+def _write_exercise_rows(db: Session, exercises: List[ExerciseCreate], upsert: bool) -> Tuple[int, int]:
+    """INSERT новых и UPDATE существующих (по названию) упражнений"""
+    values = [exercise.dict() for exercise in exercises]
+    existing = set()
+    if upsert:
+        # Повторы названия внутри пачки: записывается последняя версия
+        values = list({value["name"]: value for value in values}.values())
+        names = [value["name"] for value in values]
+        existing = set(db.scalars(select(models_Exercise.name).where(models_Exercise.name.in_(names))))
+    to_insert = [value for value in values if value["name"] not in existing]
+    to_update = [value for value in values if value["name"] in existing]
+
+    if to_insert:
+        db.execute(insert(models_Exercise), to_insert)
+    if to_update:
+        columns = [column for column in to_update[0] if column != "name"]
+        db.connection().execute(
+            update(models_Exercise)
+            .where(models_Exercise.name == bindparam("b_name"))
+            .values({column: bindparam(f"b_{column}") for column in columns}),
+            [{f"b_{column}": value for column, value in row.items()} for row in to_update],
+        )
+
+    # Повторы названия внутри пачки считаются обновлениями
+    inserted = len(to_insert)
+    return inserted, len(exercises) - inserted
+
+
 def get_exercises_by_muscle_group(
         db: Session,
         muscle_group: str,
-        skip: int = 0,
+        cursor: Optional[str] = None,
         limit: int = 100
-) -> List[models_Exercise]:
+) -> Tuple[List[models_Exercise], Optional[str]]:
     """Получение упражнений по группе мышц.
 
     Args:
         db: Сессия базы данных
         muscle_group: Группа мышц для фильтрации
-        skip: Количество пропускаемых записей
+        cursor: Курсор предыдущей страницы (None - первая страница)
         limit: Максимальное количество возвращаемых записей
 
     Returns:
-        Список упражнений для указанной группы мышц
+        Список упражнений для указанной группы мышц и курсор следующей страницы
+
+    Raises:
+        ValueError: Неверный курсор
     """
-    return (
-        db.query(models_Exercise)
-        .filter(models_Exercise.muscle_group == muscle_group)
-        .offset(skip)
-        .limit(limit)
-        .all()
-    )
+    query = db.query(models_Exercise).filter(models_Exercise.muscle_group == muscle_group)
+    return keyset_page(query, "exercises:id", (models_Exercise.id,), cursor=cursor, limit=limit)
 
 
 def get_cardio_exercises(
         db: Session,
-        skip: int = 0,
+        cursor: Optional[str] = None,
         limit: int = 100
-) -> List[models_Exercise]:
+) -> Tuple[List[models_Exercise], Optional[str]]:
     """Получение кардио упражнений.
 
     Args:
         db: Сессия базы данных
-        skip: Количество пропускаемых записей
+        cursor: Курсор предыдущей страницы (None - первая страница)
         limit: Максимальное количество возвращаемых записей
 
     Returns:
-        Список кардио упражнений
+        Список кардио упражнений и курсор следующей страницы
+
+    Raises:
+        ValueError: Неверный курсор
     """
-    return (
-        db.query(models_Exercise)
-        .filter(models_Exercise.is_cardio.is_(True))  # Исправлено сравнение
-        .offset(skip)
-        .limit(limit)
-        .all()
-    )
+    query = db.query(models_Exercise).filter(models_Exercise.is_cardio.is_(True))  # Исправлено сравнение
+    return keyset_page(query, "exercises:id", (models_Exercise.id,), cursor=cursor, limit=limit)
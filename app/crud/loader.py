@@ -0,0 +1,155 @@
+"""Пакетная загрузка по ключу в стиле DataLoader.
+
+Запросы ``load(key)``, сделанные корутинами за один проход цикла событий,
+собираются и выполняются одним вызовом ``batch_fn(keys)`` - для упражнений
+это один ``SELECT ... WHERE id IN (...)`` вместо запроса на каждый id.
+
+Загрузчик на запрос (:func:`exercise_loader`) работает с сессией запроса и
+кэширует результаты до конца запроса.  Общий загрузчик
+(``shared_exercise_loader``) объединяет запросы разных HTTP-запросов:
+каждая его пачка выполняется в собственной сессии для чтения, результаты
+не кэшируются.  Маршруты по умолчанию работают через общий загрузчик
+(``settings.exercise_loader_shared``).
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import ReadSessionLocal
+from app.models.exercise import Exercise as models_Exercise
+
+# Ключей в одном запросе IN
+LOADER_MAX_BATCH_SIZE = 500
+
+BatchFn = Callable[[List[Any]], Awaitable[Dict[Any, Any]]]
+
+
+class BatchLoader:
+    """Объединение загрузок по ключу за один проход цикла событий.
+
+    Args:
+        batch_fn: Корутина ``keys -> {key: value}``; отсутствующие ключи
+            дают None
+        max_batch_size: Максимум ключей в одном вызове ``batch_fn``
+        cache: Запоминать результаты (и ожидающие загрузки) по ключу
+
+    Attributes:
+        batches (int): Количество выполненных вызовов ``batch_fn``
+    """
+
+    def __init__(self, batch_fn: BatchFn, max_batch_size: int = LOADER_MAX_BATCH_SIZE, cache: bool = True):
+        self._batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self._cache: Optional[Dict[Any, asyncio.Future]] = {} if cache else None
+        self._queue: Dict[Any, asyncio.Future] = {}
+        self._scheduled = False
+        self._tasks: set = set()
+        self.batches = 0
+
+    async def load(self, key) -> Any:
+        """Значение по ключу (None, если не найдено)."""
+        future = None if self._cache is None else self._cache.get(key)
+        if future is None:
+            future = self._queue.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._queue[key] = future
+            if self._cache is not None:
+                self._cache[key] = future
+            if not self._scheduled:
+                # Пачка уходит после того, как отработают все готовые корутины
+                self._scheduled = True
+                loop.call_soon(self._dispatch)
+        # Отмена одного ожидающего не должна отменять загрузку для остальных
+        return await asyncio.shield(future)
+
+    async def load_many(self, keys: Iterable) -> List[Any]:
+        """Значения по ключам в том же порядке."""
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def clear(self, key=None) -> None:
+        """Сброс кэша по ключу (None - весь кэш), например после изменения записи."""
+        if self._cache is None:
+            return
+        if key is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(key, None)
+
+    def _dispatch(self) -> None:
+        self._scheduled = False
+        queue, self._queue = self._queue, {}
+        keys = list(queue)
+        for start in range(0, len(keys), self.max_batch_size):
+            task = asyncio.ensure_future(self._resolve(keys[start:start + self.max_batch_size], queue))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _resolve(self, keys: List[Any], futures: Dict[Any, asyncio.Future]) -> None:
+        try:
+            values = await self._batch_fn(keys)
+        except Exception as exc:  # ошибка пачки достаётся всем её ожидающим
+            for key in keys:
+                if self._cache is not None and self._cache.get(key) is futures[key]:
+                    del self._cache[key]
+                if not futures[key].done():
+                    futures[key].set_exception(exc)
+            return
+        self.batches += 1
+        for key in keys:
+            if not futures[key].done():
+                futures[key].set_result(values.get(key))
+
+
+def exercises_by_id(db: AsyncSession) -> BatchFn:
+    """Пакетная загрузка упражнений в сессии ``db``.
+
+    Сессия не допускает параллельных запросов, поэтому пачки выполняются
+    по очереди.
+    """
+    lock = asyncio.Lock()
+
+    async def fetch(ids: List[int]) -> Dict[int, models_Exercise]:
+        async with lock:
+            result = await db.execute(select(models_Exercise).where(models_Exercise.id.in_(ids)))
+            return {exercise.id: exercise for exercise in result.scalars()}
+
+    return fetch
+
+
+async def _fetch_in_own_session(ids: List[int]) -> Dict[int, models_Exercise]:
+    async with ReadSessionLocal() as db:
+        result = await db.execute(select(models_Exercise).where(models_Exercise.id.in_(ids)))
+        return {exercise.id: exercise for exercise in result.scalars()}
+
+
+# Общий для всех запросов процесса загрузчик без кэша
+shared_exercise_loader = BatchLoader(_fetch_in_own_session, cache=False)
+
+
+def exercise_loader(
+        db: Optional[AsyncSession] = None,
+        shared: Optional[BatchLoader] = None
+) -> BatchLoader:
+    """Загрузчик упражнений по id на время одного запроса (с кэшем).
+
+    Args:
+        db: Сессия запроса; пачки выполняются в ней
+        shared: Общий загрузчик; пачки объединяются с другими запросами
+            (используется вместо ``db``)
+
+    Returns:
+        BatchLoader: ``await loader.load(exercise_id)`` - упражнение или None
+    """
+    if shared is not None:
+        async def fetch(ids: List[int]) -> Dict[int, models_Exercise]:
+            return dict(zip(ids, await shared.load_many(ids)))
+
+        return BatchLoader(fetch)
+    if db is None:
+        raise ValueError("exercise_loader needs a session or a shared loader")
+    return BatchLoader(exercises_by_id(db))
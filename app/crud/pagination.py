@@ -0,0 +1,139 @@
+"""Keyset-пагинация (по курсору) для списков из базы данных.
+
+Вместо ``offset(skip)`` следующая страница выбирается условием
+``(col1, col2, ...) > (значения последней строки)`` по тем же столбцам, что
+и сортировка.  При составном индексе по этим столбцам это диапазонное
+сканирование индекса, и любая страница стоит столько же, сколько первая.
+Курсор непрозрачен для клиента: это base64 от JSON с именем сортировки и
+значениями ключа последней строки.
+
+NULL в столбцах ключа считается наибольшим значением (NULLS LAST по
+возрастанию, NULLS FIRST по убыванию - порядок индекса в Postgres).
+NULLS FIRST/LAST пишется только для nullable-столбцов, чтобы сортировка
+по NOT NULL столбцам шла по индексу без лишней сортировки.  Для
+nullable-столбцов сравнение строк не годится (сравнение с NULL даёт NULL
+и теряет остаток списка), поэтому условие раскрывается по столбцам, а
+первый столбец дополнительно ограничивается диапазоном (``c1 <= k1`` при
+убывании), по которому и идёт поиск в индексе.
+"""
+
+import base64
+import binascii
+import json
+from datetime import date
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, false, or_, tuple_
+from sqlalchemy.orm import Query
+
+
+def encode_cursor(ordering: str, values: Sequence[Any]) -> str:
+    """Курсор для продолжения списка после строки с ключом ``values``."""
+    payload = {"o": ordering, "k": [value.isoformat() if isinstance(value, date) else value for value in values]}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, ordering: str, columns: Sequence) -> Tuple[Any, ...]:
+    """Значения ключа из курсора.
+
+    Raises:
+        ValueError: Курсор повреждён или выдан для другой сортировки
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        values = payload["k"]
+        valid = payload["o"] == ordering and len(values) == len(columns)
+    except (binascii.Error, UnicodeDecodeError, ValueError, KeyError, TypeError):
+        valid = False
+    if not valid:
+        raise ValueError("Invalid cursor")
+
+    key = []
+    for column, value in zip(columns, values):
+        if value is not None and column.type.python_type is date:
+            value = date.fromisoformat(value)
+        key.append(value)
+    return tuple(key)
+
+
+def keyset_page(
+        query: Query,
+        ordering: str,
+        columns: Sequence,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        descending: bool = False
+) -> Tuple[List[Any], Optional[str]]:
+    """Одна страница ``query`` по курсору.
+
+    Args:
+        query: Запрос с уже применёнными фильтрами (без сортировки и offset)
+        ordering: Имя сортировки, записывается в курсор
+        columns: Столбцы ключа сортировки; последний должен быть уникальным (id)
+        cursor: Курсор предыдущей страницы или None для первой
+        limit: Размер страницы
+        descending: Сортировка по убыванию
+
+    Returns:
+        Строки страницы и курсор следующей страницы (None, если это последняя)
+
+    Raises:
+        ValueError: Курсор повреждён или выдан для другой сортировки
+    """
+    if cursor is not None:
+        key = decode_cursor(cursor, ordering, columns)
+        query = query.filter(_after(columns, key, descending))
+
+    order = [_order(column, descending) for column in columns]
+    rows = query.order_by(*order).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(ordering, [getattr(last, column.key) for column in columns])
+
+
+def _order(column, descending: bool):
+    """Направление сортировки столбца; NULL - наибольшее значение."""
+    if not _nullable(column):
+        return column.desc() if descending else column.asc()
+    return column.desc().nulls_first() if descending else column.asc().nulls_last()
+
+
+def _after(columns: Sequence, key: Sequence[Any], descending: bool):
+    """Строки после ``key`` в порядке сортировки.
+
+    Без nullable-столбцов это сравнение строк ``(c1, c2, ...) > key``
+    (``<`` при убывании), которое Postgres выполняет как диапазонное
+    сканирование составного индекса.  Иначе условие раскрывается по
+    первому столбцу: ``c1 >= k1 AND (c1 > k1 OR остаток после ключа)``
+    плюс одна ветка ``OR c1 IS NULL`` по возрастанию.  Граница
+    ``c1 >= k1`` избыточна, но именно она даёт поиск по индексу вместо
+    полного просмотра.
+    """
+    if not any(_nullable(column) for column in columns):
+        row = tuple_(*columns) if len(columns) > 1 else columns[0]
+        boundary = tuple_(*key) if len(key) > 1 else key[0]
+        return row < boundary if descending else row > boundary
+
+    column, value = columns[0], key[0]
+    rest = _after(columns[1:], key[1:], descending) if len(columns) > 1 else false()
+    if value is None:
+        # NULL - наибольшее: по убыванию дальше идут все значения, по возрастанию - только NULL
+        tail = and_(column.is_(None), rest)
+        return or_(tail, column.isnot(None)) if descending else tail
+
+    if descending:
+        after = and_(column <= value, or_(column < value, rest))
+    else:
+        after = and_(column >= value, or_(column > value, rest))
+    if not descending and _nullable(column):
+        after = or_(after, column.is_(None))
+    return after
+
+
+def _nullable(column) -> bool:
+    return bool(getattr(column.expression, "nullable", True))
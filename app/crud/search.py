@@ -0,0 +1,80 @@
+"""Нечёткий поиск по триграммам (pg_trgm) и его замена для SQLite.
+
+В Postgres поиск упражнений идёт по GIN-индексам ``gin_trgm_ops`` на
+``exercises.name`` и ``exercises.description`` (миграция 9d3a6e1f2b47): они
+обслуживают и ``ILIKE '%term%'``, и оператор ``term <% name``.  Запрос
+ранжируется функцией ``word_similarity`` из pg_trgm.
+
+В SQLite расширения нет, поэтому при подключении регистрируются функции
+``similarity`` и ``word_similarity`` с той же семантикой, и тот же запрос
+выполняется локально (полным просмотром таблицы) в тестах и бенчмарках.
+"""
+
+import re
+from typing import List, Set
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Порог word_similarity для нечёткого совпадения.  Значение pg_trgm по
+# умолчанию (0.6) отсекает слова с перестановкой букв («bnech pres»),
+# поэтому в Postgres порог задаётся на транзакцию через set_config.
+WORD_SIMILARITY_THRESHOLD = 0.4
+
+_WORD = re.compile(r"[^\W_]+")
+
+
+def _word_trigrams(word: str) -> List[str]:
+    padded = f"  {word} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def trigrams(text: str) -> List[str]:
+    """Триграммы строки по порядку, как их строит pg_trgm.
+
+    Строка приводится к нижнему регистру и делится на слова из букв и цифр;
+    каждое слово дополняется двумя пробелами слева и одним справа.
+    """
+    return [trigram for word in _WORD.findall((text or "").lower()) for trigram in _word_trigrams(word)]
+
+
+def similarity(left: str, right: str) -> float:
+    """Доля общих триграмм двух строк (``similarity`` из pg_trgm)."""
+    left_set, right_set = set(trigrams(left)), set(trigrams(right))
+    union = len(left_set | right_set)
+    return len(left_set & right_set) / union if union else 0.0
+
+
+def word_similarity(term: str, text: str) -> float:
+    """Наибольшее сходство ``term`` с непрерывным отрезком триграмм ``text``.
+
+    То же, что ``word_similarity`` из pg_trgm: ``term`` ищется как часть
+    ``text``, поэтому «bench» полностью совпадает с «Barbell Bench Press».
+    Лучший отрезок начинается и заканчивается общей триграммой, так что
+    перебираются только такие.
+    """
+    wanted: Set[str] = set(trigrams(term))
+    if not wanted:
+        return 0.0
+    sequence = trigrams(text)
+    shared_positions = [i for i, trigram in enumerate(sequence) if trigram in wanted]
+
+    best = 0.0
+    for start_index, start in enumerate(shared_positions):
+        extent, common = set(), set()
+        position = start
+        for end in shared_positions[start_index:]:
+            extent.update(sequence[position:end + 1])
+            common.add(sequence[end])
+            position = end + 1
+            best = max(best, len(common) / (len(wanted) + len(extent - wanted)))
+    return best
+
+
+@event.listens_for(Engine, "connect")
+def _register_sqlite_functions(dbapi_connection, connection_record):
+    """Функции pg_trgm для соединений SQLite (sqlite3 и aiosqlite)."""
+    if "sqlite" not in type(dbapi_connection).__module__:
+        return
+    dbapi_connection.create_function("similarity", 2, similarity, deterministic=True)
+    dbapi_connection.create_function("word_similarity", 2, word_similarity, deterministic=True)
@@ -1,11 +1,21 @@
 """Модуль для работы с тренировками в базе данных (CRUD операции)."""
 
-from typing import List, Optional
-from sqlalchemy.orm import Session
-from app.models.workout import Workout as models_Workout
+from datetime import date
+from typing import List, Optional, Tuple
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Query, Session, selectinload
+from app.crud import workout_stats
+from app.crud.pagination import keyset_page
+from app.models.exercise import Exercise as models_Exercise
+from app.models.workout import Workout as models_Workout, workout_exercise
 from app.schemas.workout import WorkoutCreate, WorkoutUpdate
 
 
+def _with_exercises(query: Query, with_exercises: bool) -> Query:
+    """Загрузка упражнений тренировок одним дополнительным запросом (IN по id)."""
+    return query.options(selectinload(models_Workout.exercises)) if with_exercises else query
+
+
 def create_workout(db: Session, workout: WorkoutCreate, user_id: int) -> models_Workout:
     """Создание новой тренировки для пользователя.
 
@@ -16,62 +26,153 @@ def create_workout(db: Session, workout: WorkoutCreate, user_id: int) -> models_
 
     Returns:
         Созданная тренировка
+
+    Raises:
+        ValueError: Неизвестные ID упражнений или неверная дата
     """
-    db_workout = models_Workout(
-        **workout.dict(),
-        owner_id=user_id
-    )
-    db.add(db_workout)
-    db.commit()
-    db.refresh(db_workout)
-    return db_workout
+    return create_workouts(db, [workout], user_id)[0]
+
+
+def create_workouts(db: Session, workouts: List[WorkoutCreate], user_id: int) -> List[models_Workout]:
+    """Создание нескольких тренировок с упражнениями в одной транзакции.
+
+    Все ``exercise_ids`` проверяются одним запросом ``IN``, тренировки
+    вставляются одним INSERT ... RETURNING id, связи с упражнениями - одним
+    пакетным INSERT в workout_exercise.  Недельная статистика обновляется в
+    той же транзакции.
+
+    Args:
+        db: Сессия базы данных
+        workouts: Данные тренировок
+        user_id: ID владельца тренировок
+
+    Returns:
+        Созданные тренировки (с упражнениями) в порядке ``workouts``
+
+    Raises:
+        ValueError: Неизвестные ID упражнений или неверная дата
+    """
+    if not workouts:
+        return []
+
+    # Повторы ID в одной тренировке нарушили бы первичный ключ связи
+    exercise_ids = [list(dict.fromkeys(workout.exercise_ids or [])) for workout in workouts]
+    wanted = set().union(*exercise_ids)
+    muscle_groups = {}
+    if wanted:
+        muscle_groups = dict(db.execute(
+            select(models_Exercise.id, models_Exercise.muscle_group).where(models_Exercise.id.in_(wanted))
+        ).all())
+        missing = sorted(wanted - muscle_groups.keys())
+        if missing:
+            raise ValueError(f"Unknown exercise ids: {missing}")
+
+    rows = [_workout_row(workout, user_id) for workout in workouts]
+    deltas = {}
+    for row, ids in zip(rows, exercise_ids):
+        workout_stats.merge_deltas(deltas, workout_stats.workout_contribution(
+            user_id, row["date"], row["duration"], [muscle_groups[exercise_id] for exercise_id in ids]
+        ))
+    try:
+        workout_ids = db.scalars(
+            insert(models_Workout).returning(models_Workout.id, sort_by_parameter_order=True), rows
+        ).all()
+        links = [
+            {"workout_id": workout_id, "exercise_id": exercise_id}
+            for workout_id, ids in zip(workout_ids, exercise_ids)
+            for exercise_id in ids
+        ]
+        if links:
+            db.execute(insert(workout_exercise), links)
+        workout_stats.apply_stats_deltas(db, deltas)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    created = {
+        workout.id: workout
+        for workout in _with_exercises(db.query(models_Workout), True)
+        .filter(models_Workout.id.in_(workout_ids))
+    }
+    return [created[workout_id] for workout_id in workout_ids]
+
+
+def _workout_row(workout: WorkoutCreate, user_id: int) -> dict:
+    """Значения столбцов тренировки (exercise_ids - не столбец, дата из ISO-строки)."""
+    row = workout.dict(exclude={"exercise_ids"})
+    row["date"] = _parse_date(row["date"])
+    row["owner_id"] = user_id
+    return row
 
 
-def get_workout(db: Session, workout_id: int) -> Optional[models_Workout]:
+def _parse_date(value) -> Optional[date]:
+    """Дата тренировки из ISO-строки схемы (пустая строка - без даты)."""
+    if not value or isinstance(value, date):
+        return value or None
+    return date.fromisoformat(value)
+
+
+def get_workout(db: Session, workout_id: int, with_exercises: bool = False) -> Optional[models_Workout]:
     """Получение тренировки по ID.
 
     Args:
         db: Сессия базы данных
         workout_id: ID тренировки
+        with_exercises: Сразу загрузить упражнения тренировки
 
     Returns:
         Найденная тренировка или None
     """
-    return db.query(models_Workout).filter(models_Workout.id == workout_id).first()
+    query = db.query(models_Workout).filter(models_Workout.id == workout_id)
+    return _with_exercises(query, with_exercises).first()
 
 
 def get_workouts(
         db: Session,
         owner_id: int,
         filters: Optional[dict] = None,
-        pagination: Optional[dict] = None
-) -> List[models_Workout]:
+        pagination: Optional[dict] = None,
+        with_exercises: bool = False
+) -> Tuple[List[models_Workout], Optional[str]]:
     """Получение списка тренировок пользователя с фильтрами и пагинацией.
 
+    Тренировки отдаются от новых к старым, сортировка по (date, id);
+    тренировки без даты идут первыми.
+    Пагинация по курсору (индекс ix_workouts_owner_date_id): следующая
+    страница ищется в индексе по границе ``date <= дата курсора``, поэтому
+    любая страница стоит столько же, сколько первая.
+
     Args:
         db: Сессия базы данных
         owner_id: ID владельца тренировок
         filters: Словарь с фильтрами (может содержать start_date, end_date)
-        pagination: Словарь с параметрами пагинации (skip, limit)
+        pagination: Словарь с параметрами пагинации (cursor, limit)
+        with_exercises: Загрузить упражнения всей страницы одним запросом
+            (иначе каждое обращение к ``exercises`` - отдельный запрос)
 
     Returns:
-        Список тренировок
+        Список тренировок и курсор следующей страницы (None на последней)
+
+    Raises:
+        ValueError: Неверный курсор
     """
     # Устанавливаем значения по умолчанию
     filters = filters or {}
     pagination = pagination or {}
 
     query = db.query(models_Workout).filter(models_Workout.owner_id == owner_id)
+    query = _with_exercises(query, with_exercises)
 
     if 'start_date' in filters:
         query = query.filter(models_Workout.date >= filters['start_date'])
     if 'end_date' in filters:
         query = query.filter(models_Workout.date <= filters['end_date'])
 
-    skip = pagination.get('skip', 0)
-    limit = pagination.get('limit', 100)
-
-    return query.offset(skip).limit(limit).all()
+    return keyset_page(
+        query, "workouts:date,id", (models_Workout.date, models_Workout.id),
+        cursor=pagination.get('cursor'), limit=pagination.get('limit', 100), descending=True
+    )
 
 def update_workout(
         db: Session,
@@ -87,12 +188,21 @@ def update_workout(
 
     Returns:
         Обновленная тренировка или None
+
+    Raises:
+        ValueError: Неверная дата
     """
-    db_workout = get_workout(db, workout_id)
+    db_workout = get_workout(db, workout_id, with_exercises=True)
     if db_workout:
+        # Статистика: вычитаем старый вклад тренировки и прибавляем новый
+        deltas = workout_stats.merge_deltas({}, workout_stats.contribution_of(db_workout), sign=-1)
         update_data = workout_update.dict(exclude_unset=True)
+        if 'date' in update_data:
+            update_data['date'] = _parse_date(update_data['date'])
         for field, value in update_data.items():
             setattr(db_workout, field, value)
+        workout_stats.merge_deltas(deltas, workout_stats.contribution_of(db_workout))
+        workout_stats.apply_stats_deltas(db, deltas)
         db.commit()
         db.refresh(db_workout)
     return db_workout
@@ -108,9 +218,11 @@ def delete_workout(db: Session, workout_id: int) -> bool:
     Returns:
         True если удаление прошло успешно, иначе False
     """
-    db_workout = get_workout(db, workout_id)
+    db_workout = get_workout(db, workout_id, with_exercises=True)
     if db_workout:
+        deltas = workout_stats.merge_deltas({}, workout_stats.contribution_of(db_workout), sign=-1)
         db.delete(db_workout)
+        workout_stats.apply_stats_deltas(db, deltas)
         db.commit()
         return True
     return False
@@ -121,7 +233,8 @@ def get_workouts_by_exercise(
         exercise_id: int,
         owner_id: int,
         skip: int = 0,
-        limit: int = 100
+        limit: int = 100,
+        with_exercises: bool = False
 ) -> List[models_Workout]:
     """Получение тренировок, содержащих указанное упражнение.
 
@@ -131,12 +244,14 @@ def get_workouts_by_exercise(
         owner_id: ID владельца тренировок
         skip: Количество пропускаемых записей
         limit: Максимальное количество возвращаемых записей
+        with_exercises: Загрузить упражнения всех тренировок одним запросом
 
     Returns:
         Список тренировок
     """
+    query = db.query(models_Workout)
     return (
-        db.query(models_Workout)
+        _with_exercises(query, with_exercises)
         .filter(models_Workout.owner_id == owner_id)
         .filter(models_Workout.exercises.any(id=exercise_id))
         .offset(skip)
@@ -155,9 +270,8 @@ def create_user_workout(db: Session, workout: WorkoutCreate, user_id: int) -> mo
 
     Returns:
         Созданная тренировка
+
+    Raises:
+        ValueError: Неизвестные ID упражнений или неверная дата
     """
-    db_workout = models_Workout(**workout.dict(), owner_id=user_id)
-    db.add(db_workout)
-    db.commit()
-    db.refresh(db_workout)
-    return db_workout
+    return create_workouts(db, [workout], user_id)[0]
@@ -0,0 +1,254 @@
+"""Модуль для поддержки недельной статистики тренировок (таблица workout_weekly_stats).
+
+Таблица хранит итоги по ключу (owner_id, ISO-неделя, группа мышц) и
+обновляется инкрементально: create/update/delete тренировок прибавляют или
+вычитают вклад тренировки в той же транзакции, поэтому чтение статистики
+стоит O(недель), а не O(тренировок).  Смена группы мышц или удаление
+упражнения так же переносит вклад всех тренировок с ним
+(:func:`exercise_change_deltas`).  :func:`rebuild_workout_stats`
+пересчитывает таблицу с нуля.
+"""
+
+from collections import Counter
+from datetime import date
+from itertools import groupby
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.models.exercise import Exercise as models_Exercise
+from app.models.workout import Workout as models_Workout, workout_exercise
+from app.models.workout_stats import ALL_MUSCLE_GROUPS, WorkoutWeeklyStats as models_WorkoutWeeklyStats
+
+# Ключ строки статистики: (owner_id, iso_year, iso_week, muscle_group)
+StatsKey = Tuple[int, int, int, str]
+
+# Изменения статистики: ключ -> [sessions, minutes, exercise_count]
+StatsDeltas = Dict[StatsKey, list]
+
+# Строк тренировок, читаемых за один раз при пересчёте
+STATS_REBUILD_CHUNK = 1000
+
+_stats_table = models_WorkoutWeeklyStats.__table__
+_KEY_COLUMNS = ("owner_id", "iso_year", "iso_week", "muscle_group")
+_VALUE_COLUMNS = ("sessions", "minutes", "exercise_count")
+
+
+def workout_contribution(
+        owner_id: int,
+        workout_date: Optional[date],
+        duration: Optional[int],
+        muscle_groups: Sequence[str]
+) -> StatsDeltas:
+    """Вклад одной тренировки в статистику.
+
+    Тренировка добавляет одну сессию и всю длительность в итог недели, а в
+    каждую свою группу мышц - одну сессию и долю длительности по числу
+    упражнений этой группы.
+
+    Args:
+        owner_id: ID владельца тренировки
+        workout_date: Дата тренировки (без даты тренировка не учитывается)
+        duration: Длительность в минутах
+        muscle_groups: Группы мышц упражнений тренировки (по одной на упражнение)
+
+    Returns:
+        Изменения статистики
+    """
+    if workout_date is None:
+        return {}
+    iso_year, iso_week, _ = workout_date.isocalendar()
+    minutes = float(duration or 0)
+    contribution = {(owner_id, iso_year, iso_week, ALL_MUSCLE_GROUPS): [1, minutes, len(muscle_groups)]}
+    for group, count in Counter(group for group in muscle_groups if group).items():
+        contribution[(owner_id, iso_year, iso_week, group)] = [1, minutes * count / len(muscle_groups), count]
+    return contribution
+
+
+def contribution_of(workout: models_Workout) -> StatsDeltas:
+    """Вклад тренировки из БД (упражнения должны быть загружены)."""
+    return workout_contribution(
+        workout.owner_id, workout.date, workout.duration,
+        [exercise.muscle_group for exercise in workout.exercises]
+    )
+
+
+def merge_deltas(total: StatsDeltas, deltas: StatsDeltas, sign: int = 1) -> StatsDeltas:
+    """Прибавление ``deltas`` (со знаком ``sign``) к ``total`` на месте."""
+    for key, values in deltas.items():
+        current = total.setdefault(key, [0, 0.0, 0])
+        for i, value in enumerate(values):
+            current[i] += sign * value
+    return total
+
+
+def apply_stats_deltas(db: Session, deltas: StatsDeltas) -> None:
+    """Применение изменений к таблице статистики одним пакетным upsert.
+
+    Не фиксирует транзакцию: вызывается вместе с изменением тренировок.
+    Строки, в которых не осталось тренировок, удаляются.
+    """
+    rows = [
+        dict(zip(_KEY_COLUMNS + _VALUE_COLUMNS, key + tuple(values)))
+        for key, values in deltas.items()
+        if any(values)
+    ]
+    if not rows:
+        return
+
+    # ON CONFLICT есть и в Postgres, и в SQLite
+    insert = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    statement = insert(_stats_table)
+    statement = statement.on_conflict_do_update(
+        index_elements=list(_KEY_COLUMNS),
+        set_={column: _stats_table.c[column] + statement.excluded[column] for column in _VALUE_COLUMNS}
+    )
+    db.execute(statement, rows)
+    db.execute(
+        delete(_stats_table)
+        .where(_stats_table.c.owner_id.in_({row["owner_id"] for row in rows}))
+        .where(_stats_table.c.sessions <= 0)
+    )
+
+
+def rebuild_workout_stats(db: Session, owner_id: Optional[int] = None) -> int:
+    """Пересчёт статистики с нуля по всем тренировкам.
+
+    Args:
+        db: Сессия базы данных
+        owner_id: Пересчитать только этого пользователя (None - всех)
+
+    Returns:
+        Количество записанных строк статистики
+    """
+    clear = delete(_stats_table)
+    query = _workout_rows()
+    if owner_id is not None:
+        clear = clear.where(_stats_table.c.owner_id == owner_id)
+        query = query.where(models_Workout.owner_id == owner_id)
+
+    db.execute(clear)
+    totals: StatsDeltas = {}
+    for first, rows in _by_workout(db.execute(query)):
+        groups = [row.muscle_group for row in rows]
+        merge_deltas(totals, workout_contribution(first.owner_id, first.date, first.duration, groups))
+    apply_stats_deltas(db, totals)
+    db.commit()
+    return sum(1 for values in totals.values() if any(values))
+
+
+def exercise_change_deltas(
+        db: Session,
+        exercise_id: int,
+        muscle_group: Optional[str] = None,
+        removed: bool = False
+) -> StatsDeltas:
+    """Изменение статистики при смене группы мышц или удалении упражнения.
+
+    Вклад каждой тренировки с этим упражнением считается по текущим группам
+    мышц и по новым, результат - их разница.  Вызывается до записи
+    изменения упражнения, в той же транзакции, иначе вклад тренировки при её
+    последующем изменении или удалении вычитался бы не из тех строк.
+
+    Args:
+        db: Сессия базы данных
+        exercise_id: ID упражнения
+        muscle_group: Новая группа мышц упражнения
+        removed: Упражнение удаляется (и исчезает из тренировок)
+
+    Returns:
+        Изменения статистики
+    """
+    containing = select(workout_exercise.c.workout_id).where(workout_exercise.c.exercise_id == exercise_id)
+    query = _workout_rows().where(models_Workout.id.in_(containing))
+
+    deltas: StatsDeltas = {}
+    for first, rows in _by_workout(db.execute(query)):
+        old_groups = [row.muscle_group for row in rows]
+        new_groups = [
+            muscle_group if row.exercise_id == exercise_id else row.muscle_group
+            for row in rows
+            if not (removed and row.exercise_id == exercise_id)
+        ]
+        merge_deltas(deltas, workout_contribution(first.owner_id, first.date, first.duration, old_groups), sign=-1)
+        merge_deltas(deltas, workout_contribution(first.owner_id, first.date, first.duration, new_groups))
+    return deltas
+
+
+def _workout_rows():
+    """Тренировки с группами мышц упражнений: строка на упражнение (или одна без упражнений)."""
+    return (
+        select(
+            models_Workout.id, models_Workout.owner_id, models_Workout.date, models_Workout.duration,
+            models_Exercise.id.label("exercise_id"), models_Exercise.muscle_group,
+        )
+        .outerjoin(workout_exercise, workout_exercise.c.workout_id == models_Workout.id)
+        .outerjoin(models_Exercise, models_Exercise.id == workout_exercise.c.exercise_id)
+        .order_by(models_Workout.id)
+        .execution_options(yield_per=STATS_REBUILD_CHUNK)
+    )
+
+
+def _by_workout(result):
+    """Пары (первая строка тренировки, строки её упражнений) из результата _workout_rows."""
+    # Строки одной тренировки идут подряд
+    for _, rows in groupby(result, key=lambda row: row.id):
+        rows = list(rows)
+        yield rows[0], [row for row in rows if row.exercise_id is not None]
+
+
+def get_weekly_stats(
+        db: Session,
+        owner_id: int,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+) -> List[dict]:
+    """Недельная статистика пользователя.
+
+    Args:
+        db: Сессия базы данных
+        owner_id: ID пользователя
+        start_date: Начиная с недели, содержащей эту дату
+        end_date: Заканчивая неделей, содержащей эту дату
+
+    Returns:
+        Недели по возрастанию: итоги недели и статистика по группам мышц
+    """
+    week = tuple_(models_WorkoutWeeklyStats.iso_year, models_WorkoutWeeklyStats.iso_week)
+    query = db.query(models_WorkoutWeeklyStats).filter(models_WorkoutWeeklyStats.owner_id == owner_id)
+    if start_date is not None:
+        query = query.filter(week >= tuple_(*start_date.isocalendar()[:2]))
+    if end_date is not None:
+        query = query.filter(week <= tuple_(*end_date.isocalendar()[:2]))
+    rows = query.order_by(
+        models_WorkoutWeeklyStats.iso_year,
+        models_WorkoutWeeklyStats.iso_week,
+        models_WorkoutWeeklyStats.muscle_group,
+    )
+
+    weeks = []
+    for (iso_year, iso_week), week_rows in groupby(rows, key=lambda row: (row.iso_year, row.iso_week)):
+        summary = {
+            "iso_year": iso_year,
+            "iso_week": iso_week,
+            "week_start": date.fromisocalendar(iso_year, iso_week, 1),
+            "sessions": 0,
+            "minutes": 0.0,
+            "exercise_count": 0,
+            "muscle_groups": {},
+        }
+        for row in week_rows:
+            values = {
+                "sessions": row.sessions,
+                "minutes": round(row.minutes, 2),
+                "exercise_count": row.exercise_count,
+            }
+            if row.muscle_group == ALL_MUSCLE_GROUPS:
+                summary.update(values)
+            else:
+                summary["muscle_groups"][row.muscle_group] = values
+        weeks.append(summary)
+    return weeks
@@ -1,29 +1,266 @@
 """
 Async database configuration for FastAPI with SQLAlchemy 2.0+
+
+The only engine of the application: every module gets its engine, session
+factory and declarative ``Base`` from here.  Pool settings come from
+``settings`` (``db_pool_size``, ``db_max_overflow``, ``db_pool_timeout``,
+``db_pool_recycle``, ``db_pool_pre_ping``) and :func:`pool_stats` reports
+pool usage, including how long requests waited for a connection.
+
+Read replicas (``settings.db_replica_urls``) are used by sessions from
+:func:`get_read_db`: their SELECTs go to a healthy replica, the same one for
+the whole session, while writes, ``SELECT ... FOR UPDATE`` and every
+statement after the session's first write go to the primary
+(read-after-write).  Replicas are probed in the
+background and dropped on disconnects; with none healthy, reads fall back
+to the primary.
 """
 
-from sqlalchemy.orm import declarative_base, sessionmaker
-from sqlalchemy.pool import NullPool
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from typing import List, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.sql.selectable import Select
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncSession
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
 
 # URL подключения
-SQLALCHEMY_DATABASE_URL = "postgresql+asyncpg://postgres:postgrespassword@db:5432/fitness_db"
+SQLALCHEMY_DATABASE_URL = settings.database_url
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that measures how long checkouts wait for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.reset_wait_stats()
+
+    def reset_wait_stats(self):
+        with self._stats_lock:
+            self.checkouts = 0
+            self.checkout_timeouts = 0
+            self.wait_seconds_total = 0.0
+            self.wait_seconds_max = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            with self._stats_lock:
+                self.checkout_timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            with self._stats_lock:
+                self.checkouts += 1
+                self.wait_seconds_total += waited
+                self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+    def wait_stats(self) -> dict:
+        """Checkouts, checkout timeouts and wait time (seconds) so far"""
+        with self._stats_lock:
+            return {
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.checkout_timeouts,
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_max": self.wait_seconds_max,
+            }
+
+
+class ReplicaSet:
+    """Read replicas with their health state.
+
+    ``pick`` hands out healthy replicas round-robin.  A replica is marked
+    down by a failed probe or as soon as one of its connections reports a
+    disconnect, and comes back after the next successful probe.
+    """
+
+    def __init__(self, engines: List[AsyncEngine], max_lag_seconds: Optional[float] = None):
+        self.engines = list(engines)
+        self.max_lag_seconds = max_lag_seconds
+        self.healthy = [True] * len(self.engines)
+        self._turn = itertools.count()
+        for engine in self.engines:
+            event.listen(engine.sync_engine, "handle_error", self._on_error)
+
+    def pick(self) -> Optional[AsyncEngine]:
+        """A healthy replica, or ``None`` when reads must go to the primary"""
+        healthy = [engine for engine, ok in zip(self.engines, self.healthy) if ok]
+        if not healthy:
+            return None
+        return healthy[next(self._turn) % len(healthy)]
+
+    def is_healthy(self, engine: AsyncEngine) -> bool:
+        """Whether ``engine`` is one of the replicas and currently healthy"""
+        return any(ok for candidate, ok in zip(self.engines, self.healthy) if candidate is engine)
+
+    def _set_health(self, index: int, ok: bool) -> None:
+        if self.healthy[index] != ok:
+            logger.warning(
+                "Read replica %s is %s",
+                self.engines[index].url.render_as_string(hide_password=True), "up" if ok else "down"
+            )
+        self.healthy[index] = ok
+
+    def _on_error(self, context) -> None:
+        if context.is_disconnect:
+            for index, engine in enumerate(self.engines):
+                if engine.sync_engine is context.engine:
+                    self._set_health(index, False)
+
+    async def _probe(self, engine: AsyncEngine) -> bool:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            if self.max_lag_seconds is None or engine.dialect.name != "postgresql":
+                return True
+            # Without new writes the last replayed transaction gets old while
+            # the replica is fully caught up: that is no lag
+            lag = await conn.scalar(text(
+                "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+                " ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+            ))
+            return float(lag) <= self.max_lag_seconds
+
+    async def check_health(self, timeout: float = settings.db_replica_health_timeout) -> List[bool]:
+        """Probe every replica once and update its state."""
+        for index, engine in enumerate(self.engines):
+            try:
+                ok = await asyncio.wait_for(self._probe(engine), timeout)
+            except Exception:  # любая ошибка проверки исключает реплику
+                ok = False
+            self._set_health(index, ok)
+        return list(self.healthy)
+
+    async def run_health_checks(self, interval: float = settings.db_replica_health_interval) -> None:
+        """Probe the replicas every ``interval`` seconds until cancelled."""
+        while True:
+            await self.check_health()
+            await asyncio.sleep(interval)
+
+    def stats(self) -> List[dict]:
+        return [
+            {"url": engine.url.render_as_string(hide_password=True), "healthy": ok}
+            for engine, ok in zip(self.engines, self.healthy)
+        ]
+
+
+class RoutingSession(Session):
+    """Session that sends reads to ``info["replicas"]`` and writes to its bind.
+
+    The replica is picked on the first read and kept in ``info["replica"]``,
+    so all reads of the session (``set_config`` and the search query, a page
+    and its ``selectinload``) run on the same server; another one is picked
+    only if it goes down.  Once the session has written, it stays on the
+    primary so that it reads its own writes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        replicas = self.info.get("replicas")
+        writing = (
+            self._flushing
+            or isinstance(clause, UpdateBase)
+            or (isinstance(clause, Select) and clause._for_update_arg is not None)
+        )
+        if writing:
+            self.info["wrote"] = True
+        elif replicas is not None and not self.info.get("wrote"):
+            replica = self.info.get("replica")
+            # None закрепляет сессию за primary (здоровых реплик не было)
+            if "replica" not in self.info or (replica is not None and not replicas.is_healthy(replica)):
+                replica = self.info["replica"] = replicas.pick()
+            if replica is not None:
+                return replica.sync_engine
+        return super().get_bind(mapper, clause=clause, **kw)
+
+
+def _create_engine(url: str) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        echo=settings.db_echo,
+        poolclass=TimedQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+    )
+
+
+def read_sessionmaker(primary: AsyncEngine, replicas: ReplicaSet) -> sessionmaker:
+    """Фабрика сессий для чтения: SELECT - на реплики, запись - на ``primary``."""
+    return sessionmaker(
+        bind=primary,
+        class_=AsyncSession,
+        sync_session_class=RoutingSession,
+        expire_on_commit=False,
+        info={"replicas": replicas},
+    )
+
 
 async def create_tables():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
 # Создаем асинхронный движок
-engine = create_async_engine(SQLALCHEMY_DATABASE_URL)
+engine = _create_engine(SQLALCHEMY_DATABASE_URL)
 AsyncSessionLocal = sessionmaker(
     bind=engine,
     class_=AsyncSession,
     expire_on_commit=False
 )
 
+# Реплики для чтения
+replicas = ReplicaSet(
+    [_create_engine(url.strip()) for url in settings.db_replica_urls.split(",") if url.strip()],
+    max_lag_seconds=settings.db_replica_max_lag_seconds,
+)
+ReadSessionLocal = read_sessionmaker(engine, replicas)
+
 Base = declarative_base()
 
 async def get_db():
     """Генератор асинхронных сессий"""
     async with AsyncSessionLocal() as session:
-        yield session
\ No newline at end of file
+        yield session
+
+
+async def get_read_db():
+    """Генератор сессий для запросов только на чтение (чтение с реплик)"""
+    async with ReadSessionLocal() as session:
+        yield session
+
+
+def pool_stats() -> dict:
+    """Состояние пула соединений для подбора его размера.
+
+    Returns:
+        dict: Размер пула, занятые/свободные соединения, overflow и время
+        ожидания соединения (среднее и максимальное, мс)
+    """
+    pool = engine.sync_engine.pool
+    waits = pool.wait_stats()
+    checkouts = waits["checkouts"]
+    return {
+        "pool_size": pool.size(),
+        "max_overflow": settings.db_max_overflow,
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "checkouts": checkouts,
+        "checkout_timeouts": waits["checkout_timeouts"],
+        "wait_ms_avg": round(waits["wait_seconds_total"] / checkouts * 1000, 3) if checkouts else 0.0,
+        "wait_ms_max": round(waits["wait_seconds_max"] * 1000, 3),
+    }
@@ -1,10 +1,4 @@
-"""Настройки подключения к базе данных."""
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+"""Настройки подключения к базе данных (единый движок из app.database)."""
+from app.database import AsyncSessionLocal, Base, SQLALCHEMY_DATABASE_URL, engine
 
-SQLALCHEMY_DATABASE_URL="postgresql+asyncpg://postgres:postgrespassword@db:5432/fitness_db"  # Замените на свои реквизиты
-
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
\ No newline at end of file
+__all__ = ["AsyncSessionLocal", "Base", "SQLALCHEMY_DATABASE_URL", "engine"]
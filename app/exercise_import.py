@@ -0,0 +1,252 @@
+"""
+Bulk import of the exercise catalog from NDJSON or CSV.
+
+Input is consumed as a stream of lines (NDJSON: one record per line; CSV: a
+header line first, quoted fields may span lines) and processed in chunks:
+each chunk is validated against ``ExerciseCreate`` and written with
+:func:`app.crud.exercise.bulk_write_exercises` (multi-row INSERT, batched
+UPDATE for upsert-by-name).  Only one chunk is held in memory at a time, so
+memory use does not depend on the input size.  Bad rows are reported with
+their line number and do not abort the import.  Every written chunk
+increments the shared catalog version, so the optimizer snapshots of all
+running workers are reloaded, also after a command-line import.
+
+Used by ``POST /exercises/import`` and from the command line:
+
+    python -m app.exercise_import exercises.ndjson
+    python -m app.exercise_import exercises.csv --format csv --no-upsert
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import sys
+from collections import deque
+from typing import AsyncIterator, Iterable, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.exercise import bulk_write_exercises
+from app.database import AsyncSessionLocal
+from app.schemas.exercise import ExerciseCreate, ExerciseImportError, ExerciseImportReport
+
+# Rows validated and written per round trip
+IMPORT_CHUNK_SIZE = 1000
+
+# Per-row errors kept in the report; further errors are only counted
+MAX_REPORTED_ERRORS = 1000
+
+IMPORT_FORMATS = ("ndjson", "csv")
+
+
+class _LineFeed:
+    """Pending input lines, consumed by the parser's streaming ``csv.reader``.
+
+    ``taken`` holds the lines of the record being read.  ``starved`` is set
+    when the reader needs another line and none is pending, i.e. the record
+    is still open (a quoted field continues in the next chunk).
+    """
+
+    def __init__(self):
+        self.pending = deque()
+        self.taken: List[str] = []
+        self.starved = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        if not self.pending:
+            self.starved = True
+            raise StopIteration
+        line = self.pending.popleft()
+        self.taken.append(line)
+        # Line breaks inside quoted fields are part of the value
+        return line if line.endswith("\n") else line + "\n"
+
+
+class _RowParser:
+    """Turns input lines into (line number, dict) records or errors."""
+
+    def __init__(self, fmt: str):
+        if fmt not in IMPORT_FORMATS:
+            raise ValueError(f"Unknown import format {fmt!r}, expected one of {IMPORT_FORMATS}")
+        self.fmt = fmt
+        self.header: Optional[List[str]] = None
+        self.line = 0
+        if fmt == "csv":
+            # One reader for the whole input, so a record may span lines and chunks
+            self._feed = _LineFeed()
+            self._reader = csv.reader(self._feed)
+
+    def parse(
+            self,
+            lines: Iterable[str],
+            final: bool = False
+    ) -> Tuple[List[Tuple[int, dict]], List[Tuple[int, str]]]:
+        """Parse the next chunk of lines; ``final`` marks the end of the input."""
+        if self.fmt == "csv":
+            return self._parse_csv(lines, final)
+
+        records, errors = [], []
+        for line in lines:
+            self.line += 1
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError("expected a JSON object")
+            except ValueError as exc:
+                errors.append((self.line, str(exc)))
+                continue
+            records.append((self.line, record))
+        return records, errors
+
+    def _parse_csv(self, lines, final):
+        records, errors = [], []
+        feed = self._feed
+        feed.pending.extend(lines)
+        while feed.pending:
+            feed.taken, feed.starved = [], False
+            try:
+                values = next(self._reader)
+                error = None
+            except csv.Error as exc:
+                values, error = None, str(exc)
+            if feed.starved and not final:
+                # The record continues in the next chunk: read it again from the start
+                feed.pending.extendleft(reversed(feed.taken))
+                break
+
+            line = self.line + 1
+            self.line += len(feed.taken)
+            if feed.starved:
+                error = "unterminated quoted field"
+            if error is not None:
+                errors.append((line, error))
+                continue
+            if len(feed.taken) == 1 and not feed.taken[0].strip():
+                continue
+            if self.header is None:
+                self.header = [name.strip() for name in values]
+                continue
+            if len(values) != len(self.header):
+                errors.append((line, f"expected {len(self.header)} columns, got {len(values)}"))
+                continue
+            # Empty CSV cells are missing values
+            records.append((line, {name: value for name, value in zip(self.header, values) if value != ""}))
+        return records, errors
+
+
+def _validate(records: List[Tuple[int, dict]]) -> Tuple[List[Tuple[int, ExerciseCreate]], List[Tuple[int, str]]]:
+    valid, errors = [], []
+    for row, record in records:
+        try:
+            valid.append((row, ExerciseCreate(**record)))
+        except ValidationError as exc:
+            errors.append((row, "; ".join(
+                f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in exc.errors()
+            )))
+    return valid, errors
+
+
+def _add_errors(report: ExerciseImportReport, errors: List[Tuple[int, str]]) -> None:
+    report.failed += len(errors)
+    room = MAX_REPORTED_ERRORS - len(report.errors)
+    if len(errors) > room:
+        report.errors_truncated = True
+    report.errors.extend(ExerciseImportError(row=row, error=error) for row, error in errors[:max(room, 0)])
+
+
+async def import_exercises(
+        db: AsyncSession,
+        lines: AsyncIterator[str],
+        fmt: str = "ndjson",
+        upsert: bool = True,
+        chunk_size: int = IMPORT_CHUNK_SIZE
+) -> ExerciseImportReport:
+    """Import exercises from a stream of lines.
+
+    Args:
+        db: Async database session
+        lines: Input lines (NDJSON records, or a CSV header and rows)
+        fmt: ``"ndjson"`` or ``"csv"``
+        upsert: Update exercises whose name already exists instead of adding
+            a second one
+        chunk_size: Lines validated and written per chunk
+
+    Returns:
+        ExerciseImportReport: Counters and per-row errors
+    """
+    parser = _RowParser(fmt)
+    report = ExerciseImportReport()
+
+    async def flush(chunk, final=False):
+        records, errors = parser.parse(chunk, final)
+        valid, invalid = _validate(records)
+        written = (0, 0, [])
+        if valid:
+            written = await db.run_sync(lambda session: bulk_write_exercises(session, valid, upsert))
+        report.processed += len(records) + len(errors)
+        report.inserted += written[0]
+        report.updated += written[1]
+        _add_errors(report, sorted(errors + invalid + written[2]))
+
+    chunk = []
+    async for line in lines:
+        chunk.append(line)
+        if len(chunk) >= chunk_size:
+            await flush(chunk)
+            chunk = []
+    # Also reports a CSV record left open at the end of the input
+    await flush(chunk, final=True)
+    return report
+
+
+async def iter_text_lines(chunks: AsyncIterator[bytes], encoding: str = "utf-8") -> AsyncIterator[str]:
+    """Split a stream of byte chunks (e.g. a request body) into text lines."""
+    pending = b""
+    async for data in chunks:
+        pending += data
+        *complete, pending = pending.split(b"\n")
+        for line in complete:
+            yield line.decode(encoding)
+    if pending:
+        yield pending.decode(encoding)
+
+
+async def _file_lines(path: str) -> AsyncIterator[str]:
+    with open(path, encoding="utf-8", newline="") as source:
+        for line in source:
+            yield line
+
+
+async def _run_cli(args) -> ExerciseImportReport:
+    async with AsyncSessionLocal() as db:
+        return await import_exercises(
+            db, _file_lines(args.path), fmt=args.format, upsert=args.upsert, chunk_size=args.chunk_size
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("path", help="NDJSON or CSV file")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, default=None,
+                        help="defaults to the file extension")
+    parser.add_argument("--no-upsert", dest="upsert", action="store_false",
+                        help="always insert, even if an exercise with the same name exists")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+    if args.format is None:
+        args.format = "csv" if args.path.lower().endswith(".csv") else "ndjson"
+
+    report = asyncio.run(_run_cli(args))
+    print(report.json(indent=2))
+    sys.exit(1 if report.failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,18 +2,17 @@
 Main FastAPI application module.
 Defines the FastAPI app instance and connects all components.
 """
+import asyncio
 from datetime import date
 from typing import List
 from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import Session
-from app.db.session import SessionLocal, engine, Base
+from app.database import Base, engine, get_db, pool_stats, replicas
 from app.models.user import User
 from app.schemas.user import UserCreate, UserOut
 from app.schemas.token import Token
-from app.db.base import Base, engine
 from app.auth.auth import (
     get_current_user,
     create_access_token,
@@ -24,7 +23,8 @@ from app.routers import auth_router
 from app.core.security import get_password_hash, verify_password
 from sqlalchemy.future import select
 from .database import create_tables
-from .routers import auth_router  # Импортируем роутер из отдельного файла
+from .routers import auth_router, exercises_router, workouts_router  # Импортируем роутеры из отдельных файлов
+from app.algorithms.executor import optimizer_pool
 
 
 app = FastAPI(
@@ -37,9 +37,21 @@ app = FastAPI(
 @app.on_event("startup")
 async def startup():
     await create_tables()
+    # Фоновая проверка реплик для чтения
+    if replicas.engines:
+        app.state.replica_health = asyncio.create_task(replicas.run_health_checks())
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    optimizer_pool.shutdown()
+    if replicas.engines:
+        app.state.replica_health.cancel()
 
 # Подключаем роутеры
 app.include_router(auth_router)
+app.include_router(exercises_router)
+app.include_router(workouts_router)
 
 # CORS
 app.add_middleware(
@@ -55,8 +67,6 @@ from fastapi import APIRouter
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 # Database initialization
-from app.db.base import Base, engine
-
 async def create_db_tables():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
@@ -70,15 +80,6 @@ async def on_startup():
     await startup_db()  # Не забываем await!
 
 
-# Dependency
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 # Auth endpoints
 @app.post(
     "/auth/register",
@@ -88,10 +89,11 @@ def get_db():
 )
 async def register_user(
         user: UserCreate,
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_db)
 ):
     """Register a new user"""
-    db_user = db.query(User).filter(User.email == user.email).first()
+    result = await db.execute(select(User).where(User.email == user.email))
+    db_user = result.scalar_one_or_none()
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -105,8 +107,8 @@ async def register_user(
         hashed_password=hashed_password
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     return db_user
 
 
@@ -165,6 +167,18 @@ async def health_check():
     """Service health monitoring"""
     return {"status": "healthy"}
 
+
+@app.get("/health/db-pool", tags=["Health"])
+async def db_pool_health():
+    """Database connection pool usage"""
+    return pool_stats()
+
+
+@app.get("/health/db-replicas", tags=["Health"])
+async def db_replicas_health():
+    """Read replica health as seen by this process"""
+    return {"replicas": replicas.stats()}
+
 async def init_models():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
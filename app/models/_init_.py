@@ -2,5 +2,7 @@ from app.models.base import Base  # Или из файла, где объявл
 from app.models.user import User  # Импортируйте все модели
 from app.models.exercise import Exercise
 from app.models.workout import Workout
+from app.models.workout_stats import WorkoutWeeklyStats
+from app.models.catalog_version import CatalogVersion
 
-__all__ = ["Base", "User", "Exercise", "Workout"]
\ No newline at end of file
+__all__ = ["Base", "User", "Exercise", "Workout", "WorkoutWeeklyStats", "CatalogVersion"]
\ No newline at end of file
@@ -2,6 +2,6 @@
 база данных
 """
 
-from sqlalchemy.ext.declarative import declarative_base
+from app.database import Base
 
-Base = declarative_base()
+__all__ = ["Base"]
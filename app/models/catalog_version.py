@@ -0,0 +1,25 @@
+"""Модуль содержит модель версии каталога упражнений (CatalogVersion)."""
+
+from sqlalchemy import Column, Integer
+from app.database import Base  # pylint: disable=import-error
+
+# id единственной строки таблицы catalog_version
+CATALOG_VERSION_ID = 1
+
+
+class CatalogVersion(Base):
+    """Версия каталога упражнений, общая для всех процессов.
+
+    Единственная строка (id = CATALOG_VERSION_ID); ``version`` увеличивается
+    в той же транзакции, что и любая запись в таблицу упражнений.  По ней
+    каждый процесс проверяет свой снимок каталога (app/algorithms/catalog.py).
+
+    Attributes:
+        id (int): Всегда CATALOG_VERSION_ID
+        version (int): Номер версии каталога
+    """
+
+    __tablename__ = "catalog_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
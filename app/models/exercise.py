@@ -1,8 +1,8 @@
 """Модуль содержит модель упражнения (Exercise) для работы с базой данных."""
 
-from sqlalchemy import Column, Integer, String, Float, Boolean
+from sqlalchemy import Column, Integer, String, Float, Boolean, Index
 from sqlalchemy.orm import relationship
-from app.db.session import Base # pylint: disable=import-error
+from app.database import Base  # pylint: disable=import-error
 
 
 class Exercise(Base):
@@ -22,6 +22,18 @@ class Exercise(Base):
     """
 
     __tablename__ = "exercises"
+    __table_args__ = (
+        # Индексы под фильтры оптимизатора тренировок (цель + уровень подготовки)
+        Index("ix_exercises_is_cardio_difficulty", "is_cardio", "difficulty"),
+        Index("ix_exercises_muscle_group_difficulty", "muscle_group", "difficulty"),
+        Index("ix_exercises_difficulty", "difficulty"),
+        # Пагинация по курсору в списках упражнений
+        Index("ix_exercises_name_id", "name", "id"),
+        Index("ix_exercises_muscle_group_id", "muscle_group", "id"),
+        Index("ix_exercises_is_cardio_id", "is_cardio", "id"),
+        # GIN-индексы по триграммам (name, description) для поиска требуют
+        # pg_trgm и создаются только миграцией 9d3a6e1f2b47
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
@@ -1,11 +1,9 @@
 """Модуль содержит модель пользователя (User) для работы с базой данных."""
 
 from sqlalchemy import Column, Integer, String, Boolean, ARRAY
-from app.db.session import Base  # pylint: disable=import-error
+from app.database import Base  # pylint: disable=import-error
 from sqlalchemy import Table
 
-from app.core.database import Base
-
 """Модель пользователя в системе.
 
     Attributes:
@@ -1,8 +1,8 @@
 """Модуль содержит модель тренировки (Workout) и ассоциативную таблицу для связи с упражнениями."""
 
-from sqlalchemy import Table, Column, Integer, String, Date, ForeignKey
+from sqlalchemy import Table, Column, Integer, String, Date, ForeignKey, Index
 from sqlalchemy.orm import relationship
-from app.db.session import Base  # pylint: disable=import-error
+from app.database import Base  # pylint: disable=import-error
 
 
 class Workout(Base):
@@ -19,6 +19,10 @@ class Workout(Base):
     """
 
     __tablename__ = "workouts"
+    __table_args__ = (
+        # Пагинация по курсору: тренировки пользователя по (date, id)
+        Index("ix_workouts_owner_date_id", "owner_id", "date", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
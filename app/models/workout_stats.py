@@ -0,0 +1,35 @@
+"""Модуль содержит модель недельной статистики тренировок (WorkoutWeeklyStats)."""
+
+from sqlalchemy import Column, Integer, String, Float, ForeignKey
+from app.database import Base  # pylint: disable=import-error
+
+# Значение muscle_group для итогов недели по всем тренировкам
+ALL_MUSCLE_GROUPS = ""
+
+
+class WorkoutWeeklyStats(Base):
+    """Сводная статистика тренировок пользователя за ISO-неделю.
+
+    Поддерживается инкрементально в create/update/delete тренировок
+    (app/crud/workout_stats.py) в той же транзакции.
+
+    Attributes:
+        owner_id (int): ID владельца тренировок
+        iso_year (int): ISO-год недели
+        iso_week (int): Номер ISO-недели (1-53)
+        muscle_group (str): Группа мышц; ALL_MUSCLE_GROUPS - итог по неделе
+        sessions (int): Количество тренировок (с этой группой мышц)
+        minutes (float): Минуты тренировок; для группы мышц - доля
+            длительности тренировки по числу её упражнений
+        exercise_count (int): Количество упражнений
+    """
+
+    __tablename__ = "workout_weekly_stats"
+
+    owner_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    iso_year = Column(Integer, primary_key=True)
+    iso_week = Column(Integer, primary_key=True)
+    muscle_group = Column(String, primary_key=True)
+    sessions = Column(Integer, nullable=False, default=0)
+    minutes = Column(Float, nullable=False, default=0.0)
+    exercise_count = Column(Integer, nullable=False, default=0)
@@ -1,3 +1,5 @@
 from .auth import router as auth_router
+from .exercises import router as exercises_router
+from .workouts import router as workouts_router
 
-__all__ = ["auth_router"]
\ No newline at end of file
+__all__ = ["auth_router", "exercises_router", "workouts_router"]
\ No newline at end of file
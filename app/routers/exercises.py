@@ -0,0 +1,109 @@
+from typing import AsyncIterator, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import ReadSessionLocal, get_db, get_read_db
+from app.auth.auth import get_current_user
+from app.core.config import settings
+from app.models.user import User
+from app.crud.exercise import (
+    get_cardio_exercises,
+    get_exercises,
+    get_exercises_by_muscle_group,
+    search_exercises,
+)
+from app.crud.loader import BatchLoader, exercise_loader, shared_exercise_loader
+from app.schemas.exercise import Exercise, ExerciseImportReport, ExercisePage, ExerciseSearchResult
+from app.exercise_import import (
+    IMPORT_CHUNK_SIZE,
+    IMPORT_FORMATS,
+    import_exercises,
+    iter_text_lines,
+)
+
+router = APIRouter(prefix="/exercises", tags=["exercises"])
+
+
+async def get_exercise_loader() -> AsyncIterator[BatchLoader]:
+    """Загрузчик упражнений по id, общий для всех зависимостей одного запроса.
+
+    С общим загрузчиком сессия запроса не открывается: пачки выполняются в
+    собственных сессиях общего загрузчика.
+    """
+    if settings.exercise_loader_shared:
+        yield exercise_loader(shared=shared_exercise_loader)
+        return
+    async with ReadSessionLocal() as db:
+        yield exercise_loader(db)
+
+
+@router.get("", response_model=ExercisePage)
+async def list_exercises(
+    cursor: Optional[str] = Query(None, description="next_cursor предыдущей страницы"),
+    limit: int = Query(100, gt=0, le=500),
+    search: Optional[str] = None,
+    order_by: str = Query("id", description="id или name"),
+    muscle_group: Optional[str] = None,
+    cardio: bool = False,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    def page(session):
+        if cardio:
+            return get_cardio_exercises(session, cursor=cursor, limit=limit)
+        if muscle_group is not None:
+            return get_exercises_by_muscle_group(session, muscle_group, cursor=cursor, limit=limit)
+        return get_exercises(session, cursor=cursor, limit=limit, search=search, order_by=order_by)
+
+    # Пагинация по курсору; неверный курсор или сортировка - 422
+    try:
+        items, next_cursor = await db.run_sync(page)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc))
+
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@router.get("/search", response_model=List[ExerciseSearchResult])
+async def search_exercise_catalog(
+    q: str = Query(..., min_length=1, max_length=100, description="Строка поиска"),
+    limit: int = Query(20, gt=0, le=100),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    # Подстрока и опечатки в названии/описании, по убыванию релевантности
+    results = await db.run_sync(lambda session: search_exercises(session, q, limit=limit))
+    return [{"exercise": exercise, "score": score} for exercise, score in results]
+
+
+@router.post("/import", response_model=ExerciseImportReport)
+async def import_exercise_catalog(
+    request: Request,
+    format: str = Query("ndjson", description="ndjson или csv"),
+    upsert: bool = Query(True, description="Обновлять упражнения с тем же названием"),
+    chunk_size: int = Query(IMPORT_CHUNK_SIZE, gt=0, le=10_000),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    if format not in IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Unknown format {format!r}"
+        )
+
+    # Тело запроса читается потоком, в памяти только текущая пачка строк
+    lines = iter_text_lines(request.stream())
+    return await import_exercises(db, lines, fmt=format, upsert=upsert, chunk_size=chunk_size)
+
+
+@router.get("/{exercise_id}", response_model=Exercise)
+async def read_exercise(
+    exercise_id: int,
+    loader: BatchLoader = Depends(get_exercise_loader),
+    current_user: User = Depends(get_current_user)
+):
+    # Параллельные запросы упражнений объединяются в один SELECT ... IN
+    exercise = await loader.load(exercise_id)
+    if exercise is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exercise not found")
+    return exercise
@@ -0,0 +1,314 @@
+import asyncio
+from datetime import date
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.database import get_db, get_read_db
+from app.auth.auth import get_current_user
+from app.models.user import User
+from app.crud.workout import create_workouts, get_workouts
+from app.crud.workout_stats import get_weekly_stats
+from app.workout_export import EXPORT_FORMATS, MEDIA_TYPES, export_workouts
+from app.schemas.workout import (
+    BatchOptimizationRequest,
+    BatchOptimizationResponse,
+    WeeklyTrainingStats,
+    Workout,
+    WorkoutBatchCreate,
+    WorkoutCreate,
+    WorkoutPage,
+    WorkoutOptimizationParams,
+    WorkoutPlan,
+    WorkoutProgramParams,
+)
+from app.algorithms.catalog import ExerciseCatalog, catalog_version, get_catalog, sync_catalog_version
+from app.algorithms.executor import OptimizerBusyError, optimizer_pool
+from app.algorithms.instrumentation import OptimizerTrace, optimizer_histograms, start_trace
+from app.algorithms.workout_optimizer import (
+    SELECTION_STRATEGIES,
+    UserProfile,
+    candidate_query,
+    snapshot_candidates,
+    solve_alternatives,
+    solve_plan,
+    solve_plans,
+)
+from app.algorithms.plan_cache import plan_cache, plan_cache_key
+from app.algorithms.program_generator import generate_program
+
+router = APIRouter(prefix="/workouts", tags=["workouts"])
+
+
+def _check_selection_mode(params: WorkoutOptimizationParams):
+    if params.selection_mode not in SELECTION_STRATEGIES:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Unknown selection_mode {params.selection_mode!r}"
+        )
+
+
+async def _catalog_snapshot(db: AsyncSession) -> Optional[ExerciseCatalog]:
+    # Снимок каталога (None при optimizer_catalog_snapshot=False); перезагружается, когда версия в базе изменилась
+    if not settings.optimizer_catalog_snapshot:
+        return None
+    return await db.run_sync(get_catalog)
+
+
+async def _load_candidates(
+        db: AsyncSession,
+        snapshot: Optional[ExerciseCatalog],
+        params: WorkoutOptimizationParams,
+        profile: UserProfile
+) -> ExerciseCatalog:
+    # Кандидаты отбираются по битовым индексам снимка или в SQL;
+    # в пул процессов уходят только их массивы
+    if snapshot is not None:
+        return snapshot_candidates(snapshot, params, profile)
+    result = await db.execute(candidate_query(params, profile))
+    return ExerciseCatalog.from_rows(result, version=catalog_version())
+
+
+async def _run_optimizer(func, *args):
+    # Задача в пуле процессов; переполнение очереди - 503, таймаут - 504
+    try:
+        return await optimizer_pool.run(func, *args)
+    except OptimizerBusyError as exc:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc))
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="Workout optimization timed out"
+        )
+
+
+def _trace_cache_hit(trace: OptimizerTrace, plan: WorkoutPlan):
+    trace.cache_hit = True
+    trace.stage("cache", selected=len(plan.exercises))
+    trace.finish()
+
+
+async def _create_workouts(db: AsyncSession, workouts: List[WorkoutCreate], user: User):
+    try:
+        return await db.run_sync(lambda session: create_workouts(session, workouts, user.id))
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc))
+
+
+@router.get("", response_model=WorkoutPage)
+async def list_workouts(
+    cursor: Optional[str] = Query(None, description="next_cursor предыдущей страницы"),
+    limit: int = Query(50, gt=0, le=500),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    filters = {}
+    if start_date is not None:
+        filters["start_date"] = start_date
+    if end_date is not None:
+        filters["end_date"] = end_date
+
+    # Пагинация по курсору: от новых тренировок к старым; упражнения всей
+    # страницы загружаются одним запросом (ленивая загрузка в async недоступна)
+    try:
+        items, next_cursor = await db.run_sync(lambda session: get_workouts(
+            session, current_user.id, filters, {"cursor": cursor, "limit": limit}, with_exercises=True
+        ))
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc))
+
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@router.get("/export")
+async def export_workout_history(
+    format: str = Query("ndjson", description="ndjson или csv"),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Unknown format {format!r}"
+        )
+
+    # Вся история потоком: строки читаются серверным курсором и сразу отправляются
+    return StreamingResponse(
+        export_workouts(db, current_user.id, format, start_date, end_date),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="workouts.{format}"'}
+    )
+
+
+@router.get("/stats/weekly", response_model=List[WeeklyTrainingStats])
+async def weekly_stats(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    # Читается сводная таблица, а не все тренировки пользователя
+    return await db.run_sync(
+        lambda session: get_weekly_stats(session, current_user.id, start_date, end_date)
+    )
+
+
+@router.post("", response_model=Workout, status_code=status.HTTP_201_CREATED)
+async def create_workout(
+    workout: WorkoutCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    created = await _create_workouts(db, [workout], current_user)
+    return created[0]
+
+
+@router.post("/batch", response_model=List[Workout], status_code=status.HTTP_201_CREATED)
+async def create_workout_batch(
+    batch: WorkoutBatchCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    # Все тренировки пакета создаются в одной транзакции: либо все, либо ни одной
+    return await _create_workouts(db, batch.workouts, current_user)
+
+
+@router.post("/optimize", response_model=WorkoutPlan)
+async def optimize(
+    params: WorkoutOptimizationParams,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    _check_selection_mode(params)
+    profile = UserProfile.from_user(current_user)
+    # Время этапов и счётчики (None, если приёмников метрик нет)
+    trace = start_trace()
+
+    snapshot = await _catalog_snapshot(db)
+    version = snapshot.version if snapshot is not None else await db.run_sync(sync_catalog_version)
+    cache_key = plan_cache_key(params, profile, version)
+    plan = plan_cache.get(cache_key)
+    if plan is not None:
+        if trace:
+            _trace_cache_hit(trace, plan)
+        return plan
+
+    candidates = await _load_candidates(db, snapshot, params, profile)
+    if trace:
+        trace.stage("load", catalog=len(snapshot if snapshot is not None else candidates))
+
+    # Этапы фильтрации, оценки и выбора замеряются в процессе-обработчике
+    plan = await _run_optimizer(solve_plan, candidates, params.dict(), profile, trace is not None)
+    worker_trace = plan.pop("trace", None)
+    if trace:
+        trace.merge(worker_trace)
+        trace.finish()
+
+    plan = WorkoutPlan(**plan)
+    plan_cache.put(cache_key, plan)
+    return plan
+
+
+@router.post("/optimize/alternatives", response_model=List[WorkoutPlan])
+async def optimize_alternatives(
+    params: WorkoutOptimizationParams,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    profile = UserProfile.from_user(current_user)
+
+    candidates = await _load_candidates(db, await _catalog_snapshot(db), params, profile)
+
+    # До top_k различных планов за один проход лучевого поиска
+    plans = await _run_optimizer(solve_alternatives, candidates, params.dict(), profile)
+
+    return [WorkoutPlan(**plan) for plan in plans]
+
+
+@router.post("/program")
+async def generate_workout_program(
+    params: WorkoutProgramParams,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    _check_selection_mode(params)
+    profile = UserProfile.from_user(current_user)
+
+    candidates = await _load_candidates(db, await _catalog_snapshot(db), params, profile)
+
+    # Тренировки считаются по одной и сразу отправляются клиенту (NDJSON)
+    sessions = generate_program(candidates, params, profile)
+    return StreamingResponse(
+        (session.json() + "\n" for session in sessions),
+        media_type="application/x-ndjson"
+    )
+
+
+@router.post("/optimize/batch", response_model=BatchOptimizationResponse)
+async def optimize_batch(
+    batch: BatchOptimizationRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    for item in batch.requests:
+        _check_selection_mode(item.params)
+    # Все планы пакета строятся для текущего пользователя
+    profile = UserProfile.from_user(current_user)
+
+    # Трасса на каждый план пакета
+    traces = [start_trace() for _ in batch.requests]
+
+    snapshot = await _catalog_snapshot(db)
+    version = snapshot.version if snapshot is not None else await db.run_sync(sync_catalog_version)
+    cache_keys = [plan_cache_key(item.params, profile, version) for item in batch.requests]
+    plans = [plan_cache.get(cache_key) for cache_key in cache_keys]
+    misses = []
+    for i, plan in enumerate(plans):
+        if plan is None:
+            misses.append(i)
+        elif traces[i]:
+            _trace_cache_hit(traces[i], plan)
+
+    if misses:
+        # Кандидаты загружаются один раз на цель и группы мышц,
+        # все планы пакета считаются одной задачей в пуле процессов
+        candidate_sets = {}
+        requests = []
+        for i in misses:
+            params = batch.requests[i].params
+            filter_key = (params.goal, frozenset(params.target_muscles))
+            if filter_key not in candidate_sets:
+                candidate_sets[filter_key] = await _load_candidates(db, snapshot, params, profile)
+            requests.append((candidate_sets[filter_key], params.dict(), profile))
+        for i, (candidates, _, _) in zip(misses, requests):
+            if traces[i]:
+                traces[i].stage("load", catalog=len(snapshot if snapshot is not None else candidates))
+
+        solved = await _run_optimizer(solve_plans, requests, traces[0] is not None)
+        for i, plan in zip(misses, solved):
+            worker_trace = plan.pop("trace", None)
+            if traces[i]:
+                traces[i].merge(worker_trace)
+                traces[i].finish()
+            plans[i] = WorkoutPlan(**plan)
+            plan_cache.put(cache_keys[i], plans[i])
+
+    return {"plans": plans}
+
+
+@router.get("/optimize/cache-stats")
+async def plan_cache_stats(current_user: User = Depends(get_current_user)):
+    # Счётчики кэша планов для подбора его размера
+    return plan_cache.stats()
+
+
+@router.get("/optimize/metrics")
+async def optimizer_metrics(current_user: User = Depends(get_current_user)):
+    # Гистограммы времени этапов оптимизатора (при optimizer_metrics_sinks=histogram)
+    return optimizer_histograms.snapshot()
@@ -1,6 +1,6 @@
 """Модуль содержит Pydantic-схемы для работы с упражнениями."""
 
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel
 
 
@@ -48,3 +48,56 @@ class Exercise(ExerciseBase):
     class Config:  # pylint: disable=too-few-public-methods
         """Конфигурация Pydantic для работы с ORM."""
         from_attributes = True
+        orm_mode = True
+
+
+class ExercisePage(BaseModel):
+    """Страница списка упражнений.
+
+    Attributes:
+        items (List[Exercise]): Упражнения страницы
+        next_cursor (str, optional): Курсор следующей страницы (None на последней)
+    """
+    items: List[Exercise]
+    next_cursor: Optional[str] = None
+
+
+class ExerciseSearchResult(BaseModel):
+    """Результат поиска упражнений.
+
+    Attributes:
+        exercise (Exercise): Найденное упражнение
+        score (float): Релевантность (больше - лучше)
+    """
+    exercise: Exercise
+    score: float
+
+
+class ExerciseImportError(BaseModel):
+    """Ошибка в одной строке импорта.
+
+    Attributes:
+        row (int): Номер строки во входных данных (с 1)
+        error (str): Описание ошибки
+    """
+    row: int
+    error: str
+
+
+class ExerciseImportReport(BaseModel):
+    """Результат массового импорта упражнений.
+
+    Attributes:
+        processed (int): Прочитано строк
+        inserted (int): Добавлено упражнений
+        updated (int): Обновлено упражнений (совпадение по названию)
+        failed (int): Строк с ошибками
+        errors (List[ExerciseImportError]): Ошибки (не больше лимита отчёта)
+        errors_truncated (bool): В отчёт попали не все ошибки
+    """
+    processed: int = 0
+    inserted: int = 0
+    updated: int = 0
+    failed: int = 0
+    errors: List[ExerciseImportError] = []
+    errors_truncated: bool = False
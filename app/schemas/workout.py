@@ -2,8 +2,8 @@
 from __future__ import annotations
 
 from datetime import date
-from typing import List, Optional, Any, Union
-from pydantic import BaseModel, Field
+from typing import Dict, List, Optional, Any, Union
+from pydantic import BaseModel, Field, validator
 from app.schemas.exercise import Exercise
 
 class WorkoutBase(BaseModel):
@@ -26,7 +26,17 @@ class WorkoutCreate(WorkoutBase):
     Attributes:
         exercise_ids (List[int]): Список ID упражнений
     """
-    exercise_ids: Any = Field("", description="Список ID упражнений", example=[1, 2, 3])
+    exercise_ids: List[int] = Field([], description="Список ID упражнений", example=[1, 2, 3])
+
+
+class WorkoutBatchCreate(BaseModel):
+    """Пакет тренировок для создания одним запросом (например, синхронизация
+    недели, записанной офлайн).
+
+    Attributes:
+        workouts (List[WorkoutCreate]): Тренировки для создания
+    """
+    workouts: List[WorkoutCreate] = Field(..., min_items=1, max_items=500)
 
 
 class WorkoutUpdate(WorkoutBase):
@@ -49,10 +59,62 @@ class Workout(WorkoutBase):
     """
     id: Any = Field("", description="ID тренировки", example=1)
     owner_id: Any = Field("", description="ID владельца", example=1)
+    exercises: List[Exercise] = Field([], description="Упражнения тренировки")
+
+    @validator("date", pre=True)
+    def date_to_str(cls, value):  # pylint: disable=no-self-argument
+        """Дата из БД отдаётся строкой в формате ISO."""
+        return value.isoformat() if isinstance(value, date) else value
 
     class Config:  # pylint: disable=too-few-public-methods
         """Конфигурация Pydantic для работы с ORM."""
         from_attributes = True
+        orm_mode = True
+
+
+class WorkoutPage(BaseModel):
+    """Страница списка тренировок.
+
+    Attributes:
+        items (List[Workout]): Тренировки страницы
+        next_cursor (str, optional): Курсор следующей страницы (None на последней)
+    """
+    items: List[Workout]
+    next_cursor: Optional[str] = None
+
+
+class MuscleGroupStats(BaseModel):
+    """Статистика группы мышц за неделю.
+
+    Attributes:
+        sessions (int): Тренировки с упражнениями этой группы
+        minutes (float): Доля минут тренировок по числу упражнений группы
+        exercise_count (int): Количество упражнений
+    """
+    sessions: int
+    minutes: float
+    exercise_count: int
+
+
+class WeeklyTrainingStats(BaseModel):
+    """Статистика тренировок за ISO-неделю.
+
+    Attributes:
+        iso_year (int): ISO-год
+        iso_week (int): Номер ISO-недели
+        week_start (date): Понедельник недели
+        sessions (int): Количество тренировок
+        minutes (float): Минуты тренировок
+        exercise_count (int): Количество упражнений
+        muscle_groups (Dict[str, MuscleGroupStats]): Объём по группам мышц
+    """
+    iso_year: int
+    iso_week: int
+    week_start: date
+    sessions: int
+    minutes: float
+    exercise_count: int
+    muscle_groups: Dict[str, MuscleGroupStats]
 
 
 class WorkoutOptimizationParams(BaseModel):
@@ -62,10 +124,35 @@ class WorkoutOptimizationParams(BaseModel):
         goal (str): Цель тренировки (weight_loss/muscle_gain/endurance)
         available_time (int): Доступное время в минутах
         target_muscles (List[str]): Целевые группы мышц
+        selection_mode (str): Алгоритм отбора упражнений (greedy/exact)
+        refine_deadline_ms (float, optional): Время на улучшение плана локальным поиском, мс
+        top_k (int): Количество альтернативных планов
+        beam_width (int): Ширина луча при поиске альтернативных планов
     """
     goal: str  # weight_loss, muscle_gain, endurance
     available_time: int  # in minutes
     target_muscles: List[str] = []
+    selection_mode: str = "greedy"  # greedy, exact
+    refine_deadline_ms: Optional[float] = Field(
+        None, description="Время на улучшение плана, мс", example=20, ge=0
+    )
+    top_k: int = Field(3, description="Количество альтернативных планов", example=3, gt=0, le=20)
+    beam_width: int = Field(32, description="Ширина луча поиска", example=32, gt=0, le=1024)
+
+
+class RefinementStats(BaseModel):
+    """Результат улучшения плана локальным поиском.
+
+    Attributes:
+        iterations (int): Количество выполненных итераций
+        score_improvement (float): Прирост оценки плана
+        elapsed_ms (float): Затраченное время, мс
+        converged (bool): Найден локальный оптимум до истечения времени
+    """
+    iterations: int
+    score_improvement: float
+    elapsed_ms: float
+    converged: bool
 
 
 class WorkoutPlan(BaseModel):
@@ -76,8 +163,72 @@ class WorkoutPlan(BaseModel):
         total_duration (int): Общая продолжительность
         estimated_calories (float): Расчетные калории
         difficulty (float): Сложность тренировки
+        muscle_group_balance (Dict[str, float]): Доля упражнений по группам мышц
+        transition_minutes (float): Оценка времени на переходы между упражнениями, мин
+        catalog_version (int, optional): Версия каталога упражнений, по которой построен план
+        refinement (RefinementStats, optional): Статистика улучшения плана
     """
     exercises: List[dict]  # или используйте конкретную схему Exercise
     total_duration: int
     estimated_calories: float
     difficulty: float
+    muscle_group_balance: Dict[str, float] = {}
+    transition_minutes: float = 0.0
+    catalog_version: Optional[int] = None
+    refinement: Optional[RefinementStats] = None
+
+
+class WorkoutProgramParams(WorkoutOptimizationParams):
+    """Параметры многонедельной программы тренировок.
+
+    Attributes:
+        weeks (int): Количество недель
+        sessions_per_week (int): Тренировок в неделю
+    """
+    weeks: int = Field(4, description="Количество недель", example=12, gt=0, le=52)
+    sessions_per_week: int = Field(3, description="Тренировок в неделю", example=3, gt=0, le=7)
+
+
+class ProgramSession(BaseModel):
+    """Одна тренировка программы.
+
+    Attributes:
+        week (int): Номер недели (с 1)
+        day (int): День программы (с 1)
+        session (int): Номер тренировки в неделе (с 1)
+        plan (WorkoutPlan): План тренировки
+    """
+    week: int
+    day: int
+    session: int
+    plan: WorkoutPlan
+
+
+class WorkoutOptimizationRequest(BaseModel):
+    """Запрос на оптимизацию одного плана пакета.
+
+    Планы строятся для текущего пользователя, поэтому id пользователя в
+    запросе нет.
+
+    Attributes:
+        params (WorkoutOptimizationParams): Параметры оптимизации
+    """
+    params: WorkoutOptimizationParams
+
+
+class BatchOptimizationRequest(BaseModel):
+    """Пакетный запрос на оптимизацию планов.
+
+    Attributes:
+        requests (List[WorkoutOptimizationRequest]): Запросы планов текущего пользователя
+    """
+    requests: List[WorkoutOptimizationRequest] = Field(..., min_items=1, max_items=50)
+
+
+class BatchOptimizationResponse(BaseModel):
+    """Результат пакетной оптимизации.
+
+    Attributes:
+        plans (List[WorkoutPlan]): Планы в порядке запросов
+    """
+    plans: List[WorkoutPlan]
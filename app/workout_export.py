@@ -0,0 +1,147 @@
+"""
+Streaming export of a user's workout history as NDJSON or CSV.
+
+Workouts are read with one query (workouts LEFT JOIN their exercises, in
+date order) through ``AsyncSession.stream`` with ``yield_per``, so the
+database driver hands rows over in chunks from a server-side cursor.  Rows
+of one workout are adjacent and are folded into a single record as they
+arrive.  Records are serialized and sent in small batches, so memory use
+does not depend on the history size and the first bytes go out before the
+query has finished.
+
+NDJSON: one JSON object per workout, exercises as a list of objects.
+CSV: a header line, then one line per workout; exercise ids and names are
+joined with ``|``.
+
+Used by ``GET /workouts/export``.
+"""
+
+import csv
+import io
+import json
+from typing import AsyncIterator, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.exercise import Exercise
+from app.models.workout import Workout, workout_exercise
+
+EXPORT_FORMATS = ("ndjson", "csv")
+
+# Rows fetched from the server-side cursor per round trip
+EXPORT_CHUNK_SIZE = 1000
+
+# Serialized records per chunk written to the response
+EXPORT_FLUSH_RECORDS = 200
+
+CSV_COLUMNS = ("id", "date", "name", "duration", "notes", "exercise_ids", "exercise_names")
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def export_query(owner_id: int, start_date=None, end_date=None, chunk_size: int = EXPORT_CHUNK_SIZE):
+    """Workouts of ``owner_id`` joined with their exercises, oldest first"""
+    query = (
+        select(
+            Workout.id, Workout.date, Workout.name, Workout.duration, Workout.notes,
+            Exercise.id.label("exercise_id"), Exercise.name.label("exercise_name"),
+            Exercise.muscle_group,
+        )
+        .select_from(Workout)
+        .outerjoin(workout_exercise, workout_exercise.c.workout_id == Workout.id)
+        .outerjoin(Exercise, Exercise.id == workout_exercise.c.exercise_id)
+        .where(Workout.owner_id == owner_id)
+    )
+    if start_date is not None:
+        query = query.where(Workout.date >= start_date)
+    if end_date is not None:
+        query = query.where(Workout.date <= end_date)
+    return (
+        query.order_by(Workout.date, Workout.id, Exercise.id)
+        .execution_options(yield_per=chunk_size)
+    )
+
+
+async def iter_workout_records(
+        db: AsyncSession,
+        owner_id: int,
+        start_date=None,
+        end_date=None,
+        chunk_size: int = EXPORT_CHUNK_SIZE
+) -> AsyncIterator[dict]:
+    """Yield one dict per workout, with its exercises, in date order."""
+    result = await db.stream(export_query(owner_id, start_date, end_date, chunk_size))
+    record: Optional[dict] = None
+    async for row in result:
+        if record is None or record["id"] != row.id:
+            if record is not None:
+                yield record
+            record = {
+                "id": row.id,
+                "date": row.date.isoformat() if row.date is not None else None,
+                "name": row.name,
+                "duration": row.duration,
+                "notes": row.notes,
+                "exercises": [],
+            }
+        if row.exercise_id is not None:
+            record["exercises"].append(
+                {"id": row.exercise_id, "name": row.exercise_name, "muscle_group": row.muscle_group}
+            )
+    if record is not None:
+        yield record
+
+
+def _csv_line(values) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(values)
+    return buffer.getvalue()
+
+
+def _serialize(record: dict, fmt: str) -> str:
+    if fmt == "ndjson":
+        return json.dumps(record, ensure_ascii=False) + "\n"
+    exercises = record["exercises"]
+    return _csv_line([
+        record["id"], record["date"], record["name"], record["duration"], record["notes"],
+        "|".join(str(exercise["id"]) for exercise in exercises),
+        "|".join(exercise["name"] or "" for exercise in exercises),
+    ])
+
+
+async def export_workouts(
+        db: AsyncSession,
+        owner_id: int,
+        fmt: str = "ndjson",
+        start_date=None,
+        end_date=None,
+        chunk_size: int = EXPORT_CHUNK_SIZE
+) -> AsyncIterator[str]:
+    """Stream the workout history of ``owner_id`` as text chunks.
+
+    Args:
+        db: Async database session, kept open until the stream is consumed
+        owner_id: Owner of the workouts
+        fmt: ``"ndjson"`` or ``"csv"``
+        start_date: Earliest workout date (inclusive)
+        end_date: Latest workout date (inclusive)
+        chunk_size: Rows fetched from the database per round trip
+
+    Yields:
+        str: Serialized records, several per chunk
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}, expected one of {EXPORT_FORMATS}")
+    if fmt == "csv":
+        # The header goes out before the query runs
+        yield _csv_line(CSV_COLUMNS)
+
+    batch = []
+    async for record in iter_workout_records(db, owner_id, start_date, end_date, chunk_size):
+        batch.append(_serialize(record, fmt))
+        if len(batch) >= EXPORT_FLUSH_RECORDS:
+            yield "".join(batch)
+            batch = []
+    if batch:
+        yield "".join(batch)
@@ -0,0 +1,33 @@
+"""
+Rebuild the weekly workout statistics table from scratch.
+
+``workout_weekly_stats`` is kept up to date by the workout CRUD functions;
+this command recomputes it from the workouts table, e.g. after a bulk load
+that bypassed them or after changing how statistics are computed:
+
+    python -m app.workout_stats
+    python -m app.workout_stats --owner-id 42
+"""
+
+import argparse
+import asyncio
+
+from app.crud.workout_stats import rebuild_workout_stats
+from app.database import AsyncSessionLocal
+
+
+async def _run_cli(args) -> int:
+    async with AsyncSessionLocal() as db:
+        return await db.run_sync(lambda session: rebuild_workout_stats(session, args.owner_id))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--owner-id", type=int, default=None, help="rebuild only this user's statistics")
+    args = parser.parse_args()
+    rows = asyncio.run(_run_cli(args))
+    print(f"Rebuilt {rows} statistics rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Memory and GC pressure of exercise representations.
+
+Fills an in-memory SQLite database with a synthetic catalog and compares:
+
+    orm      - ``db.query(Exercise).all()``: full mapped instances
+    rows     - ``select(*CATALOG_COLUMNS).all()``: column-restricted rows
+    catalog  - ``load_catalog``: rows streamed into the columnar catalog
+
+For each it reports bytes retained per exercise, peak bytes per exercise
+during the load and the number of new GC-tracked objects.  It then generates
+plans the way the optimizer used to (ORM objects per request) and the way it
+does now (columnar snapshot, and SQL candidates with the snapshot disabled)
+and counts the garbage collections triggered.
+
+Usage:
+    python -m benchmarks.bench_memory [--sizes 10000 100000] [--plans 50]
+"""
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from app.algorithms import workout_optimizer as optimizer
+from app.algorithms.catalog import CATALOG_COLUMNS, ExerciseCatalog, load_catalog
+from app.models import workout  # noqa: F401  (registers the workout_exercise table)
+from app.models.exercise import Exercise
+from app.schemas.workout import WorkoutOptimizationParams
+from benchmarks.synthetic import synthetic_catalog
+
+PARAMS = WorkoutOptimizationParams(goal="muscle_gain", available_time=60, target_muscles=["legs", "back"])
+USER = SimpleNamespace(fitness_level="intermediate", preferred_equipment=["dumbbell"],
+                       favorite_muscle_groups=["legs"])
+
+
+def _session(size, seed):
+    """SQLite session holding ``size`` synthetic exercises"""
+    engine = create_engine("sqlite://")
+    Exercise.__table__.create(engine)
+    source = synthetic_catalog(size, seed=seed)
+    rows = [
+        {
+            "id": int(source.ids[i]), "name": source.names[i],
+            "description": f"Description of {source.names[i]} " * 4,
+            "muscle_group": source.muscle_group_of(i),
+            "equipment": str(source.equipment[source.equipment_codes[i]]),
+            "difficulty": int(source.difficulty[i]),
+            "calories_burned": float(source.calories_burned[i]),
+            "is_cardio": bool(source.is_cardio[i]),
+            "avg_duration": int(source.avg_duration[i]),
+        }
+        for i in range(size)
+    ]
+    with engine.begin() as conn:
+        conn.execute(insert(Exercise), rows)
+    return sessionmaker(bind=engine)()
+
+
+def _measure_load(name, load, size):
+    """Retained/peak bytes and new GC-tracked objects of one load"""
+    gc.collect()
+    objects_before = len(gc.get_objects())
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = load()
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    objects = len(gc.get_objects()) - objects_before
+    del result
+    return {
+        "catalog_size": size,
+        "representation": name,
+        "load_ms": round(elapsed * 1000, 2),
+        "retained_bytes_per_exercise": round(current / size, 1),
+        "peak_bytes_per_exercise": round(peak / size, 1),
+        "gc_tracked_objects": objects,
+    }
+
+
+def _plan_from_orm(db):
+    """Plan generation as it used to be: mapped instances on every request"""
+    catalog = ExerciseCatalog.from_exercises(db.query(Exercise).all())
+    db.expunge_all()
+    candidates = optimizer._filter_exercises(catalog, PARAMS, USER)
+    scores = optimizer._score_exercises(catalog, candidates, PARAMS, USER)
+    return optimizer._plan_from_candidates(catalog, candidates, scores, PARAMS)
+
+
+def _plan_from_sql_candidates(db):
+    candidates_catalog = optimizer.load_candidate_catalog(db, PARAMS, USER)
+    candidates = optimizer._filter_exercises(candidates_catalog, PARAMS, USER)
+    scores = optimizer._score_exercises(candidates_catalog, candidates, PARAMS, USER)
+    return optimizer._plan_from_candidates(candidates_catalog, candidates, scores, PARAMS)
+
+
+def _measure_gc(name, plan, plans, size):
+    """Garbage collections per generation while generating ``plans`` plans"""
+    collections = [0, 0, 0]
+
+    def count(phase, info):
+        if phase == "start":
+            collections[info["generation"]] += 1
+
+    gc.collect()
+    gc.callbacks.append(count)
+    start = time.perf_counter()
+    try:
+        for _ in range(plans):
+            plan()
+    finally:
+        gc.callbacks.remove(count)
+    return {
+        "catalog_size": size,
+        "plan_path": name,
+        "plans": plans,
+        "ms_per_plan": round((time.perf_counter() - start) * 1000 / plans, 2),
+        "gc_collections": {f"gen{generation}": n for generation, n in enumerate(collections)},
+    }
+
+
+def run(sizes, plans, seed=0):
+    for size in sizes:
+        db = _session(size, seed)
+        loads = {
+            "orm": lambda: db.query(Exercise).all(),
+            "rows": lambda: db.execute(select(*CATALOG_COLUMNS)).all(),
+            "catalog": lambda: load_catalog(db),
+        }
+        for name, load in loads.items():
+            yield _measure_load(name, load, size)
+            db.expunge_all()
+
+        snapshot = load_catalog(db)
+        snapshot.build_bitmap_index()
+
+        def from_snapshot():
+            candidates = optimizer._filter_exercises(snapshot, PARAMS, USER)
+            scores = optimizer._score_exercises(snapshot, candidates, PARAMS, USER)
+            return optimizer._plan_from_candidates(snapshot, candidates, scores, PARAMS)
+
+        paths = {
+            "orm_per_request": lambda: _plan_from_orm(db),
+            "sql_candidates": lambda: _plan_from_sql_candidates(db),
+            "snapshot": from_snapshot,
+        }
+        for name, plan in paths.items():
+            yield _measure_gc(name, plan, plans, size)
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--plans", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    for row in run(args.sizes, args.plans, seed=args.seed):
+        print(json.dumps(row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Optimizer benchmark suite on synthetic catalogs.
+
+Times every stage of ``optimize_workout_plan`` (filter, score, selection,
+order, build) one by one and end to end, on in-memory synthetic catalogs,
+without a database.  For each catalog size and stage it reports throughput,
+p50/p99 latency and peak traced memory as JSON, so runs can be compared
+across changes.
+
+Usage:
+    python -m benchmarks.bench_optimizer [--sizes 1000 10000 100000 1000000]
+                                         [--repeat 50] [--output run.json]
+    python -m benchmarks.bench_optimizer --compare before.json after.json
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.algorithms import workout_optimizer as optimizer
+from app.schemas.workout import WorkoutOptimizationParams
+from benchmarks.synthetic import synthetic_catalog
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+
+# Request mix cycled through by every stage
+SCENARIOS = [
+    (WorkoutOptimizationParams(goal="weight_loss", available_time=45),
+     SimpleNamespace(fitness_level="beginner", preferred_equipment=["none"], favorite_muscle_groups=[])),
+    (WorkoutOptimizationParams(goal="muscle_gain", available_time=60, target_muscles=["legs", "glutes"]),
+     SimpleNamespace(fitness_level="intermediate", preferred_equipment=["barbell"],
+                     favorite_muscle_groups=["legs"])),
+    (WorkoutOptimizationParams(goal="endurance", available_time=90),
+     SimpleNamespace(fitness_level="advanced", preferred_equipment=[], favorite_muscle_groups=["core"])),
+    (WorkoutOptimizationParams(goal="muscle_gain", available_time=120, target_muscles=["back", "chest", "arms"],
+                               selection_mode="exact"),
+     SimpleNamespace(fitness_level="advanced", preferred_equipment=["dumbbell"], favorite_muscle_groups=[])),
+]
+
+STAGES = ("filter", "score", "selection", "order", "build", "end_to_end")
+
+# Stages whose cost scales with the catalog (or candidate set) size
+CATALOG_STAGES = {"filter", "score", "selection", "end_to_end"}
+
+
+def _prepare(catalog):
+    """Precompute the inputs of every stage for every scenario"""
+    prepared = []
+    for params, user in SCENARIOS:
+        candidates = optimizer._filter_exercises(catalog, params, user)
+        scores = optimizer._score_exercises(catalog, candidates, params, user)
+        select = optimizer._selection_strategy(params.selection_mode)
+        selected = select(catalog, candidates, scores, params.available_time)
+        ordered = optimizer._optimize_order(catalog, selected)
+        prepared.append(SimpleNamespace(
+            params=params, user=user, candidates=candidates, scores=scores,
+            select=select, selected=selected, ordered=ordered,
+        ))
+    return prepared
+
+
+def _stage_call(stage, catalog, case):
+    """Zero-argument callable running one stage for one scenario"""
+    if stage == "filter":
+        return lambda: optimizer._filter_exercises(catalog, case.params, case.user)
+    if stage == "score":
+        return lambda: optimizer._score_exercises(catalog, case.candidates, case.params, case.user)
+    if stage == "selection":
+        return lambda: case.select(catalog, case.candidates, case.scores, case.params.available_time)
+    if stage == "order":
+        return lambda: optimizer._optimize_order(catalog, case.selected)
+    if stage == "build":
+        return lambda: optimizer._build_workout_plan(catalog, case.ordered)
+
+    def end_to_end():
+        candidates = optimizer._filter_exercises(catalog, case.params, case.user)
+        scores = optimizer._score_exercises(catalog, candidates, case.params, case.user)
+        return optimizer._plan_from_candidates(catalog, candidates, scores, case.params)
+    return end_to_end
+
+
+def _measure(calls, repeat):
+    """Latency samples (ms) over ``repeat`` rounds of ``calls`` plus peak memory"""
+    for call in calls:  # warm-up
+        call()
+
+    samples = []
+    for _ in range(repeat):
+        for call in calls:
+            start = time.perf_counter()
+            call()
+            samples.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    for call in calls:
+        call()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    samples = np.asarray(samples)
+    return {
+        "calls": len(samples),
+        "p50_ms": round(float(np.percentile(samples, 50)), 4),
+        "p99_ms": round(float(np.percentile(samples, 99)), 4),
+        "mean_ms": round(float(samples.mean()), 4),
+        "throughput_per_s": round(1000 / float(samples.mean()), 1) if samples.mean() else None,
+        "peak_memory_bytes": peak,
+    }
+
+
+def run(sizes, repeat, seed=0, bitmap_index=True):
+    """Benchmark every stage on every catalog size.
+
+    Returns:
+        dict: Run metadata and one result per (size, stage)
+    """
+    results = []
+    for size in sizes:
+        catalog = synthetic_catalog(size, seed=seed)
+        if bitmap_index:
+            catalog.build_bitmap_index()
+        prepared = _prepare(catalog)
+        # Fewer rounds on the largest catalogs keep the run time reasonable
+        rounds = max(3, repeat * 10_000 // max(size, 10_000))
+
+        for stage in STAGES:
+            calls = [_stage_call(stage, catalog, case) for case in prepared]
+            result = _measure(calls, rounds)
+            result.update({"catalog_size": size, "stage": stage})
+            if stage in CATALOG_STAGES and result["throughput_per_s"]:
+                result["catalog_rows_per_s"] = round(size * result["throughput_per_s"])
+            results.append(result)
+            print(json.dumps(result), file=sys.stderr)
+
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "seed": seed,
+        "bitmap_index": bitmap_index,
+        "results": results,
+    }
+
+
+def compare(before, after):
+    """Yield p50 ratios (after / before) for every (size, stage) in both runs"""
+    baseline = {(r["catalog_size"], r["stage"]): r for r in before["results"]}
+    for result in after["results"]:
+        old = baseline.get((result["catalog_size"], result["stage"]))
+        if old is None:
+            continue
+        yield {
+            "catalog_size": result["catalog_size"],
+            "stage": result["stage"],
+            "p50_before_ms": old["p50_ms"],
+            "p50_after_ms": result["p50_ms"],
+            "p50_ratio": round(result["p50_ms"] / old["p50_ms"], 3) if old["p50_ms"] else None,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-bitmap-index", action="store_true")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"))
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as before, open(args.compare[1]) as after:
+            for row in compare(json.load(before), json.load(after)):
+                print(json.dumps(row))
+        return
+
+    report = run(args.sizes, args.repeat, seed=args.seed, bitmap_index=not args.no_bitmap_index)
+    if args.output:
+        with open(args.output, "w") as out:
+            json.dump(report, out, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Greedy vs exact selection benchmark.
+
+Runs ``_optimize_selection`` and ``_optimize_selection_exact`` on the same
+filtered and scored candidates and reports latency and total plan score.
+
+Usage:
+    python -m benchmarks.bench_selection [--sizes 1000 10000 100000] [--repeat 5]
+"""
+
+import argparse
+import json
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.algorithms import workout_optimizer as optimizer
+from app.schemas.workout import WorkoutOptimizationParams
+from benchmarks.synthetic import synthetic_catalog
+
+GOALS = [
+    WorkoutOptimizationParams(goal="weight_loss", available_time=60),
+    WorkoutOptimizationParams(goal="muscle_gain", available_time=90, target_muscles=["legs", "back", "chest"]),
+    WorkoutOptimizationParams(goal="endurance", available_time=120),
+]
+USER = SimpleNamespace(fitness_level="intermediate", preferred_equipment=["dumbbell"],
+                       favorite_muscle_groups=["legs"])
+
+
+def _time(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return result, float(np.median(timings))
+
+
+def run(sizes, repeat):
+    """Yield one result dict per (catalog size, goal)."""
+    for size in sizes:
+        catalog = synthetic_catalog(size, seed=size)
+        for params in GOALS:
+            candidates = optimizer._filter_exercises(catalog, params, USER)
+            scores = optimizer._score_exercises(catalog, candidates, params, USER)
+            score_of = dict(zip(candidates.tolist(), scores.tolist()))
+
+            greedy, greedy_ms = _time(
+                lambda: optimizer._optimize_selection(catalog, candidates, scores, params.available_time),
+                repeat)
+            exact, exact_ms = _time(
+                lambda: optimizer._optimize_selection_exact(catalog, candidates, scores, params.available_time),
+                repeat)
+
+            greedy_score = sum(score_of[i] for i in greedy)
+            exact_score = sum(score_of[i] for i in exact)
+            yield {
+                "catalog_size": size,
+                "goal": params.goal,
+                "available_time": params.available_time,
+                "candidates": len(candidates),
+                "greedy_ms": round(greedy_ms, 3),
+                "exact_ms": round(exact_ms, 3),
+                "greedy_score": round(greedy_score, 3),
+                "exact_score": round(exact_score, 3),
+                "score_gain_pct": round(100 * (exact_score - greedy_score) / greedy_score, 2)
+                if greedy_score else None,
+            }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    for result in run(args.sizes, args.repeat):
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""keyset pagination indexes
+
+Revision ID: 4c7e2a9b1d05
+Revises: 8b1f4c2d9a31
+Create Date: 2026-10-17 16:42:03.518377
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4c7e2a9b1d05'
+down_revision = '8b1f4c2d9a31'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_workouts_owner_date_id', 'workouts', ['owner_id', 'date', 'id'])
+    op.create_index('ix_exercises_name_id', 'exercises', ['name', 'id'])
+    op.create_index('ix_exercises_muscle_group_id', 'exercises', ['muscle_group', 'id'])
+    op.create_index('ix_exercises_is_cardio_id', 'exercises', ['is_cardio', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_exercises_is_cardio_id', table_name='exercises')
+    op.drop_index('ix_exercises_muscle_group_id', table_name='exercises')
+    op.drop_index('ix_exercises_name_id', table_name='exercises')
+    op.drop_index('ix_workouts_owner_date_id', table_name='workouts')
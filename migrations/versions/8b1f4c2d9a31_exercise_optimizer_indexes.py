@@ -0,0 +1,28 @@
+"""exercise optimizer indexes
+
+Revision ID: 8b1f4c2d9a31
+Revises: 23ecea257313
+Create Date: 2026-10-17 10:12:40.118203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b1f4c2d9a31'
+down_revision = '23ecea257313'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_exercises_is_cardio_difficulty', 'exercises', ['is_cardio', 'difficulty'])
+    op.create_index('ix_exercises_muscle_group_difficulty', 'exercises', ['muscle_group', 'difficulty'])
+    op.create_index('ix_exercises_difficulty', 'exercises', ['difficulty'])
+
+
+def downgrade():
+    op.drop_index('ix_exercises_difficulty', table_name='exercises')
+    op.drop_index('ix_exercises_muscle_group_difficulty', table_name='exercises')
+    op.drop_index('ix_exercises_is_cardio_difficulty', table_name='exercises')
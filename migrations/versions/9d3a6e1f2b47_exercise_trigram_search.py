@@ -0,0 +1,38 @@
+"""exercise trigram search
+
+Revision ID: 9d3a6e1f2b47
+Revises: 4c7e2a9b1d05
+Create Date: 2026-10-17 18:05:51.207634
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d3a6e1f2b47'
+down_revision = '4c7e2a9b1d05'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # pg_trgm есть только в Postgres; SQLite ищет без индекса (app/crud/search.py)
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index(
+        'ix_exercises_name_trgm', 'exercises', ['name'],
+        postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}
+    )
+    op.create_index(
+        'ix_exercises_description_trgm', 'exercises', ['description'],
+        postgresql_using='gin', postgresql_ops={'description': 'gin_trgm_ops'}
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_exercises_description_trgm', table_name='exercises')
+    op.drop_index('ix_exercises_name_trgm', table_name='exercises')
@@ -0,0 +1,35 @@
+"""workout weekly stats
+
+Revision ID: b62e0d7c4a18
+Revises: 9d3a6e1f2b47
+Create Date: 2026-10-17 20:31:12.664210
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b62e0d7c4a18'
+down_revision = '9d3a6e1f2b47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'workout_weekly_stats',
+        sa.Column('owner_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('iso_year', sa.Integer(), nullable=False),
+        sa.Column('iso_week', sa.Integer(), nullable=False),
+        sa.Column('muscle_group', sa.String(), nullable=False),
+        sa.Column('sessions', sa.Integer(), nullable=False),
+        sa.Column('minutes', sa.Float(), nullable=False),
+        sa.Column('exercise_count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('owner_id', 'iso_year', 'iso_week', 'muscle_group'),
+    )
+    # Заполняется командой: python -m app.workout_stats
+
+
+def downgrade():
+    op.drop_table('workout_weekly_stats')
@@ -0,0 +1,30 @@
+"""catalog version
+
+Revision ID: e4a91c3f7b28
+Revises: b62e0d7c4a18
+Create Date: 2026-10-17 22:05:41.318904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4a91c3f7b28'
+down_revision = 'b62e0d7c4a18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    catalog_version = op.create_table(
+        'catalog_version',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.bulk_insert(catalog_version, [{'id': 1, 'version': 0}])
+
+
+def downgrade():
+    op.drop_table('catalog_version')
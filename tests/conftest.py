@@ -0,0 +1,17 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import catalog_version, exercise, user, workout, workout_stats  # noqa: F401  (register all tables)
+
+
+@pytest.fixture
+def db():
+    """Session on an empty in-memory SQLite database with every table"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
@@ -0,0 +1,74 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.algorithms import workout_optimizer as optimizer
+from app.algorithms.bitmap_index import DIMENSIONS, CatalogBitmapIndex
+from app.schemas.workout import WorkoutOptimizationParams
+from benchmarks.synthetic import synthetic_catalog
+
+
+def filter_both_ways(catalog, params, user):
+    """Positions from the bitmap path and from the column scan path"""
+    indexed = optimizer._filter_exercises(catalog, params, user)
+    index, catalog.bitmap_index = catalog.bitmap_index, None
+    try:
+        scanned = optimizer._filter_exercises(catalog, params, user)
+    finally:
+        catalog.bitmap_index = index
+    return indexed.tolist(), scanned.tolist()
+
+
+def all_params():
+    for goal in ("weight_loss", "muscle_gain", "endurance", "mobility"):
+        for level in ("beginner", "intermediate", "advanced"):
+            params = WorkoutOptimizationParams(goal=goal, available_time=60, target_muscles=["legs", "core", "tail"])
+            yield params, SimpleNamespace(fitness_level=level)
+
+
+def test_bitmap_filter_matches_column_scan():
+    catalog = synthetic_catalog(2000, seed=3)
+    catalog.build_bitmap_index()
+
+    for params, user in all_params():
+        indexed, scanned = filter_both_ways(catalog, params, user)
+        assert indexed == scanned
+
+
+def test_index_follows_incremental_catalog_changes():
+    catalog = synthetic_catalog(500, seed=11)
+    catalog.build_bitmap_index()
+    rng = np.random.default_rng(0)
+
+    for step in range(30):
+        if step % 3 == 2:
+            catalog = catalog.without_exercise(int(rng.choice(catalog.ids)), version=step)
+        else:
+            exercise_id = int(rng.choice(catalog.ids)) if step % 3 else 10_000 + step
+            catalog = catalog.with_exercise(SimpleNamespace(
+                id=exercise_id, name=f"ex-{step}", muscle_group=str(rng.choice(["legs", "core", "neck"])),
+                equipment="none", difficulty=int(rng.integers(1, 11)),
+                calories_burned=float(rng.uniform(0, 15)), is_cardio=bool(rng.integers(2)),
+                avg_duration=10,
+            ), version=step)
+
+        assert catalog.bitmap_index.size == len(catalog)
+        for params, user in all_params():
+            indexed, scanned = filter_both_ways(catalog, params, user)
+            assert indexed == scanned
+
+
+def test_replacing_a_row_only_touches_its_old_and_new_bitmaps():
+    catalog = synthetic_catalog(300, seed=5)
+    index = catalog.build_bitmap_index()
+    exercise_id = int(catalog.ids[42])
+
+    updated = catalog.with_exercise(SimpleNamespace(
+        id=exercise_id, name="moved", muscle_group="neck", equipment="none", difficulty=1,
+        calories_burned=0.5, is_cardio=False, avg_duration=10,
+    ), version=1)
+
+    assert updated.bitmap_index._bitmaps == CatalogBitmapIndex.build(updated)._bitmaps
+    changed = [key for key, bits in index._bitmaps.items() if updated.bitmap_index._bitmaps.get(key) is not bits]
+    # Only the bitmaps of the old and the new values change; the rest are shared
+    assert 0 < len(changed) <= 2 * len(DIMENSIONS) < len(index._bitmaps)
@@ -0,0 +1,153 @@
+import asyncio
+
+import pytest
+from sqlalchemy import exc, insert, select, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app import database
+from app.crud.exercise import get_exercises
+from app.models import workout  # noqa: F401  (registers the workout_exercise table)
+from app.models.exercise import Exercise
+
+
+def test_single_base_and_engine_are_shared():
+    from app.core import database as core_database
+    from app.db import base, session
+    from app.models.exercise import Exercise
+    from app.models.user import User
+
+    assert User.metadata is Exercise.metadata is database.Base.metadata
+    assert base.engine is session.engine is core_database.engine is database.engine
+    assert isinstance(database.engine.sync_engine.pool, database.TimedQueuePool)
+
+
+def test_timed_pool_counts_waits_and_timeouts(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=database.TimedQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.05,
+    )
+
+    pool = engine.sync_engine.pool
+
+    async def scenario():
+        async with engine.connect() as conn:
+            await conn.execute(text("select 1"))
+            with pytest.raises(exc.TimeoutError):
+                async with engine.connect():
+                    pass
+        await engine.dispose()
+
+    asyncio.run(scenario())
+    waits = pool.wait_stats()
+    assert waits["checkouts"] == 2
+    assert waits["checkout_timeouts"] == 1
+    assert waits["wait_seconds_max"] >= 0.05
+
+
+def exercise_row(name):
+    return {"name": name, "muscle_group": "legs", "equipment": "none", "difficulty": 3,
+            "calories_burned": 5.0, "is_cardio": False, "avg_duration": 10}
+
+
+async def make_database(path, name):
+    """SQLite database standing in for one server, holding one exercise"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Exercise.__table__.create)
+        await conn.execute(insert(Exercise), [exercise_row(name)])
+    return engine
+
+
+def test_reads_go_to_replica_and_writes_to_primary(tmp_path):
+    async def scenario():
+        primary = await make_database(tmp_path / "primary.db", "on primary")
+        replica = await make_database(tmp_path / "replica.db", "on replica")
+        factory = database.read_sessionmaker(primary, database.ReplicaSet([replica]))
+
+        async with factory() as db:
+            first, _ = await db.run_sync(lambda session: get_exercises(session))
+            db.add(Exercise(**exercise_row("written")))
+            await db.commit()
+            # After its first write the session reads its own writes from the primary
+            # (column rows: mapped objects would come from the identity map)
+            second = (await db.execute(select(Exercise.name).order_by(Exercise.id))).scalars().all()
+
+        async with factory() as db:
+            fresh, _ = await db.run_sync(lambda session: get_exercises(session))
+            # SELECT ... FOR UPDATE is a write
+            locked = (await db.execute(select(Exercise.name).with_for_update())).scalars().all()
+
+        for engine in (primary, replica):
+            await engine.dispose()
+        return [e.name for e in first], second, locked, [e.name for e in fresh]
+
+    first, second, locked, fresh = asyncio.run(scenario())
+    assert first == ["on replica"]
+    assert second == locked == ["on primary", "written"]
+    assert fresh == ["on replica"]
+
+
+def test_unhealthy_replicas_fall_back_to_primary(tmp_path):
+    async def scenario():
+        primary = await make_database(tmp_path / "primary.db", "on primary")
+        replica = await make_database(tmp_path / "replica.db", "on replica")
+        broken = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'replica.db'}")
+        replicas = database.ReplicaSet([replica, broken])
+        factory = database.read_sessionmaker(primary, replicas)
+
+        health = await replicas.check_health()
+        picks = {replicas.pick() for _ in range(4)}
+
+        replicas.healthy = [False, False]
+        async with factory() as db:
+            names = (await db.execute(select(Exercise.name))).scalars().all()
+
+        for engine in (primary, replica, broken):
+            await engine.dispose()
+        return health, picks, replicas, names
+
+    health, picks, replicas, names = asyncio.run(scenario())
+    assert health == [True, False]
+    assert picks == {replicas.engines[0]}
+    assert names == ["on primary"]
+    assert [entry["healthy"] for entry in replicas.stats()] == [False, False]
+
+
+def test_session_keeps_its_replica(tmp_path):
+    async def scenario():
+        primary = await make_database(tmp_path / "primary.db", "on primary")
+        first = await make_database(tmp_path / "first.db", "on first")
+        second = await make_database(tmp_path / "second.db", "on second")
+        replicas = database.ReplicaSet([first, second])
+        factory = database.read_sessionmaker(primary, replicas)
+
+        async def read(db):
+            return (await db.execute(select(Exercise.name))).scalar_one()
+
+        sessions = []
+        for _ in range(2):
+            async with factory() as db:
+                sessions.append([await read(db) for _ in range(4)])
+
+        # A replica that goes down is replaced for the rest of the session
+        async with factory() as db:
+            before = await read(db)
+            replicas.healthy[replicas.engines.index(db.sync_session.info["replica"])] = False
+            after = await read(db)
+
+        for engine in (primary, first, second):
+            await engine.dispose()
+        return sessions, before, after
+
+    sessions, before, after = asyncio.run(scenario())
+    assert [set(names) for names in sessions] == [{"on first"}, {"on second"}]
+    assert {before, after} == {"on first", "on second"}
+
+
+def test_replicas_are_picked_round_robin():
+    engines = [create_async_engine("sqlite+aiosqlite://") for _ in range(3)]
+    replicas = database.ReplicaSet(engines)
+    assert [replicas.pick() for _ in range(6)] == engines * 2
+    replicas.healthy[1] = False
+    assert set(replicas.pick() for _ in range(4)) == {engines[0], engines[2]}
+    assert database.ReplicaSet([]).pick() is None
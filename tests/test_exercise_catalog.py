@@ -0,0 +1,230 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.algorithms import catalog as catalog_module
+from app.algorithms import workout_optimizer as optimizer
+from app.algorithms.catalog import ExerciseCatalog
+from app.models.catalog_version import CatalogVersion
+from app.models.exercise import Exercise
+from app.schemas.workout import WorkoutOptimizationParams
+
+
+def make_exercise(id, name, muscle_group="legs", equipment="none", difficulty=3,
+                  calories_burned=5.0, is_cardio=False, avg_duration=10):
+    return SimpleNamespace(
+        id=id, name=name, muscle_group=muscle_group, equipment=equipment,
+        difficulty=difficulty, calories_burned=calories_burned,
+        is_cardio=is_cardio, avg_duration=avg_duration
+    )
+
+
+def test_with_exercise_replaces_in_place_and_appends():
+    base = ExerciseCatalog.from_exercises(
+        [make_exercise(1, "Squat"), make_exercise(2, "Row", muscle_group="back")], version=1
+    )
+
+    updated = base.with_exercise(make_exercise(1, "Front squat", difficulty=6), version=2)
+    assert updated.version == 2
+    assert updated.names == ["Front squat", "Row"]
+    assert updated.difficulty.tolist() == [6, 3]
+    # The original snapshot is untouched
+    assert base.names == ["Squat", "Row"]
+    assert base.difficulty.tolist() == [3, 3]
+
+    extended = updated.with_exercise(make_exercise(3, "Dip", muscle_group="triceps"), version=3)
+    assert extended.ids.tolist() == [1, 2, 3]
+    assert extended.muscle_group_of(2) == "triceps"
+    assert extended.muscle_group_mask(["triceps", "back"]).tolist() == [False, True, True]
+
+
+def test_without_exercise_shifts_positions():
+    base = ExerciseCatalog.from_exercises(
+        [make_exercise(1, "Squat"), make_exercise(2, "Row"), make_exercise(3, "Dip")]
+    )
+
+    trimmed = base.without_exercise(2, version=5)
+    assert trimmed.version == 5
+    assert trimmed.ids.tolist() == [1, 3]
+    assert trimmed.names == ["Squat", "Dip"]
+    assert len(base) == 3
+
+
+def add_exercises(db, exercises):
+    db.add_all(exercises)
+    db.commit()
+
+
+def test_snapshot_is_loaded_once_and_patched_by_writes(db):
+    add_exercises(db, [
+        Exercise(id=1, name="Squat", muscle_group="legs", equipment="barbell",
+                 difficulty=7, calories_burned=6.0, is_cardio=False, avg_duration=10),
+        Exercise(id=2, name="Run", muscle_group="legs", equipment="none",
+                 difficulty=4, calories_burned=12.0, is_cardio=True, avg_duration=20),
+    ])
+
+    catalog_module.invalidate_catalog()
+    first = catalog_module.get_catalog(db)
+    assert first.names == ["Squat", "Run"]
+    assert catalog_module.get_catalog(db) is first
+
+    # The rows are not written: a patched snapshot shows the patch
+    catalog_module.apply_exercise_upsert(make_exercise(3, "Bike", is_cardio=True),
+                                         catalog_module.bump_catalog_version(db))
+    db.commit()
+    second = catalog_module.get_catalog(db)
+    assert second.version > first.version
+    assert second.names == ["Squat", "Run", "Bike"]
+
+    catalog_module.apply_exercise_delete(1, catalog_module.bump_catalog_version(db))
+    db.commit()
+    third = catalog_module.get_catalog(db)
+    assert third.version > second.version
+    assert third.names == ["Run", "Bike"]
+
+    catalog_module.invalidate_catalog()
+    assert catalog_module.get_catalog(db).names == ["Squat", "Run"]
+    catalog_module.invalidate_catalog()
+
+
+def test_snapshot_reloads_after_writes_of_other_processes(db):
+    add_exercises(db, [
+        Exercise(id=1, name="Squat", muscle_group="legs", equipment="barbell",
+                 difficulty=7, calories_burned=6.0, is_cardio=False, avg_duration=10),
+    ])
+    catalog_module.invalidate_catalog()
+    first = catalog_module.get_catalog(db)
+
+    # Another process writes a row and bumps the version, this one is not told
+    db.add(Exercise(id=2, name="Run", muscle_group="legs", equipment="none",
+                    difficulty=4, calories_burned=12.0, is_cardio=True, avg_duration=20))
+    catalog_module.bump_catalog_version(db)
+    db.commit()
+
+    second = catalog_module.get_catalog(db)
+    assert second is not first and second.version > first.version
+    assert second.names == ["Squat", "Run"]
+    assert catalog_module.get_catalog(db) is second
+
+    # A local write after a missed one reloads instead of patching
+    db.add(Exercise(id=3, name="Bike", muscle_group="legs", equipment="bike",
+                    difficulty=3, calories_burned=9.0, is_cardio=True, avg_duration=15))
+    catalog_module.bump_catalog_version(db)
+    db.commit()
+    row = Exercise(id=4, name="Row", muscle_group="back", equipment="machine",
+                   difficulty=5, calories_burned=10.0, is_cardio=True, avg_duration=15)
+    db.add(row)
+    version = catalog_module.bump_catalog_version(db)
+    db.commit()
+    catalog_module.apply_exercise_upsert(row, version)
+    assert catalog_module.get_catalog(db).names == ["Squat", "Run", "Bike", "Row"]
+    catalog_module.invalidate_catalog()
+
+
+def test_concurrent_cold_loads_through_run_sync_do_not_deadlock(tmp_path):
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'catalog.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Exercise.__table__.create)
+            await conn.run_sync(CatalogVersion.__table__.create)
+            await conn.execute(insert(Exercise), [
+                {"id": i, "name": f"Exercise {i}", "muscle_group": "legs", "equipment": "none",
+                 "difficulty": 3, "calories_burned": 5.0, "is_cardio": False, "avg_duration": 10}
+                for i in range(1, 2001)
+            ])
+
+        async def load():
+            async with AsyncSession(engine) as db:
+                return await db.run_sync(catalog_module.get_catalog)
+
+        catalog_module.invalidate_catalog()
+        try:
+            loaded = await asyncio.gather(*(load() for _ in range(4)))
+            return loaded + [await load()]
+        finally:
+            await engine.dispose()
+
+    results = []
+    # A deadlock blocks the event loop thread itself, so watch it from outside
+    worker = threading.Thread(target=lambda: results.extend(asyncio.run(scenario())), daemon=True)
+    worker.start()
+    worker.join(timeout=30)
+    assert not worker.is_alive(), "concurrent cold catalog loads deadlocked"
+
+    *loaded, published = results
+    assert [len(catalog.ids) for catalog in loaded] == [2000] * 4
+    assert any(catalog is published for catalog in loaded)
+    catalog_module.invalidate_catalog()
+
+
+def test_sql_candidate_query_matches_in_memory_filter(db):
+    rows = [
+        ("Run", "legs", 4, 12.0, True), ("Row", "back", 6, 10.0, True),
+        ("Bench", "chest", 6, 4.0, False), ("Push-up", "chest", 3, 5.0, False),
+        ("Squat", "legs", 8, 6.0, False), ("Plank", "core", 2, 3.0, False),
+        ("Burpee", "full_body", 9, 11.0, True),
+    ]
+    add_exercises(db, [
+        Exercise(id=i + 1, name=name, muscle_group=mg, equipment="none", difficulty=diff,
+                 calories_burned=cal, is_cardio=cardio, avg_duration=10)
+        for i, (name, mg, diff, cal, cardio) in enumerate(rows)
+    ])
+    full = catalog_module.load_catalog(db)
+
+    for goal in ("weight_loss", "muscle_gain", "endurance"):
+        for level in ("beginner", "intermediate", "advanced"):
+            params = WorkoutOptimizationParams(goal=goal, available_time=30, target_muscles=["chest", "legs"])
+            user = SimpleNamespace(fitness_level=level)
+
+            expected = [full.names[i] for i in optimizer._filter_exercises(full, params, user)]
+            pushed_down = optimizer.load_candidate_catalog(db, params, user)
+
+            assert pushed_down.names == expected
+
+
+def test_snapshot_candidates_match_sql_candidates(db):
+    rows = [
+        ("Run", "legs", 4, 12.0, True), ("Row", "back", 6, 10.0, True),
+        ("Bench", "chest", 6, 4.0, False), ("Push-up", "chest", 3, 5.0, False),
+        ("Squat", "legs", 8, 6.0, False), ("Burpee", "full_body", 9, 11.0, True),
+    ]
+    add_exercises(db, [
+        Exercise(id=i + 1, name=name, muscle_group=mg, equipment="none", difficulty=diff,
+                 calories_burned=cal, is_cardio=cardio, avg_duration=10)
+        for i, (name, mg, diff, cal, cardio) in enumerate(rows)
+    ])
+    snapshot = catalog_module.load_catalog(db, version=catalog_module.catalog_version())
+    snapshot.build_bitmap_index()
+
+    for goal in ("weight_loss", "muscle_gain", "endurance"):
+        params = WorkoutOptimizationParams(goal=goal, available_time=30, target_muscles=["chest"])
+        profile = optimizer.UserProfile(fitness_level="intermediate")
+
+        candidates = optimizer.snapshot_candidates(snapshot, params, profile)
+        pushed_down = optimizer.load_candidate_catalog(db, params, profile)
+
+        assert candidates.bitmap_index is None
+        assert candidates.names == pushed_down.names
+        assert candidates.ids.tolist() == pushed_down.ids.tolist()
+        assert optimizer.solve_plan(candidates, params.dict(), profile) == \
+            optimizer.solve_plan(pushed_down, params.dict(), profile)
+
+
+def test_from_rows_matches_from_exercises():
+    exercises = [
+        make_exercise(1, "Squat", difficulty=None, calories_burned=None),
+        make_exercise(2, "Run", muscle_group="legs", is_cardio=True, avg_duration=None),
+        make_exercise(3, "Row", muscle_group="back", equipment="rower"),
+    ]
+    rows = [tuple(getattr(ex, column.key) for column in catalog_module.CATALOG_COLUMNS) for ex in exercises]
+
+    streamed = ExerciseCatalog.from_rows(iter(rows), version=4)
+    expected = ExerciseCatalog.from_exercises(exercises, version=4)
+
+    for column in ("ids", "difficulty", "calories_burned", "avg_duration", "is_cardio", "muscle_group_codes"):
+        assert getattr(streamed, column).tolist() == getattr(expected, column).tolist()
+    assert streamed.names == expected.names
+    assert not streamed.ids.flags.writeable
@@ -0,0 +1,123 @@
+import asyncio
+import json
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.exercise_import import import_exercises, iter_text_lines
+from app.models import workout  # noqa: F401  (registers the workout_exercise table)
+from app.models.catalog_version import CatalogVersion
+from app.models.exercise import Exercise
+
+
+def exercise_row(name, **overrides):
+    row = {"name": name, "muscle_group": "legs", "equipment": "none", "difficulty": 3,
+           "calories_burned": 5.0, "is_cardio": False, "avg_duration": 10}
+    row.update(overrides)
+    return row
+
+
+async def lines_of(items):
+    for item in items:
+        yield item
+
+
+def run_import(tmp_path, batches):
+    """Run several imports against one SQLite database, return reports and rows"""
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'import.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Exercise.__table__.create)
+            await conn.run_sync(CatalogVersion.__table__.create)
+        reports, versions = [], []
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            for lines, kwargs in batches:
+                reports.append(await import_exercises(db, lines_of(lines), **kwargs))
+                versions.append(await db.scalar(select(CatalogVersion.version)))
+            rows = (await db.execute(select(Exercise.name, Exercise.difficulty).order_by(Exercise.id))).all()
+        await engine.dispose()
+        return reports, rows, versions
+
+    return asyncio.run(scenario())
+
+
+def test_ndjson_import_reports_row_errors_and_keeps_going(tmp_path):
+    lines = [
+        json.dumps(exercise_row("Squat")),
+        "{not json",
+        json.dumps(exercise_row("Lunge", difficulty="hard")),
+        "",
+        json.dumps(exercise_row("Row", muscle_group="back")),
+        json.dumps(exercise_row("Squat", difficulty=7)),
+    ]
+
+    (report,), rows, versions = run_import(tmp_path, [(lines, {"chunk_size": 2})])
+
+    assert (report.processed, report.inserted, report.updated, report.failed) == (5, 2, 1, 2)
+    assert [error.row for error in report.errors] == [2, 3]
+    assert "difficulty" in report.errors[1].error
+    assert rows == [("Squat", 7), ("Row", 3)]
+    # One catalog version per written chunk, seen by every worker's snapshot
+    assert versions == [2]
+
+
+def test_csv_upsert_by_name_updates_existing_rows(tmp_path):
+    header = "name,muscle_group,equipment,difficulty,calories_burned,is_cardio,avg_duration"
+    first = [header, "Squat,legs,barbell,6,6.0,false,10", "Run,legs,none,4,12.0,true,20"]
+    second = [header, "Squat,legs,barbell,8,6.5,false,12", "Plank,core,none,2,3.0,false"]
+
+    (initial, update), rows, versions = run_import(tmp_path, [
+        (first, {"fmt": "csv"}),
+        (second, {"fmt": "csv"}),
+    ])
+
+    assert (initial.inserted, initial.updated) == (2, 0)
+    assert (update.inserted, update.updated, update.failed) == (0, 1, 1)
+    assert update.errors[0].row == 3
+    assert rows == [("Squat", 8), ("Run", 4)]
+    assert versions == [1, 2]
+
+
+def test_csv_quoted_fields_may_span_lines_and_chunks(tmp_path):
+    header = "name,description,muscle_group,equipment,difficulty,calories_burned,is_cardio,avg_duration"
+    lines = [
+        header,
+        'Squat,"Feet apart,',
+        "back straight.",
+        '""Sit"" down",legs,barbell,6,6.0,false,10',
+        "Run,,legs,none,4,12.0,true,20",
+        "Plank,,core,none,hard,3.0,false,5",
+        'Lunge,"never closed,legs,none,3,5.0,false,10',
+    ]
+
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'import.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Exercise.__table__.create)
+            await conn.run_sync(CatalogVersion.__table__.create)
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            # chunk_size=2 splits the Squat record between chunks
+            report = await import_exercises(db, lines_of(lines), fmt="csv", chunk_size=2)
+            rows = (await db.execute(select(Exercise.name, Exercise.description).order_by(Exercise.id))).all()
+        await engine.dispose()
+        return report, rows
+
+    report, rows = asyncio.run(scenario())
+
+    assert rows == [("Squat", 'Feet apart,\nback straight.\n"Sit" down'), ("Run", None)]
+    assert (report.processed, report.inserted, report.failed) == (4, 2, 2)
+    # Rows are numbered by the line they start on
+    assert [error.row for error in report.errors] == [6, 7]
+    assert "difficulty" in report.errors[0].error
+    assert report.errors[1].error == "unterminated quoted field"
+
+
+def test_iter_text_lines_splits_across_chunks():
+    async def chunks():
+        for data in (b'{"a": 1}\n{"b"', b': 2}\n', b'{"c": 3}'):
+            yield data
+
+    async def collect():
+        return [line async for line in iter_text_lines(chunks())]
+
+    assert asyncio.run(collect()) == ['{"a": 1}', '{"b": 2}', '{"c": 3}']
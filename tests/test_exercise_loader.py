@@ -0,0 +1,162 @@
+import asyncio
+
+import pytest
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.crud import loader as loader_module
+from app.crud.loader import BatchLoader, exercise_loader, exercises_by_id
+from app.routers import exercises as routes
+from app.models import workout  # noqa: F401  (registers the workout_exercise table)
+from app.models.exercise import Exercise
+
+
+def with_exercises(tmp_path, scenario):
+    """Run ``scenario(engine, statements)`` against a database of 10 exercises"""
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'loader.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Exercise.__table__.create)
+            await conn.execute(insert(Exercise), [
+                {"id": i, "name": f"Exercise {i}", "muscle_group": "legs", "equipment": "none",
+                 "difficulty": 3, "calories_burned": 5.0, "is_cardio": False, "avg_duration": 10}
+                for i in range(1, 11)
+            ])
+        statements = []
+        event.listen(engine.sync_engine, "before_cursor_execute",
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+        try:
+            return await scenario(engine, statements)
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(run())
+
+
+def test_concurrent_loads_share_one_query_and_cache(tmp_path):
+    async def scenario(engine, statements):
+        async with AsyncSession(engine) as db:
+            loader = exercise_loader(db)
+            ids = [3, 1, 3, 42, 7, 1]
+            first = await asyncio.gather(*(loader.load(i) for i in ids))
+            queries = len(statements)
+            again = await loader.load_many([7, 3])
+            return ids, first, queries, again, len(statements)
+
+    ids, first, queries, again, total = with_exercises(tmp_path, scenario)
+    assert [e.id if e else None for e in first] == [3, 1, 3, None, 7, 1]
+    assert queries == 1
+    # Cached for the rest of the request
+    assert [e.id for e in again] == [7, 3] and total == 1
+
+
+def test_batches_are_split_and_serialized_on_one_session(tmp_path):
+    async def scenario(engine, statements):
+        async with AsyncSession(engine) as db:
+            loader = BatchLoader(exercises_by_id(db), max_batch_size=4)
+            found = await loader.load_many(range(1, 11))
+            return [e.id for e in found], loader.batches, len(statements)
+
+    assert with_exercises(tmp_path, scenario) == (list(range(1, 11)), 3, 3)
+
+
+def test_loads_in_separate_ticks_make_separate_batches():
+    calls = []
+
+    async def fetch(keys):
+        calls.append(sorted(keys))
+        return {key: key * 10 for key in keys}
+
+    async def scenario():
+        loader = BatchLoader(fetch, cache=False)
+        first = await asyncio.gather(loader.load(1), loader.load(2))
+        second = await loader.load(1)
+        return first, second
+
+    assert asyncio.run(scenario()) == ([10, 20], 10)
+    assert calls == [[1, 2], [1]]
+
+
+def test_errors_reach_every_waiter_and_are_not_cached():
+    attempts = []
+
+    async def fetch(keys):
+        attempts.append(list(keys))
+        if len(attempts) == 1:
+            raise RuntimeError("database down")
+        return {key: str(key) for key in keys}
+
+    async def scenario():
+        loader = BatchLoader(fetch)
+        results = await asyncio.gather(loader.load(1), loader.load(2), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+        return await loader.load(1)
+
+    assert asyncio.run(scenario()) == "1"
+    assert attempts == [[1, 2], [1]]
+
+
+def test_cancelled_waiter_does_not_cancel_shared_load():
+    async def scenario():
+        gate = asyncio.Event()
+
+        async def fetch(keys):
+            await gate.wait()
+            return {key: key for key in keys}
+
+        loader = BatchLoader(fetch)
+        cancelled = asyncio.ensure_future(loader.load(5))
+        other = asyncio.ensure_future(loader.load(5))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        gate.set()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        return await other
+
+    assert asyncio.run(scenario()) == 5
+
+
+def test_shared_loader_coalesces_across_requests(tmp_path):
+    async def scenario(engine, statements):
+        sessions = []
+
+        async def fetch_in_own_session(ids):
+            async with AsyncSession(engine) as db:
+                sessions.append(db)
+                return await exercises_by_id(db)(ids)
+
+        shared = BatchLoader(fetch_in_own_session, cache=False)
+        # Two requests, each with its own cached loader on top of the shared one
+        requests = [exercise_loader(shared=shared) for _ in range(2)]
+        found = await asyncio.gather(
+            requests[0].load_many([1, 2]), requests[1].load_many([2, 9])
+        )
+        return [[e.id for e in page] for page in found], len(statements), len(sessions)
+
+    assert with_exercises(tmp_path, scenario) == ([[1, 2], [2, 9]], 1, 1)
+
+
+def test_concurrent_requests_share_one_query_by_default(tmp_path, monkeypatch):
+    monkeypatch.setattr(routes, "shared_exercise_loader",
+                        BatchLoader(loader_module._fetch_in_own_session, cache=False))
+
+    async def scenario(engine, statements):
+        monkeypatch.setattr(loader_module, "ReadSessionLocal",
+                            sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False))
+        # Each request gets its own loader from the dependency, without a request session
+        loaders = [await anext(routes.get_exercise_loader()) for _ in range(4)]
+        found = await asyncio.gather(*(
+            routes.read_exercise(exercise_id, loader, None)
+            for exercise_id, loader in zip((4, 2, 4, 8), loaders)
+        ))
+        return [exercise.id for exercise in found], len(statements)
+
+    monkeypatch.setattr(routes, "ReadSessionLocal", None)
+    assert with_exercises(tmp_path, scenario) == ([4, 2, 4, 8], 1)
+
+
+def test_loader_needs_a_source():
+    with pytest.raises(ValueError):
+        exercise_loader()
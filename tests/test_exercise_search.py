@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.crud.exercise import search_exercises
+from app.crud.search import similarity, trigrams, word_similarity
+from app.models.exercise import Exercise
+
+EXERCISES = [
+    ("Barbell Bench Press", "Flat bench, press the bar to the chest"),
+    ("Incline Dumbbell Press", "Upper chest press on an incline bench"),
+    ("Goblet Squat", "Hold a dumbbell at the chest and squat"),
+    ("Back Squat", "Barbell on the upper back"),
+    ("Plank", "Core hold on the forearms"),
+    ("Running", None),
+]
+
+
+def rows():
+    return [
+        {"id": i, "name": name, "description": description, "muscle_group": "legs", "equipment": "none",
+         "difficulty": 3, "calories_burned": 5.0, "is_cardio": False, "avg_duration": 10}
+        for i, (name, description) in enumerate(EXERCISES, start=1)
+    ]
+
+
+@pytest.fixture
+def db(db):
+    db.execute(insert(Exercise), rows())
+    db.commit()
+    return db
+
+
+def names(results):
+    return [exercise.name for exercise, _ in results]
+
+
+def test_trigram_functions_match_pg_trgm():
+    # Values from the pg_trgm documentation
+    assert trigrams("Cat") == ["  c", " ca", "cat", "at "]
+    assert similarity("word", "two words") == pytest.approx(0.363636, abs=1e-6)
+    assert word_similarity("word", "two words") == pytest.approx(0.8)
+    assert word_similarity("squat", "Goblet Squat") == 1.0
+    assert word_similarity("", "anything") == 0.0
+
+
+def test_substring_matches_rank_first(db):
+    results = search_exercises(db, "squat")
+    # Both names contain the term; Goblet Squat also mentions it in the description
+    assert names(results) == ["Goblet Squat", "Back Squat"]
+    assert results[0][1] > results[1][1] > 1.0
+
+
+def test_typos_and_partial_words(db):
+    assert names(search_exercises(db, "bnech pres"))[0] == "Barbell Bench Press"
+    assert names(search_exercises(db, "dumbell"))[0] == "Incline Dumbbell Press"
+    assert search_exercises(db, "xyzzy") == []
+    assert search_exercises(db, "   ") == []
+
+
+def test_description_matches_rank_below_name_matches(db):
+    found = names(search_exercises(db, "chest"))
+    assert set(found) == {"Barbell Bench Press", "Incline Dumbbell Press", "Goblet Squat"}
+    assert names(search_exercises(db, "bench"))[0] == "Barbell Bench Press"
+    assert names(search_exercises(db, "press", limit=1)) == ["Barbell Bench Press"]
+
+
+def test_search_runs_on_aiosqlite(tmp_path):
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'search.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Exercise.__table__.create)
+            await conn.execute(insert(Exercise), rows())
+        async with AsyncSession(engine) as session:
+            results = await session.run_sync(lambda sync: search_exercises(sync, "plnk"))
+        await engine.dispose()
+        return names(results)
+
+    assert asyncio.run(scenario()) == ["Plank"]
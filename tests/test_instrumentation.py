@@ -0,0 +1,55 @@
+import logging
+from types import SimpleNamespace
+
+from app.algorithms import instrumentation
+from app.algorithms import workout_optimizer as optimizer
+from app.algorithms.catalog import ExerciseCatalog
+from app.algorithms.plan_cache import plan_cache
+from app.schemas.workout import WorkoutOptimizationParams
+
+
+def make_catalog():
+    return ExerciseCatalog.from_exercises([
+        SimpleNamespace(id=i, name=f"ex{i}", muscle_group=group, equipment="none", difficulty=3,
+                        calories_burned=6.0, is_cardio=True, avg_duration=10)
+        for i, group in enumerate(["legs", "back", "chest", "core", "legs"])
+    ])
+
+
+def test_tracing_is_disabled_without_sinks():
+    assert instrumentation.start_trace() is None
+
+
+def test_histogram_sink_records_stages_counts_and_cache_hits(monkeypatch):
+    catalog = make_catalog()
+    monkeypatch.setattr(optimizer, "get_catalog", lambda db: catalog)
+    plan_cache.clear()
+    sink = instrumentation.HistogramSink()
+    instrumentation.add_sink(sink)
+    try:
+        params = WorkoutOptimizationParams(goal="endurance", available_time=30)
+        user = SimpleNamespace(fitness_level="advanced")
+        optimizer.optimize_workout_plan(None, params, user)
+        optimizer.optimize_workout_plan(None, params, user)
+    finally:
+        instrumentation.remove_sink(sink)
+
+    snapshot = sink.snapshot()
+    assert snapshot["calls"] == 2
+    assert snapshot["cache_hits"] == 1
+    assert snapshot["cardinality_totals"]["catalog"] == 5
+    assert snapshot["cardinality_totals"]["filtered"] == 5
+    assert snapshot["cardinality_totals"]["selected"] == 6
+    for stage in ("load", "filter", "score", "selection", "order", "build", "cache", "total"):
+        assert stage in snapshot["stages"]
+    assert snapshot["stages"]["total"]["buckets"]["+Inf"] == 2
+
+
+def test_log_sink_writes_one_line_per_call(caplog):
+    trace = instrumentation.OptimizerTrace()
+    trace.stage("filter", filtered=3)
+    with caplog.at_level(logging.INFO, logger=instrumentation.__name__):
+        instrumentation.LogSink().record(trace)
+
+    assert len(caplog.records) == 1
+    assert "filter=" in caplog.text and "filtered=3" in caplog.text
@@ -0,0 +1,130 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.algorithms import catalog as catalog_module
+from app.algorithms import instrumentation
+from app.algorithms.executor import OptimizerPool
+from app.algorithms.plan_cache import plan_cache
+from app.algorithms.workout_optimizer import UserProfile, solve_plan
+from app.models import workout  # noqa: F401  (registers the workout_exercise table)
+from app.models.catalog_version import CatalogVersion
+from app.models.exercise import Exercise
+from app.routers import workouts as routes
+from app.schemas.workout import BatchOptimizationRequest, WorkoutOptimizationParams
+
+EXERCISES = [
+    # name, muscle_group, difficulty, calories, cardio
+    ("Run", "legs", 4, 12.0, True), ("Row", "back", 6, 10.0, True),
+    ("Bench", "chest", 6, 4.0, False), ("Push-up", "chest", 3, 5.0, False),
+    ("Squat", "legs", 8, 6.0, False), ("Burpee", "full_body", 7, 11.0, True),
+]
+
+
+def make_user(id=1):
+    return SimpleNamespace(id=id, fitness_level="intermediate", preferred_equipment=[],
+                           favorite_muscle_groups=["chest"])
+
+
+@pytest.fixture
+def run_route(tmp_path, monkeypatch):
+    """Run ``scenario(db)`` against a small exercise table, optimizer in threads"""
+    monkeypatch.setattr(routes, "optimizer_pool", OptimizerPool(max_workers=0, max_pending=4, timeout=10))
+    catalog_module.invalidate_catalog()
+    plan_cache.clear()
+
+    def run(scenario):
+        async def main():
+            engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'routes.db'}")
+            async with engine.begin() as conn:
+                await conn.run_sync(Exercise.__table__.create)
+                await conn.run_sync(CatalogVersion.__table__.create)
+                await conn.execute(insert(Exercise), [
+                    {"id": i + 1, "name": name, "muscle_group": group, "equipment": "none",
+                     "difficulty": difficulty, "calories_burned": calories, "is_cardio": cardio,
+                     "avg_duration": 10}
+                    for i, (name, group, difficulty, calories, cardio) in enumerate(EXERCISES)
+                ])
+            try:
+                async with AsyncSession(engine) as db:
+                    return await scenario(db)
+            finally:
+                await engine.dispose()
+
+        try:
+            return asyncio.run(main())
+        finally:
+            catalog_module.invalidate_catalog()
+
+    return run
+
+
+def test_batch_plans_match_single_plans(run_route):
+    user = make_user()
+    params = [
+        WorkoutOptimizationParams(goal="endurance", available_time=30),
+        WorkoutOptimizationParams(goal="muscle_gain", available_time=20, target_muscles=["chest"]),
+        WorkoutOptimizationParams(goal="endurance", available_time=45),
+    ]
+    batch = BatchOptimizationRequest(requests=[{"params": p} for p in params])
+
+    async def scenario(db):
+        response = await routes.optimize_batch(batch, db, user)
+        full = await db.run_sync(catalog_module.get_catalog)
+        return response["plans"], full
+
+    plans, full = run_route(scenario)
+
+    profile = UserProfile.from_user(user)
+    assert [plan.dict() for plan in plans] == [solve_plan(full, p.dict(), profile) for p in params]
+
+
+def test_batch_items_carry_no_user_id():
+    batch = BatchOptimizationRequest(requests=[
+        {"user_id": 2, "params": {"goal": "endurance", "available_time": 30}},
+    ])
+    assert batch.dict() == {"requests": [{"params": batch.requests[0].params.dict()}]}
+
+
+def test_batch_size_is_limited():
+    item = {"params": {"goal": "endurance", "available_time": 30}}
+    with pytest.raises(ValidationError):
+        BatchOptimizationRequest(requests=[item] * 51)
+    with pytest.raises(ValidationError):
+        BatchOptimizationRequest(requests=[])
+
+
+def test_routes_record_route_and_worker_stages(run_route):
+    user = make_user()
+    params = WorkoutOptimizationParams(goal="endurance", available_time=30)
+    other = WorkoutOptimizationParams(goal="weight_loss", available_time=20)
+    batch = BatchOptimizationRequest(requests=[
+        {"params": params}, {"params": other},
+    ])
+    sink = instrumentation.HistogramSink()
+    instrumentation.add_sink(sink)
+
+    async def scenario(db):
+        first = await routes.optimize(params, db, user)
+        cached = await routes.optimize(params, db, user)
+        await routes.optimize_batch(batch, db, user)
+        return first, cached
+
+    try:
+        first, cached = run_route(scenario)
+    finally:
+        instrumentation.remove_sink(sink)
+
+    assert first == cached
+    snapshot = sink.snapshot()
+    # optimize, optimize (cache hit), batch: one cache hit, one new plan
+    assert snapshot["calls"] == 4
+    assert snapshot["cache_hits"] == 2
+    assert snapshot["cardinality_totals"]["catalog"] == 2 * len(EXERCISES)
+    for stage in ("cache", "load", "pool", "filter", "score", "selection", "order", "build", "total"):
+        assert stage in snapshot["stages"]
+    assert snapshot["stages"]["filter"]["count"] == 2
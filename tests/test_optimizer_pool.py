@@ -0,0 +1,62 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.algorithms.catalog import ExerciseCatalog
+from app.algorithms.executor import OptimizerBusyError, OptimizerPool
+from app.algorithms.workout_optimizer import UserProfile, solve_plan
+from app.schemas.workout import WorkoutOptimizationParams
+
+
+def sleep_and_return(seconds, value):
+    time.sleep(seconds)
+    return value
+
+
+def test_pool_rejects_jobs_beyond_max_pending():
+    pool = OptimizerPool(max_workers=0, max_pending=1, timeout=5)
+
+    async def scenario():
+        first = asyncio.create_task(pool.run(sleep_and_return, 0.2, "first"))
+        await asyncio.sleep(0.05)
+        with pytest.raises(OptimizerBusyError):
+            await pool.run(sleep_and_return, 0, "second")
+        return await first
+
+    assert asyncio.run(scenario()) == "first"
+    assert pool.pending == 0
+
+
+def test_pool_times_out_but_keeps_slot_until_job_ends():
+    pool = OptimizerPool(max_workers=0, max_pending=1, timeout=0.05)
+
+    async def scenario():
+        with pytest.raises(asyncio.TimeoutError):
+            await pool.run(sleep_and_return, 0.3, "late")
+        assert pool.pending == 1
+        await asyncio.sleep(0.4)
+        assert pool.pending == 0
+
+    asyncio.run(scenario())
+
+
+def test_solve_plan_runs_in_worker_process():
+    catalog = ExerciseCatalog.from_exercises([
+        SimpleNamespace(id=1, name="Run", muscle_group="legs", equipment="none", difficulty=4,
+                        calories_burned=12.0, is_cardio=True, avg_duration=20),
+        SimpleNamespace(id=2, name="Row", muscle_group="back", equipment="rower", difficulty=5,
+                        calories_burned=10.0, is_cardio=True, avg_duration=15),
+    ])
+    params = WorkoutOptimizationParams(goal="endurance", available_time=40)
+    profile = UserProfile(fitness_level="intermediate")
+    pool = OptimizerPool(max_workers=1, max_pending=2, timeout=30)
+
+    try:
+        plan = asyncio.run(pool.run(solve_plan, catalog, params.dict(), profile))
+    finally:
+        pool.shutdown()
+
+    assert plan == solve_plan(catalog, params.dict(), profile)
+    assert sorted(ex["name"] for ex in plan["exercises"]) == ["Row", "Run"]
@@ -0,0 +1,127 @@
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+from app.crud.exercise import get_cardio_exercises, get_exercises
+from app.crud.pagination import encode_cursor
+from app.crud.workout import get_workouts
+from app.models.exercise import Exercise
+from app.models.workout import Workout
+from app.schemas.workout import WorkoutPage
+
+
+@pytest.fixture
+def db(db):
+    db.execute(insert(Exercise), [
+        {"id": i, "name": f"Exercise {i % 7}", "muscle_group": "legs", "equipment": "none",
+         "difficulty": 3, "calories_burned": 5.0, "is_cardio": i % 3 == 0, "avg_duration": 10}
+        for i in range(1, 51)
+    ])
+    # Several workouts per day, so pages split days with equal dates
+    db.execute(insert(Workout), [
+        {"id": i, "name": f"Workout {i}", "date": date(2026, 1, 1) + timedelta(days=i % 10),
+         "duration": 30, "owner_id": 1 + i % 2}
+        for i in range(1, 61)
+    ])
+    db.commit()
+    return db
+
+
+def collect(fetch, limit):
+    """All rows of a listing, page by page"""
+    rows, cursor, pages = [], None, 0
+    while True:
+        page, cursor = fetch(cursor, limit)
+        assert len(page) <= limit
+        rows.extend(page)
+        pages += 1
+        if cursor is None:
+            return rows, pages
+
+
+def test_workout_pages_cover_all_rows_newest_first(db):
+    rows, pages = collect(
+        lambda cursor, limit: get_workouts(db, 1, pagination={"cursor": cursor, "limit": limit}), 7
+    )
+    keys = [(workout.date, workout.id) for workout in rows]
+    assert len(keys) == len(set(keys)) == 30
+    assert keys == sorted(keys, reverse=True)
+    assert {workout.owner_id for workout in rows} == {1}
+    assert pages == 5
+
+
+def test_workout_pages_respect_date_filters(db):
+    filters = {"start_date": date(2026, 1, 3), "end_date": date(2026, 1, 6)}
+    rows, _ = collect(
+        lambda cursor, limit: get_workouts(db, 2, filters, {"cursor": cursor, "limit": limit}), 4
+    )
+    expected = sorted(
+        ((w.date, w.id) for w in db.query(Workout).filter(Workout.owner_id == 2)
+         if filters["start_date"] <= w.date <= filters["end_date"]),
+        reverse=True
+    )
+    assert [(workout.date, workout.id) for workout in rows] == expected
+
+
+def test_workout_page_serializes_dates():
+    page = WorkoutPage(items=[Workout(id=1, name="A", date=date(2026, 1, 2), duration=30, owner_id=1)])
+    assert page.dict()["items"][0]["date"] == "2026-01-02"
+
+
+def test_exercise_pages_by_name_then_id(db):
+    rows, _ = collect(
+        lambda cursor, limit: get_exercises(db, cursor=cursor, limit=limit, order_by="name"), 6
+    )
+    keys = [(exercise.name, exercise.id) for exercise in rows]
+    assert keys == sorted(keys) and len(keys) == 50
+
+
+def test_filtered_exercise_pages(db):
+    rows, _ = collect(lambda cursor, limit: get_cardio_exercises(db, cursor=cursor, limit=limit), 4)
+    assert [exercise.id for exercise in rows] == list(range(3, 51, 3))
+
+    rows, _ = collect(
+        lambda cursor, limit: get_exercises(db, cursor=cursor, limit=limit, search="Exercise 1"), 2
+    )
+    assert [exercise.id for exercise in rows] == [i for i in range(1, 51) if i % 7 == 1]
+
+
+def test_last_full_page_has_no_next_cursor(db):
+    page, cursor = get_exercises(db, limit=50)
+    assert len(page) == 50 and cursor is None
+
+
+def test_invalid_cursors_are_rejected(db):
+    _, cursor = get_exercises(db, limit=10, order_by="name")
+    with pytest.raises(ValueError):
+        get_exercises(db, cursor=cursor, limit=10, order_by="id")
+    with pytest.raises(ValueError):
+        get_exercises(db, cursor="not-a-cursor", limit=10)
+    with pytest.raises(ValueError):
+        get_exercises(db, cursor=encode_cursor("exercises:id", [1, 2]), limit=10)
+    with pytest.raises(ValueError):
+        get_exercises(db, order_by="difficulty")
+
+
+def test_null_sort_keys_do_not_end_pagination(db):
+    db.query(Workout).filter(Workout.owner_id == 1, Workout.id % 4 == 0).update({"date": None})
+    db.query(Exercise).filter(Exercise.id % 3 == 0).update({"name": None})
+    db.commit()
+
+    for limit in (1, 3, 7):
+        workouts, _ = collect(
+            lambda cursor, limit: get_workouts(db, 1, pagination={"cursor": cursor, "limit": limit}), limit
+        )
+        keys = [(workout.date, workout.id) for workout in workouts]
+        undated = sorted((key for key in keys if key[0] is None), key=lambda key: -key[1])
+        dated = sorted((key for key in keys if key[0] is not None), reverse=True)
+        # Undated workouts sort as the newest, then the rest newest first
+        assert len(keys) == 30 and keys == undated + dated and undated
+
+        exercises, _ = collect(
+            lambda cursor, limit: get_exercises(db, cursor=cursor, limit=limit, order_by="name"), limit
+        )
+        names = [(exercise.name, exercise.id) for exercise in exercises]
+        assert len(names) == 50
+        assert names == sorted(names, key=lambda key: (key[0] is None, key[0] or "", key[1]))
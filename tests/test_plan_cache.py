@@ -0,0 +1,89 @@
+from types import SimpleNamespace
+
+from app.algorithms.plan_cache import PlanCache, plan_cache_key
+from app.schemas.workout import WorkoutOptimizationParams, WorkoutPlan
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_plan(duration):
+    return WorkoutPlan(exercises=[], total_duration=duration, estimated_calories=0, difficulty=0)
+
+
+def test_lru_eviction_and_counters():
+    cache = PlanCache(maxsize=2, ttl=60)
+    cache.put("a", make_plan(1))
+    cache.put("b", make_plan(2))
+    assert cache.get("a").total_duration == 1  # "a" becomes most recent
+    cache.put("c", make_plan(3))                # evicts "b"
+
+    assert cache.get("b") is None
+    assert cache.get("c").total_duration == 3
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = PlanCache(maxsize=10, ttl=5, clock=clock)
+    cache.put("a", make_plan(1))
+
+    clock.now = 4.9
+    assert cache.get("a") is not None
+    clock.now = 5.0
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_cached_plans_are_copies():
+    cache = PlanCache()
+    plan = make_plan(10)
+    cache.put("a", plan)
+    plan.total_duration = 99
+    cache.get("a").total_duration = 42
+
+    assert cache.get("a").total_duration == 10
+
+
+def test_key_normalizes_params_and_tracks_catalog_version():
+    user = SimpleNamespace(fitness_level="beginner", preferred_equipment=["band", "none"],
+                           favorite_muscle_groups=[])
+    same_user = SimpleNamespace(fitness_level="beginner", preferred_equipment=["none", "band"],
+                                favorite_muscle_groups=[])
+    params = WorkoutOptimizationParams(goal="muscle_gain", available_time=30, target_muscles=["legs", "back"])
+    reordered = WorkoutOptimizationParams(goal="muscle_gain", available_time=30, target_muscles=["back", "legs"])
+
+    assert plan_cache_key(params, user, 3) == plan_cache_key(reordered, same_user, 3)
+    assert plan_cache_key(params, user, 3) != plan_cache_key(params, user, 4)
+    assert plan_cache_key(params, user, 3) != plan_cache_key(
+        params, SimpleNamespace(fitness_level="advanced"), 3
+    )
+
+
+def test_key_ignores_tuning_knobs_but_not_refinement():
+    user = SimpleNamespace(fitness_level="beginner")
+    params = WorkoutOptimizationParams(goal="endurance", available_time=30)
+    tuned = WorkoutOptimizationParams(goal="endurance", available_time=30, top_k=5, beam_width=8)
+    refined = WorkoutOptimizationParams(goal="endurance", available_time=30, refine_deadline_ms=20)
+    longer = WorkoutOptimizationParams(goal="endurance", available_time=30, refine_deadline_ms=50)
+
+    assert plan_cache_key(params, user, 1) == plan_cache_key(tuned, user, 1)
+    assert plan_cache_key(refined, user, 1) == plan_cache_key(longer, user, 1)
+    assert plan_cache_key(params, user, 1) != plan_cache_key(refined, user, 1)
+
+
+def test_catalog_writes_clear_the_shared_cache():
+    from app.algorithms import catalog
+    from app.algorithms.plan_cache import plan_cache
+
+    plan_cache.put("key", make_plan(1))
+    catalog.invalidate_catalog()
+
+    assert plan_cache.get("key") is None
@@ -0,0 +1,48 @@
+import inspect
+from itertools import islice
+from types import SimpleNamespace
+
+from app.algorithms.program_generator import RECOVERY_DAYS, WEEKLY_LOAD_CYCLE, generate_program
+from app.schemas.workout import WorkoutProgramParams
+from benchmarks.synthetic import synthetic_catalog
+
+USER = SimpleNamespace(fitness_level="intermediate", preferred_equipment=[], favorite_muscle_groups=[])
+
+
+def test_program_is_generated_lazily():
+    catalog = synthetic_catalog(2000, seed=1)
+    params = WorkoutProgramParams(goal="weight_loss", available_time=45, weeks=52, sessions_per_week=7)
+
+    sessions = generate_program(catalog, params, USER)
+
+    assert inspect.isgenerator(sessions)
+    first = list(islice(sessions, 2))
+    assert [(s.week, s.day, s.session) for s in first] == [(1, 1, 1), (1, 2, 2)]
+
+
+def test_program_schedule_and_load_cycle():
+    catalog = synthetic_catalog(2000, seed=2)
+    params = WorkoutProgramParams(goal="endurance", available_time=60, weeks=8, sessions_per_week=3,
+                                  selection_mode="exact")
+
+    sessions = list(generate_program(catalog, params, USER))
+
+    assert len(sessions) == 24
+    assert [s.day for s in sessions[:3]] == [1, 3, 5]
+    for s in sessions:
+        load = WEEKLY_LOAD_CYCLE[(s.week - 1) % len(WEEKLY_LOAD_CYCLE)]
+        assert 0 < s.plan.total_duration <= round(60 * load)
+
+
+def test_recovery_keeps_muscle_groups_apart_on_back_to_back_days():
+    catalog = synthetic_catalog(3000, seed=3)
+    params = WorkoutProgramParams(goal="muscle_gain", available_time=20, weeks=1, sessions_per_week=7,
+                                  target_muscles=["legs", "back", "chest", "arms"], selection_mode="exact")
+
+    sessions = list(generate_program(catalog, params, USER))
+
+    assert RECOVERY_DAYS == 2
+    for today, tomorrow in zip(sessions, sessions[1:]):
+        trained = set(today.plan.muscle_group_balance)
+        assert not trained & set(tomorrow.plan.muscle_group_balance)
+    assert all(s.plan.exercises for s in sessions)
@@ -0,0 +1,71 @@
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import event, func, insert, select
+
+from app.crud.workout import create_workout, create_workouts
+from app.models.exercise import Exercise
+from app.models.workout import Workout
+from app.schemas.workout import WorkoutCreate
+
+
+@pytest.fixture
+def db(db):
+    db.execute(insert(Exercise), [
+        {"id": i, "name": f"Exercise {i}", "muscle_group": "legs", "equipment": "none",
+         "difficulty": 3, "calories_burned": 5.0, "is_cardio": False, "avg_duration": 10}
+        for i in range(1, 6)
+    ])
+    db.commit()
+    db.statements = []
+    event.listen(db.get_bind(), "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: db.statements.append(statement))
+    return db
+
+
+def workout(day, exercise_ids):
+    return WorkoutCreate(name=f"Day {day}", date=f"2026-03-0{day}", duration=45, exercise_ids=exercise_ids)
+
+
+def test_batch_creates_workouts_and_links_in_bulk(db):
+    week = [workout(1, [1, 2]), workout(2, [3]), workout(3, []), workout(4, [2, 2, 5])]
+    created = create_workouts(db, week, user_id=7)
+
+    assert [w.name for w in created] == ["Day 1", "Day 2", "Day 3", "Day 4"]
+    assert [[e.id for e in sorted(w.exercises, key=lambda e: e.id)] for w in created] == [[1, 2], [3], [], [2, 5]]
+    assert {w.owner_id for w in created} == {7}
+    assert str(created[0].date) == "2026-03-01"
+
+    workout_inserts = [statement for statement in db.statements if statement.startswith("INSERT INTO workouts")]
+    link_inserts = [statement for statement in db.statements if statement.startswith("INSERT INTO workout_exercise")]
+    assert all("RETURNING" in statement for statement in workout_inserts)
+    # Postgres sends one multi-row INSERT ... RETURNING; SQLite cannot order
+    # RETURNING rows, so SQLAlchemy falls back to one statement per row there
+    expected = 1 if db.get_bind().dialect.name == "postgresql" else len(week)
+    assert len(workout_inserts) == expected
+    assert len(link_inserts) == 1
+    validations = [statement for statement in db.statements if "FROM exercises" in statement and " IN " in statement]
+    assert len(validations) == 1
+
+
+def test_unknown_exercises_reject_the_whole_batch(db):
+    with pytest.raises(ValueError, match=r"\[8, 9\]"):
+        create_workouts(db, [workout(1, [1]), workout(2, [9, 8])], user_id=1)
+    assert db.scalar(select(func.count()).select_from(Workout)) == 0
+
+
+@pytest.mark.parametrize("exercise_ids", ["1,2", ["abc"], [1, None], {"id": 1}])
+def test_malformed_exercise_ids_fail_validation(exercise_ids):
+    with pytest.raises(ValidationError):
+        WorkoutCreate(name="W", date="2026-03-01", duration=30, exercise_ids=exercise_ids)
+
+
+def test_invalid_date_rolls_back(db):
+    with pytest.raises(ValueError):
+        create_workouts(db, [workout(1, [1]), WorkoutCreate(name="Bad", date="03/02/2026", duration=30)], 1)
+    assert db.scalar(select(func.count()).select_from(Workout)) == 0
+
+
+def test_single_workout_creation(db):
+    created = create_workout(db, workout(5, [4]), user_id=3)
+    assert created.id and [e.id for e in created.exercises] == [4]
+    assert create_workouts(db, [], user_id=3) == []
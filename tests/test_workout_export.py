@@ -0,0 +1,76 @@
+import asyncio
+import csv
+import io
+import json
+from datetime import date, timedelta
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app import workout_export
+from app.models import user  # noqa: F401  (registers the users table for the workouts foreign key)
+from app.models.exercise import Exercise
+from app.models.workout import Workout, workout_exercise
+from app.workout_export import export_workouts
+
+
+def run_export(tmp_path, **kwargs):
+    """Export owner 1's history from a fresh SQLite database, return the chunks"""
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'export.db'}")
+        async with engine.begin() as conn:
+            for table in (Exercise.__table__, Workout.__table__, workout_exercise):
+                await conn.run_sync(table.create)
+            await conn.execute(insert(Exercise), [
+                {"id": i, "name": f"Exercise {i}", "muscle_group": "legs", "equipment": "none",
+                 "difficulty": 3, "calories_burned": 5.0, "is_cardio": False, "avg_duration": 10}
+                for i in range(1, 6)
+            ])
+            # Inserted newest first; owner 2 has workouts on the same days
+            await conn.execute(insert(Workout), [
+                {"id": i, "name": f"Workout {i}", "date": date(2026, 2, 1) + timedelta(days=30 - i),
+                 "duration": 30 + i, "notes": 'a, "b"' if i == 3 else None, "owner_id": 1 + i % 2}
+                for i in range(1, 31)
+            ])
+            await conn.execute(insert(workout_exercise), [
+                {"workout_id": i, "exercise_id": 1 + (i + j) % 5}
+                for i in range(1, 31) for j in range(i % 3)
+            ])
+        async with AsyncSession(engine) as db:
+            chunks = [chunk async for chunk in export_workouts(db, 2, chunk_size=4, **kwargs)]
+        await engine.dispose()
+        return chunks
+
+    return asyncio.run(scenario())
+
+
+def test_ndjson_export_folds_exercises_into_workouts(tmp_path, monkeypatch):
+    monkeypatch.setattr(workout_export, "EXPORT_FLUSH_RECORDS", 4)
+    chunks = run_export(tmp_path)
+    records = [json.loads(line) for line in "".join(chunks).splitlines()]
+
+    assert len(chunks) == 4
+    assert [record["id"] for record in records] == list(range(29, 0, -2))
+    assert [record["date"] for record in records] == sorted(record["date"] for record in records)
+    for record in records:
+        assert [exercise["id"] for exercise in record["exercises"]] == sorted(
+            1 + (record["id"] + j) % 5 for j in range(record["id"] % 3)
+        )
+
+
+def test_csv_export_with_date_filters(tmp_path):
+    chunks = run_export(tmp_path, fmt="csv", start_date=date(2026, 2, 10), end_date=date(2026, 2, 20))
+    lines = list(csv.reader(io.StringIO("".join(chunks))))
+
+    assert chunks[0] == "id,date,name,duration,notes,exercise_ids,exercise_names\r\n"
+    assert all("2026-02-10" <= line[1] <= "2026-02-20" for line in lines[1:])
+    assert [int(line[0]) for line in lines[1:]] == [21, 19, 17, 15, 13, 11]
+    assert lines[1][5:] == ["", ""]
+    assert lines[2][5:] == ["5", "Exercise 5"]
+    assert lines[3][5:] == ["3|4", "Exercise 3|Exercise 4"]
+
+
+def test_csv_quotes_notes(tmp_path):
+    lines = list(csv.reader(io.StringIO("".join(run_export(tmp_path, fmt="csv")))))
+    workout = next(line for line in lines[1:] if line[0] == "3")
+    assert workout[4] == 'a, "b"'
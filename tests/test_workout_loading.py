@@ -0,0 +1,75 @@
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import event, insert
+
+from app.crud.workout import get_workout, get_workouts, get_workouts_by_exercise
+from app.models.exercise import Exercise
+from app.models.workout import Workout, workout_exercise
+from app.schemas.workout import WorkoutPage, Workout as WorkoutSchema
+
+WORKOUTS = 40
+EXERCISES_PER_WORKOUT = 3
+
+
+@pytest.fixture
+def db(db):
+    db.execute(insert(Exercise), [
+        {"id": i, "name": f"Exercise {i}", "muscle_group": "legs", "equipment": "none",
+         "difficulty": 3, "calories_burned": 5.0, "is_cardio": False, "avg_duration": 10}
+        for i in range(1, 11)
+    ])
+    db.execute(insert(Workout), [
+        {"id": i, "name": f"Workout {i}", "date": date(2026, 1, 1) + timedelta(days=i),
+         "duration": 30, "owner_id": 1}
+        for i in range(1, WORKOUTS + 1)
+    ])
+    db.execute(insert(workout_exercise), [
+        {"workout_id": i, "exercise_id": 1 + (i + j) % 10}
+        for i in range(1, WORKOUTS + 1) for j in range(EXERCISES_PER_WORKOUT)
+    ])
+    db.commit()
+    db.statements = []
+    event.listen(db.get_bind(), "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: db.statements.append(statement))
+    return db
+
+
+@contextmanager
+def count_queries(db):
+    counter = {}
+    start = len(db.statements)
+    yield counter
+    counter["queries"] = len(db.statements) - start
+
+
+def test_workout_page_serializes_in_two_queries(db):
+    with count_queries(db) as counter:
+        items, _ = get_workouts(db, 1, pagination={"limit": 25}, with_exercises=True)
+        page = WorkoutPage(items=items).dict()
+    # The page itself and one IN query for all of its exercises
+    assert counter["queries"] == 2
+    assert len(page["items"]) == 25
+    assert all(len(item["exercises"]) == EXERCISES_PER_WORKOUT for item in page["items"])
+
+
+def test_lazy_page_issues_one_query_per_workout(db):
+    with count_queries(db) as counter:
+        items, _ = get_workouts(db, 1, pagination={"limit": 25})
+        WorkoutPage(items=items).dict()
+    assert counter["queries"] == 1 + 25
+
+
+def test_eager_workout_and_by_exercise(db):
+    with count_queries(db) as counter:
+        workout = WorkoutSchema.from_orm(get_workout(db, 7, with_exercises=True))
+    assert counter["queries"] == 2
+    assert sorted(exercise.id for exercise in workout.exercises) == [8, 9, 10]
+
+    db.expunge_all()
+    with count_queries(db) as counter:
+        workouts = get_workouts_by_exercise(db, 5, 1, with_exercises=True)
+        serialized = [WorkoutSchema.from_orm(item) for item in workouts]
+    assert counter["queries"] == 2
+    assert serialized and all(5 in {exercise.id for exercise in item.exercises} for item in serialized)
@@ -0,0 +1,355 @@
+from itertools import combinations
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.algorithms.catalog import ExerciseCatalog
+from app.algorithms import workout_optimizer as optimizer
+from app.algorithms.plan_cache import plan_cache
+from app.schemas.workout import WorkoutOptimizationParams
+
+
+def make_exercises():
+    rows = [
+        # name, muscle_group, equipment, difficulty, calories, cardio, duration
+        ("Running", "legs", "none", 4, 12.0, True, 20),
+        ("Rowing", "back", "rower", 6, 10.0, True, 15),
+        ("Bench press", "chest", "barbell", 6, 4.0, False, 10),
+        ("Push-up", "chest", "none", 3, 5.0, False, 5),
+        ("Squat", "legs", "barbell", 8, 6.0, False, 10),
+        ("Plank", "core", "none", 2, 3.0, False, 5),
+        ("Burpee", "full_body", "none", 7, 11.0, True, 10),
+    ]
+    return [
+        SimpleNamespace(
+            id=i + 1, name=name, muscle_group=mg, equipment=eq, difficulty=diff,
+            calories_burned=cal, is_cardio=cardio, avg_duration=dur
+        )
+        for i, (name, mg, eq, diff, cal, cardio, dur) in enumerate(rows)
+    ]
+
+
+def make_user(**kwargs):
+    defaults = {"fitness_level": "advanced", "preferred_equipment": [], "favorite_muscle_groups": []}
+    defaults.update(kwargs)
+    return SimpleNamespace(**defaults)
+
+
+def names(catalog, positions):
+    return sorted(catalog.names[i] for i in positions)
+
+
+def test_filter_by_goal_and_fitness_level():
+    catalog = ExerciseCatalog.from_exercises(make_exercises())
+
+    weight_loss = WorkoutOptimizationParams(goal="weight_loss", available_time=60)
+    assert names(catalog, optimizer._filter_exercises(catalog, weight_loss, make_user())) == [
+        "Burpee", "Push-up", "Rowing", "Running", "Squat"
+    ]
+
+    muscle_gain = WorkoutOptimizationParams(goal="muscle_gain", available_time=60, target_muscles=["chest"])
+    beginner = make_user(fitness_level="beginner")
+    assert names(catalog, optimizer._filter_exercises(catalog, muscle_gain, beginner)) == ["Push-up"]
+
+    endurance = WorkoutOptimizationParams(goal="endurance", available_time=60)
+    intermediate = make_user(fitness_level="intermediate")
+    assert names(catalog, optimizer._filter_exercises(catalog, endurance, intermediate)) == [
+        "Burpee", "Rowing", "Running"
+    ]
+
+
+def test_score_matches_weighting_rules():
+    catalog = ExerciseCatalog.from_exercises(make_exercises())
+    params = WorkoutOptimizationParams(goal="muscle_gain", available_time=60, target_muscles=["chest", "legs"])
+    user = make_user(preferred_equipment=["barbell"], favorite_muscle_groups=["chest"])
+
+    candidates = optimizer._filter_exercises(catalog, params, user)
+    scores = {
+        catalog.names[pos]: round(float(score), 2)
+        for pos, score in zip(candidates, optimizer._score_exercises(catalog, candidates, params, user))
+    }
+
+    assert scores == {
+        "Bench press": 6 * 0.5 + 0.5 + 0.2 + 0.3,
+        "Push-up": 3 * 0.5 + 0.5 + 0.3,
+        "Running": 4 * 0.5 + 0.5,
+        "Squat": 8 * 0.5 + 0.5 + 0.2,
+    }
+
+
+def test_selection_respects_time_and_muscle_group_cap():
+    catalog = ExerciseCatalog.from_exercises(make_exercises())
+    params = WorkoutOptimizationParams(goal="muscle_gain", available_time=25, target_muscles=["chest", "legs"])
+    user = make_user()
+
+    candidates = optimizer._filter_exercises(catalog, params, user)
+    scores = optimizer._score_exercises(catalog, candidates, params, user)
+    selected = optimizer._optimize_selection(catalog, candidates, scores, params.available_time)
+
+    assert sum(int(catalog.avg_duration[i]) for i in selected) <= params.available_time
+    groups = [catalog.muscle_group_of(i) for i in selected]
+    assert all(groups.count(g) <= optimizer.MAX_PER_MUSCLE_GROUP for g in groups)
+
+
+def test_build_plan_maps_back_to_ids_and_names():
+    catalog = ExerciseCatalog.from_exercises(make_exercises())
+    plan = optimizer._build_workout_plan(catalog, [0, 3])
+
+    assert plan.exercises == [{"id": 1, "name": "Running"}, {"id": 4, "name": "Push-up"}]
+    assert plan.total_duration == 25
+    assert plan.estimated_calories == 17.0
+    assert plan.difficulty == 3.5
+    assert plan.muscle_group_balance == {"chest": 0.5, "legs": 0.5}
+
+
+def test_empty_catalog_gives_empty_plan():
+    catalog = ExerciseCatalog.from_exercises([])
+    params = WorkoutOptimizationParams(goal="weight_loss", available_time=30)
+    user = make_user()
+
+    candidates = optimizer._filter_exercises(catalog, params, user)
+    scores = optimizer._score_exercises(catalog, candidates, params, user)
+    selected = optimizer._optimize_selection(catalog, candidates, scores, params.available_time)
+    plan = optimizer._build_workout_plan(catalog, optimizer._optimize_order(catalog, selected))
+
+    assert plan.exercises == []
+    assert plan.total_duration == 0
+
+
+def brute_force_best(catalog, candidates, scores, available_time):
+    best = 0.0
+    for size in range(len(candidates) + 1):
+        for combo in combinations(range(len(candidates)), size):
+            positions = candidates[list(combo)]
+            if catalog.avg_duration[positions].sum() > available_time:
+                continue
+            groups = [catalog.muscle_group_of(i) for i in positions]
+            if any(groups.count(g) > optimizer.MAX_PER_MUSCLE_GROUP for g in groups):
+                continue
+            best = max(best, float(scores[list(combo)].sum()))
+    return best
+
+
+def test_exact_selection_matches_brute_force():
+    rng = np.random.default_rng(7)
+    for _ in range(20):
+        exercises = [
+            SimpleNamespace(
+                id=i, name=f"ex{i}", muscle_group=str(rng.choice(["legs", "back", "chest"])),
+                equipment="none", difficulty=int(rng.integers(1, 11)),
+                calories_burned=float(rng.uniform(1, 12)), is_cardio=False,
+                avg_duration=int(rng.integers(1, 20))
+            )
+            for i in range(10)
+        ]
+        catalog = ExerciseCatalog.from_exercises(exercises)
+        candidates = np.arange(len(catalog))
+        scores = rng.uniform(0.1, 5.0, len(catalog))
+        available_time = int(rng.integers(10, 45))
+
+        selected = optimizer._optimize_selection_exact(catalog, candidates, scores, available_time)
+        selected_score = float(sum(scores[i] for i in selected))
+
+        assert catalog.avg_duration[selected].sum() <= available_time
+        groups = [catalog.muscle_group_of(i) for i in selected]
+        assert all(groups.count(g) <= optimizer.MAX_PER_MUSCLE_GROUP for g in groups)
+        assert abs(selected_score - brute_force_best(catalog, candidates, scores, available_time)) < 1e-9
+
+        greedy = optimizer._optimize_selection(catalog, candidates, scores, available_time)
+        assert selected_score >= float(sum(scores[i] for i in greedy)) - 1e-9
+
+
+def test_unknown_selection_mode_is_rejected():
+    with pytest.raises(ValueError):
+        optimizer._selection_strategy("random")
+
+
+def test_batch_reuses_candidates_for_identical_filter_keys(monkeypatch):
+    catalog = ExerciseCatalog.from_exercises(make_exercises())
+    monkeypatch.setattr(optimizer, "get_catalog", lambda db: catalog)
+    plan_cache.clear()
+
+    filter_calls = []
+    real_filter = optimizer._filter_exercises
+
+    def counting_filter(*args):
+        filter_calls.append(args)
+        return real_filter(*args)
+
+    monkeypatch.setattr(optimizer, "_filter_exercises", counting_filter)
+
+    params = WorkoutOptimizationParams(goal="weight_loss", available_time=30)
+    other = WorkoutOptimizationParams(goal="endurance", available_time=45)
+    requests = [
+        (make_user(), params),
+        (make_user(favorite_muscle_groups=["legs"]), params),
+        (make_user(), other),
+        (make_user(), params),
+    ]
+
+    plans = optimizer.optimize_workout_plans(None, requests)
+
+    assert len(plans) == 4
+    assert len(filter_calls) == 2
+    for (user, request_params), plan in zip(requests, plans):
+        assert plan == optimizer.optimize_workout_plan(None, request_params, user)
+
+
+def test_solve_plans_shares_candidates_within_a_catalog(monkeypatch):
+    catalog = ExerciseCatalog.from_exercises(make_exercises())
+    filter_calls = []
+    real_filter = optimizer._filter_exercises
+
+    def counting_filter(*args):
+        filter_calls.append(args)
+        return real_filter(*args)
+
+    monkeypatch.setattr(optimizer, "_filter_exercises", counting_filter)
+
+    profile = optimizer.UserProfile(fitness_level="advanced")
+    params = [
+        WorkoutOptimizationParams(goal="weight_loss", available_time=30).dict(),
+        WorkoutOptimizationParams(goal="weight_loss", available_time=50).dict(),
+        WorkoutOptimizationParams(goal="endurance", available_time=45).dict(),
+    ]
+
+    plans = optimizer.solve_plans([(catalog, p, profile) for p in params])
+
+    assert len(filter_calls) == 2
+    assert plans == [optimizer.solve_plan(catalog, p, profile) for p in params]
+
+
+def brute_force_top_k(catalog, candidates, scores, available_time, k):
+    totals = []
+    for size in range(1, len(candidates) + 1):
+        for combo in combinations(range(len(candidates)), size):
+            positions = candidates[list(combo)]
+            if catalog.avg_duration[positions].sum() > available_time:
+                continue
+            groups = [catalog.muscle_group_of(i) for i in positions]
+            if any(groups.count(g) > optimizer.MAX_PER_MUSCLE_GROUP for g in groups):
+                continue
+            totals.append(float(scores[list(combo)].sum()))
+    return sorted(totals, reverse=True)[:k]
+
+
+def test_top_k_selections_match_brute_force_with_wide_beam():
+    rng = np.random.default_rng(11)
+    for _ in range(10):
+        exercises = [
+            SimpleNamespace(
+                id=i, name=f"ex{i}", muscle_group=str(rng.choice(["legs", "back", "chest"])),
+                equipment="none", difficulty=5, calories_burned=5.0, is_cardio=False,
+                avg_duration=int(rng.integers(1, 20))
+            )
+            for i in range(9)
+        ]
+        catalog = ExerciseCatalog.from_exercises(exercises)
+        candidates = np.arange(len(catalog))
+        scores = rng.uniform(0.1, 5.0, len(catalog))
+        available_time = int(rng.integers(10, 45))
+
+        selections = optimizer._top_k_selections(
+            catalog, candidates, scores, available_time, k=4, beam_width=1024
+        )
+
+        assert len({frozenset(s) for s in selections}) == len(selections)
+        for selected in selections:
+            assert catalog.avg_duration[selected].sum() <= available_time
+        totals = [float(scores[s].sum()) for s in selections]
+        expected = brute_force_top_k(catalog, candidates, scores, available_time, 4)
+        assert np.allclose(totals, expected)
+
+
+def test_alternative_plans_are_distinct_and_ranked(monkeypatch):
+    catalog = ExerciseCatalog.from_exercises(make_exercises())
+    monkeypatch.setattr(optimizer, "get_catalog", lambda db: catalog)
+    params = WorkoutOptimizationParams(goal="weight_loss", available_time=30, top_k=3, beam_width=2)
+
+    plans = optimizer.optimize_alternative_plans(None, params, make_user())
+
+    assert len(plans) == 3
+    assert len({frozenset(map(str, p.exercises)) for p in plans}) == 3
+    assert all(p.total_duration <= 30 for p in plans)
+
+
+def refinement_objective(catalog, selected, scores_by_position):
+    balance = optimizer._calculate_muscle_balance(catalog, selected)
+    diversity = 1.0 - sum(share ** 2 for share in balance.values()) if selected else 0.0
+    return sum(scores_by_position[i] for i in selected) + optimizer.MUSCLE_BALANCE_WEIGHT * diversity
+
+
+def test_refinement_improves_greedy_within_constraints():
+    rng = np.random.default_rng(3)
+    for _ in range(10):
+        exercises = [
+            SimpleNamespace(
+                id=i, name=f"ex{i}", muscle_group=str(rng.choice(["legs", "back", "chest", "core"])),
+                equipment="none", difficulty=5, calories_burned=5.0, is_cardio=False,
+                avg_duration=int(rng.integers(1, 20))
+            )
+            for i in range(40)
+        ]
+        catalog = ExerciseCatalog.from_exercises(exercises)
+        candidates = np.arange(len(catalog))
+        scores = rng.uniform(0.1, 5.0, len(catalog))
+        available_time = int(rng.integers(20, 60))
+        greedy = optimizer._optimize_selection(catalog, candidates, scores, available_time)
+
+        refined, stats = optimizer._refine_selection(
+            catalog, candidates, scores, greedy, available_time, deadline_ms=1000
+        )
+
+        assert stats.converged
+        assert catalog.avg_duration[refined].sum() <= available_time
+        groups = [catalog.muscle_group_of(i) for i in refined]
+        assert all(groups.count(g) <= optimizer.MAX_PER_MUSCLE_GROUP for g in groups)
+        # Balance rounding in _calculate_muscle_balance allows a small difference
+        before = refinement_objective(catalog, greedy, scores)
+        after = refinement_objective(catalog, refined, scores)
+        assert after >= before - 1e-9
+        assert abs((after - before) - stats.score_improvement) < 0.05
+
+
+def test_refinement_with_expired_deadline_keeps_selection(monkeypatch):
+    catalog = ExerciseCatalog.from_exercises(make_exercises())
+    monkeypatch.setattr(optimizer, "get_catalog", lambda db: catalog)
+    plan_cache.clear()
+    params = WorkoutOptimizationParams(goal="weight_loss", available_time=30)
+
+    baseline = optimizer.optimize_workout_plan(None, params, make_user())
+    refined = optimizer.optimize_workout_plan(
+        None, params.copy(update={"refine_deadline_ms": 0}), make_user()
+    )
+
+    assert baseline.refinement is None
+    assert refined.refinement.iterations == 0
+    assert not refined.refinement.converged
+    assert sorted(map(str, refined.exercises)) == sorted(map(str, baseline.exercises))
+
+
+def test_order_groups_equipment_and_reports_transition_time():
+    rows = [
+        ("Bench press", "chest", "barbell", False),
+        ("Curl", "arms", "dumbbell", False),
+        ("Squat", "legs", "barbell", False),
+        ("Fly", "chest", "dumbbell", False),
+        ("Deadlift", "back", "barbell", False),
+        ("Lunge", "legs", "dumbbell", False),
+    ]
+    catalog = ExerciseCatalog.from_exercises([
+        SimpleNamespace(id=i + 1, name=name, muscle_group=mg, equipment=eq, difficulty=5,
+                        calories_burned=5.0, is_cardio=cardio, avg_duration=10)
+        for i, (name, mg, eq, cardio) in enumerate(rows)
+    ])
+    selected = list(range(len(catalog)))
+
+    ordered = optimizer._optimize_order(catalog, selected)
+
+    assert sorted(ordered) == selected
+    # One equipment change, no muscle group repeated back to back
+    assert optimizer._transition_time(catalog, ordered) == optimizer.EQUIPMENT_CHANGE_MINUTES
+    assert optimizer._transition_time(catalog, selected) == 5 * optimizer.EQUIPMENT_CHANGE_MINUTES
+    plan = optimizer._build_workout_plan(catalog, ordered)
+    assert plan.transition_minutes == optimizer.EQUIPMENT_CHANGE_MINUTES
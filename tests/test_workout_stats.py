@@ -0,0 +1,111 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import insert
+
+from app.crud.exercise import delete_exercise, update_exercise
+from app.crud.workout import create_workouts, delete_workout, update_workout
+from app.crud.workout_stats import get_weekly_stats, rebuild_workout_stats
+from app.models.exercise import Exercise
+from app.models.workout_stats import WorkoutWeeklyStats
+from app.schemas.exercise import ExerciseUpdate
+from app.schemas.workout import WorkoutCreate, WorkoutUpdate
+
+GROUPS = {1: "legs", 2: "legs", 3: "back", 4: "chest"}
+
+
+@pytest.fixture
+def db(db):
+    db.execute(insert(Exercise), [
+        {"id": i, "name": f"Exercise {i}", "muscle_group": group, "equipment": "none",
+         "difficulty": 3, "calories_burned": 5.0, "is_cardio": False, "avg_duration": 10}
+        for i, group in GROUPS.items()
+    ])
+    db.commit()
+    return db
+
+
+def workout(day, duration, exercise_ids, name="W"):
+    return WorkoutCreate(name=name, date=day, duration=duration, exercise_ids=exercise_ids)
+
+
+def assert_matches_rebuild(db, owner_id):
+    incremental = get_weekly_stats(db, owner_id)
+    rebuild_workout_stats(db)
+    assert get_weekly_stats(db, owner_id) == incremental
+    return incremental
+
+
+def test_create_maintains_weekly_stats(db):
+    create_workouts(db, [
+        workout("2026-03-02", 60, [1, 2, 3]),   # ISO week 10
+        workout("2026-03-08", 30, [4]),         # Sunday, still week 10
+        workout("2026-03-09", 45, []),          # week 11
+    ], user_id=1)
+    create_workouts(db, [workout("2026-03-03", 90, [1])], user_id=2)
+
+    weeks = assert_matches_rebuild(db, 1)
+    assert [(week["iso_year"], week["iso_week"]) for week in weeks] == [(2026, 10), (2026, 11)]
+    first = weeks[0]
+    assert first["week_start"] == date(2026, 3, 2)
+    assert (first["sessions"], first["minutes"], first["exercise_count"]) == (2, 90.0, 4)
+    assert first["muscle_groups"] == {
+        "back": {"sessions": 1, "minutes": 20.0, "exercise_count": 1},
+        "chest": {"sessions": 1, "minutes": 30.0, "exercise_count": 1},
+        "legs": {"sessions": 1, "minutes": 40.0, "exercise_count": 2},
+    }
+    assert weeks[1]["muscle_groups"] == {} and weeks[1]["sessions"] == 1
+
+
+def test_update_and_delete_keep_stats_consistent(db):
+    created = create_workouts(db, [
+        workout("2026-03-02", 60, [1, 3]),
+        workout("2026-03-04", 40, [3]),
+    ], user_id=1)
+
+    update_workout(db, created[0].id, WorkoutUpdate(date="2026-03-10", duration=30))
+    weeks = assert_matches_rebuild(db, 1)
+    assert [(week["iso_week"], week["minutes"]) for week in weeks] == [(10, 40.0), (11, 30.0)]
+    assert weeks[1]["muscle_groups"]["legs"]["minutes"] == 15.0
+
+    assert delete_workout(db, created[1].id)
+    weeks = assert_matches_rebuild(db, 1)
+    # Week 10 has no workouts left, so its rows are gone
+    assert [week["iso_week"] for week in weeks] == [11]
+    assert db.query(WorkoutWeeklyStats).filter(WorkoutWeeklyStats.iso_week == 10).count() == 0
+
+
+def test_date_range_and_owner_rebuild(db):
+    create_workouts(db, [workout(f"2026-0{month}-15", 30, [1]) for month in (1, 2, 3)], user_id=1)
+    create_workouts(db, [workout("2026-02-15", 30, [4])], user_id=2)
+
+    weeks = get_weekly_stats(db, 1, start_date=date(2026, 2, 10), end_date=date(2026, 3, 20))
+    assert [week["week_start"] for week in weeks] == [date(2026, 2, 9), date(2026, 3, 9)]
+
+    db.query(WorkoutWeeklyStats).delete()
+    db.commit()
+    assert rebuild_workout_stats(db, owner_id=2) == 2
+    assert get_weekly_stats(db, 1) == []
+    assert len(get_weekly_stats(db, 2)) == 1
+
+
+def test_exercise_changes_move_stats_of_its_workouts(db):
+    created = create_workouts(db, [workout("2026-03-02", 40, [1]), workout("2026-03-03", 60, [1, 3])], user_id=1)
+
+    # The legs exercise becomes a back exercise: its workouts move with it
+    update_exercise(db, 1, ExerciseUpdate(
+        name="Exercise 1", muscle_group="back", equipment="none", difficulty=3,
+        calories_burned=5.0, is_cardio=False, avg_duration=10
+    ))
+    weeks = assert_matches_rebuild(db, 1)
+    assert weeks[0]["muscle_groups"] == {"back": {"sessions": 2, "minutes": 100.0, "exercise_count": 3}}
+
+    # Deleting the workout now subtracts what was added for it
+    assert delete_workout(db, created[0].id)
+    weeks = assert_matches_rebuild(db, 1)
+    assert weeks[0]["muscle_groups"] == {"back": {"sessions": 1, "minutes": 60.0, "exercise_count": 2}}
+    assert db.query(WorkoutWeeklyStats).filter(WorkoutWeeklyStats.sessions < 0).count() == 0
+
+    assert delete_exercise(db, 3)
+    weeks = assert_matches_rebuild(db, 1)
+    assert weeks[0]["muscle_groups"] == {"back": {"sessions": 1, "minutes": 60.0, "exercise_count": 1}}